@@ -4,10 +4,14 @@ Script to generate all core agents and tools using Agno.
 
 This script reads specifications from the specs directory and uses
 the AutoAgentComposer to generate the corresponding components.
+With --enhance, the specifications are first enhanced with Bedrock in one
+concurrent batch; with --batch-file, the enhancement prompts are written
+to a Bedrock batch inference input file instead, for offline processing.
 """
 import os
 import json
 import sys
+import argparse
 from pathlib import Path
 
 # Add the project root to the Python path
@@ -15,35 +19,81 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from tdev.core.registry import get_registry
 
-def generate_from_specs(specs_dir, component_type):
-    """Generate components from specifications in the given directory."""
-    registry = get_registry()
-    composer = registry.get_instance("AutoAgentComposerAgent")
-    
-    if not composer:
-        print("AutoAgentComposerAgent not found in registry")
-        return False
-    
-    # Get all JSON files in the specs directory
+def load_specs(specs_dir, component_type):
+    """Load the specifications in the given directory."""
     specs_path = Path(specs_dir)
     spec_files = list(specs_path.glob("*.json"))
     
     if not spec_files:
         print(f"No specification files found in {specs_dir}")
-        return False
+        return []
     
     print(f"Found {len(spec_files)} specification files")
     
-    # Generate each component
+    specs = []
     for spec_file in spec_files:
-        print(f"Generating from {spec_file}...")
-        
         # Load the specification
         with open(spec_file, 'r') as f:
             spec = json.load(f)
         
         # Ensure the type is set correctly
         spec["type"] = component_type
+        specs.append(spec)
+    
+    return specs
+
+def enhance_specs(specs, goal):
+    """Enhance specifications with Bedrock, all prompts in one concurrent batch."""
+    coordinator = get_registry().get_instance("DevCoordinatorAgent")
+    if not coordinator:
+        print("DevCoordinatorAgent not found in registry, skipping enhancement")
+        return specs
+    
+    print(f"Enhancing {len(specs)} specifications...")
+    return coordinator.enhance_capability_specs(specs, goal)
+
+def write_batch_file(specs, goal, batch_file):
+    """Write the enhancement prompts to a Bedrock batch inference input file."""
+    coordinator = get_registry().get_instance("DevCoordinatorAgent")
+    if not coordinator or not coordinator.bedrock_client:
+        print("DevCoordinatorAgent with a Bedrock client not found in registry")
+        return False
+    
+    from tdev.agent_core.model_router import model_router, CAPABILITY_ENHANCEMENT
+    from tdev.agents.dev_coordinator_agent import ENHANCEMENT_PARAMETERS
+    
+    prompts = [coordinator._build_enhancement_prompt(spec, goal) for spec in specs]
+    model_id = model_router.route(CAPABILITY_ENHANCEMENT, prompts[0])[0]
+    record_ids = coordinator.bedrock_client.prepare_batch_job(model_id, prompts, batch_file, ENHANCEMENT_PARAMETERS)
+    
+    # Keep the record ID of each specification for reading the job's output
+    with open(f"{batch_file}.ids.json", 'w') as f:
+        json.dump(dict(zip(record_ids, [spec["name"] for spec in specs])), f, indent=2)
+    print(f"Wrote {len(prompts)} {model_id} records to {batch_file}")
+    return True
+
+def generate_from_specs(specs_dir, component_type, enhance=False, batch_file=None):
+    """Generate components from specifications in the given directory."""
+    registry = get_registry()
+    composer = registry.get_instance("AutoAgentComposerAgent")
+    
+    if not composer:
+        print("AutoAgentComposerAgent not found in registry")
+        return False
+    
+    specs = load_specs(specs_dir, component_type)
+    if not specs:
+        return False
+    
+    goal = f"Provide the core T-Developer {component_type}s"
+    if batch_file:
+        return write_batch_file(specs, goal, batch_file)
+    if enhance:
+        specs = enhance_specs(specs, goal)
+    
+    # Generate each component
+    for spec in specs:
+        print(f"Generating {spec['name']}...")
         
         # Generate the component
         result = composer.run(spec)
@@ -57,17 +107,25 @@ def generate_from_specs(specs_dir, component_type):
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Generate agents and tools from specifications")
+    parser.add_argument("--enhance", action="store_true", help="Enhance specifications with Bedrock first")
+    parser.add_argument("--batch-file", help="Write enhancement prompts to a Bedrock batch inference "
+                                             "input file (<file>.agents.jsonl, <file>.tools.jsonl) instead")
+    args = parser.parse_args()
+    
     print("Generating agents and tools using Agno...")
     
     # Generate agents
     print("\nGenerating agents...")
-    generate_from_specs("specs/agents", "agent")
+    generate_from_specs("specs/agents", "agent", args.enhance,
+                        f"{args.batch_file}.agents.jsonl" if args.batch_file else None)
     
     # Generate tools
     print("\nGenerating tools...")
-    generate_from_specs("specs/tools", "tool")
+    generate_from_specs("specs/tools", "tool", args.enhance,
+                        f"{args.batch_file}.tools.jsonl" if args.batch_file else None)
     
     print("\nGeneration complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
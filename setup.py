@@ -10,6 +10,7 @@ setup(
         "click>=8.0.0",
         "pyyaml>=6.0",
         "boto3>=1.28.0",
+        "numpy>=1.20.0",
     ],
     extras_require={
         "dev": [
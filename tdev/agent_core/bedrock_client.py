@@ -2,38 +2,210 @@
 AWS Bedrock client for T-Developer.
 
 This module provides a client for interacting with AWS Bedrock services.
+Agents should obtain a client through get_bedrock_client(), which shares one
+client per region across the process so boto3 clients, credential
+resolution and HTTP connection pools are created once rather than per agent.
 """
 import os
 import json
+import time
+import random
+import asyncio
+import threading
+import functools
+import contextvars
 import boto3
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from typing import Dict, Any, List, Optional, Iterator, Callable
+
+from tdev.monitoring.replay import get_active_session
+from tdev.monitoring.telemetry import tracer
+from tdev.agent_core.response_cache import response_cache, cache_key, DEFAULT_PARAMETERS
+from tdev.agent_core.single_flight import SingleFlight
+from tdev.agent_core.rate_limit import rate_limiter, is_throttling_error, is_transient_error, BedrockThrottledError
+
+# Shared clients by region, created on first use
+_shared_clients: Dict[str, 'BedrockClient'] = {}
+_shared_clients_lock = threading.Lock()
+
+# Retries for throttled and transiently failing model calls, with exponential backoff and full jitter
+MAX_THROTTLE_RETRIES = int(os.environ.get("TDEV_BEDROCK_MAX_RETRIES", 3))
+THROTTLE_BACKOFF_BASE = float(os.environ.get("TDEV_BEDROCK_BACKOFF_BASE", 0.5))
+
+# Identical in-flight model calls, for sync callers and for awaiting callers
+SINGLE_FLIGHT_ENABLED = os.environ.get("TDEV_SINGLE_FLIGHT", "true").lower() == "true"
+model_flights = SingleFlight()
+async_model_flights = SingleFlight()
+
+# Where an invoke_model response came from; only "model" is a real model call
+RESPONSE_SOURCES = ("model", "cache", "coalesced", "fallback", "mock", "replay")
+
+# Bounded worker pool that runs blocking model calls for ainvoke_model
+_invocation_executor: Optional[ThreadPoolExecutor] = None
+_invocation_executor_lock = threading.Lock()
+
+
+def get_client_config() -> Config:
+    """
+    Build the botocore configuration for Bedrock clients.
+    
+    The HTTP connection pool size and TCP keep-alive are read from the
+    TDEV_BEDROCK_MAX_POOL_CONNECTIONS and TDEV_BEDROCK_TCP_KEEPALIVE
+    environment variables. botocore's own retries are disabled so that
+    throttles reach BedrockClient's adaptive limiter; BedrockClient retries
+    throttles and transient failures itself, so attempts are not multiplied.
+    
+    Returns:
+        A botocore Config instance
+    """
+    return Config(
+        max_pool_connections=int(os.environ.get("TDEV_BEDROCK_MAX_POOL_CONNECTIONS", 50)),
+        tcp_keepalive=os.environ.get("TDEV_BEDROCK_TCP_KEEPALIVE", "true").lower() == "true",
+        # Throttles and transient failures are retried by BedrockClient under its rate limiter
+        retries={"max_attempts": 0}
+    )
+
+
+def _coalesces(parameters: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check whether identical concurrent calls may share one model request.
+    
+    Only calls deterministic enough to cache are coalesced; sharing one
+    sample between callers that asked for varied output would change what
+    they get.
+    """
+    if not SINGLE_FLIGHT_ENABLED:
+        return False
+    temperature = (parameters if parameters is not None else DEFAULT_PARAMETERS).get("temperature", 0.7)
+    return temperature <= response_cache.max_temperature
+
+
+def _count_cache_hit() -> None:
+    """Count a response cache hit on the open trace span, if any."""
+    span = tracer.current_span()
+    if span is not None:
+        span.increment("cache_hits")
+
+
+def get_completion_text(response: Any) -> str:
+    """
+    Get the completion text from a model response.
+    
+    invoke_model returns plain text, but older callers and test doubles may
+    hand back the raw response body, so both forms are accepted.
+    
+    Args:
+        response: The value returned by invoke_model
+        
+    Returns:
+        The completion text
+    """
+    if isinstance(response, dict):
+        if "completion" in response:
+            return response.get("completion") or ""
+        if "outputText" in response:
+            return response.get("outputText") or ""
+        return response.get("results", [{}])[0].get("outputText", "")
+    return response or ""
+
+
+def get_invocation_executor() -> ThreadPoolExecutor:
+    """
+    Get the worker pool used for asynchronous model invocations.
+    
+    The pool size, read from TDEV_BEDROCK_MAX_CONCURRENCY, caps the number
+    of model calls in flight across the process; further calls queue until
+    a worker is free.
+    
+    Returns:
+        The shared ThreadPoolExecutor
+    """
+    global _invocation_executor
+    if _invocation_executor is None:
+        with _invocation_executor_lock:
+            if _invocation_executor is None:
+                _invocation_executor = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("TDEV_BEDROCK_MAX_CONCURRENCY", 32)),
+                    thread_name_prefix="tdev-bedrock"
+                )
+    return _invocation_executor
+
+
+def run_concurrently(fn: Callable[[Any], Any], items: List[Any], max_concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List[Any]:
+    """
+    Apply a function to many items on a bounded set of threads.
+    
+    A dedicated pool is used rather than the shared invocation pool, so a
+    fan-out started from a pool worker cannot starve itself. The caller's
+    context (e.g. the open trace span) is carried over to every call.
+    
+    Args:
+        fn: Function to apply to each item
+        items: The items
+        max_concurrency: Maximum calls in flight (defaults to TDEV_BEDROCK_BATCH_CONCURRENCY)
+        return_exceptions: Whether a failed call's exception is returned in its
+            place instead of being raised
+            
+    Returns:
+        The results, in the order of the items
+    """
+    if max_concurrency is None:
+        max_concurrency = int(os.environ.get("TDEV_BEDROCK_BATCH_CONCURRENCY", 8))
+    
+    def call(item):
+        try:
+            return fn(item)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+    
+    if len(items) <= 1 or max_concurrency <= 1:
+        return [call(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items)), thread_name_prefix="tdev-fanout") as executor:
+        futures = [executor.submit(contextvars.copy_context().run, call, item) for item in items]
+        return [future.result() for future in futures]
+
 
 class BedrockClient:
     """Client for interacting with AWS Bedrock services."""
     
-    def __init__(self, region_name: Optional[str] = None):
+    def __init__(self, region_name: Optional[str] = None, config: Optional[Config] = None,
+                 endpoint_url: Optional[str] = None):
         """
         Initialize the Bedrock client.
         
         Args:
             region_name: AWS region name (defaults to environment variable or 'us-east-1')
+            config: Optional botocore configuration (defaults to get_client_config())
+            endpoint_url: Optional bedrock-runtime endpoint override (defaults to the
+                BEDROCK_ENDPOINT_URL environment variable), e.g. a local BedrockStubServer
         """
         self.region_name = region_name or os.environ.get("AWS_REGION", "us-east-1")
+        self.config = config or get_client_config()
+        self.endpoint_url = endpoint_url or os.environ.get("BEDROCK_ENDPOINT_URL") or None
         try:
             self.bedrock_runtime = boto3.client(
                 service_name="bedrock-runtime",
-                region_name=self.region_name
+                region_name=self.region_name,
+                endpoint_url=self.endpoint_url,
+                config=self.config
             )
             self.bedrock_agent = boto3.client(
                 service_name="bedrock-agent",
-                region_name=self.region_name
+                region_name=self.region_name,
+                config=self.config
             )
         except Exception as e:
             print(f"Warning: Could not initialize Bedrock client: {e}")
             self.bedrock_runtime = None
             self.bedrock_agent = None
     
-    def invoke_model(self, model_id: str, prompt: str, parameters: Dict[str, Any] = None) -> str:
+    def invoke_model(self, model_id: str, prompt: str, parameters: Dict[str, Any] = None,
+                     fallback: bool = True, outcome: Optional[Dict[str, Any]] = None) -> str:
         """
         Invoke a Bedrock model with a prompt.
         
@@ -41,13 +213,195 @@ class BedrockClient:
             model_id: The ID of the model to invoke
             prompt: The prompt to send to the model
             parameters: Optional parameters for the model
+            fallback: Whether a failed call returns fallback text instead of raising
+            outcome: Optional dictionary whose ``source`` is set to where the
+                response came from (see RESPONSE_SOURCES)
             
         Returns:
             The model's response as a string
         """
+        outcome = outcome if outcome is not None else {}
+        session = get_active_session()
+        if session is not None and session.replaying:
+            outcome["source"] = "replay"
+            return session.replay_model(model_id, prompt, parameters)
+        
         if self.bedrock_runtime is None:
-            return f"Mock response for: {prompt}"
+            outcome["source"] = "mock"
+            response = f"Mock response for: {prompt}"
+        else:
+            try:
+                response = self._invoke_cached(model_id, prompt, parameters, outcome)
+            except BedrockThrottledError:
+                # Callers decide how to degrade; a fallback string would be mistaken for output
+                raise
+            except Exception as e:
+                if not fallback:
+                    raise
+                print(f"Warning: Bedrock model invocation failed: {e}")
+                outcome["source"] = "fallback"
+                response = f"Fallback response for: {prompt}"
+        
+        if session is not None and session.recording:
+            session.record_model(model_id, prompt, parameters, response)
+        return response
+    
+    async def ainvoke_model(self, model_id: str, prompt: str, parameters: Dict[str, Any] = None) -> str:
+        """
+        Invoke a Bedrock model without blocking the event loop.
+        
+        The blocking boto3 call runs on the shared invocation pool, so many
+        calls can be awaited concurrently while the pool bounds how many are
+        actually in flight. The caller's context (e.g. the open trace span)
+        is carried over to the worker thread.
+        
+        Args:
+            model_id: The ID of the model to invoke
+            prompt: The prompt to send to the model
+            parameters: Optional parameters for the model
+            
+        Returns:
+            The model's response as a string
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.invoke_model, model_id, prompt, parameters)
+        run = lambda: loop.run_in_executor(get_invocation_executor(), contextvars.copy_context().run, call)
+        if not _coalesces(parameters):
+            return await run()
+        
+        # Identical awaited calls wait on the event loop instead of each holding a worker
+        return await async_model_flights.ado(cache_key(model_id, prompt, parameters), run)
+    
+    def invoke_many(self, model_id: str, prompts: List[str], parameters: Dict[str, Any] = None,
+                    max_concurrency: Optional[int] = None, return_exceptions: bool = False) -> List[str]:
+        """
+        Invoke a Bedrock model with many prompts concurrently.
         
+        Each prompt goes through invoke_model, so the response cache, request
+        coalescing and the model's rate and concurrency limits all apply; the
+        fan-out only keeps enough calls in flight to use them.
+        
+        Args:
+            model_id: The ID of the model to invoke
+            prompts: The prompts to send to the model
+            parameters: Optional parameters for the model, shared by all prompts
+            max_concurrency: Maximum calls in flight (defaults to TDEV_BEDROCK_BATCH_CONCURRENCY)
+            return_exceptions: Whether a failed call's exception is returned in
+                its place instead of being raised
+                
+        Returns:
+            The model's responses, in the order of the prompts
+        """
+        return run_concurrently(
+            lambda prompt: self.invoke_model(model_id, prompt, parameters),
+            list(prompts), max_concurrency, return_exceptions
+        )
+    
+    def prepare_batch_job(self, model_id: str, prompts: List[str], path: str,
+                          parameters: Dict[str, Any] = None, record_ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Write prompts to a JSONL file in the Bedrock batch inference input format.
+        
+        Upload the file to S3 and submit it with the bedrock
+        CreateModelInvocationJob API to process large offline workloads at
+        batch pricing; read the job's output with read_batch_results.
+        
+        Args:
+            model_id: The ID of the model the job will use
+            prompts: The prompts
+            path: Path of the JSONL file to write
+            parameters: Optional parameters for the model, shared by all prompts
+            record_ids: Optional IDs for the records (default to sequential IDs)
+            
+        Returns:
+            The record IDs, in the order of the prompts
+        """
+        if record_ids is None:
+            # Bedrock expects 11-character alphanumeric record IDs
+            record_ids = [f"REC{index:08d}" for index in range(len(prompts))]
+        elif len(record_ids) != len(prompts):
+            raise ValueError("record_ids must have one entry per prompt")
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            for record_id, prompt in zip(record_ids, prompts):
+                record = {"recordId": record_id, "modelInput": self._build_body(model_id, prompt, parameters)}
+                f.write(json.dumps(record) + "\n")
+        return list(record_ids)
+    
+    def read_batch_results(self, model_id: str, path: str) -> Dict[str, Optional[str]]:
+        """
+        Read the completions from a Bedrock batch inference output file.
+        
+        Args:
+            model_id: The ID of the model the job used
+            path: Path of the job's JSONL output file
+            
+        Returns:
+            A mapping of record ID to completion text, or None for failed records
+        """
+        results = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                output = record.get("modelOutput")
+                results[record.get("recordId")] = self._extract_text(model_id, output) if output else None
+        return results
+    
+    def invoke_model_stream(self, model_id: str, prompt: str, parameters: Dict[str, Any] = None,
+                            fallback: bool = True, outcome: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Invoke a Bedrock model and yield the response text as it is generated.
+        
+        Joining the yielded chunks gives the same text invoke_model would
+        return, including the fallback text if the call fails before any
+        output was produced.
+        
+        Args:
+            model_id: The ID of the model to invoke
+            prompt: The prompt to send to the model
+            parameters: Optional parameters for the model
+            fallback: Whether a failed call yields fallback text instead of raising
+            outcome: Optional dictionary whose ``source`` is set to where the
+                response came from (see RESPONSE_SOURCES)
+            
+        Yields:
+            Chunks of the model's response text
+        """
+        outcome = outcome if outcome is not None else {}
+        session = get_active_session()
+        if session is not None and session.replaying:
+            outcome["source"] = "replay"
+            yield session.replay_model(model_id, prompt, parameters)
+            return
+        
+        chunks = []
+        if self.bedrock_runtime is None:
+            outcome["source"] = "mock"
+            chunks.append(f"Mock response for: {prompt}")
+            yield chunks[0]
+        else:
+            try:
+                for chunk in self._invoke_stream_cached(model_id, prompt, parameters, outcome):
+                    chunks.append(chunk)
+                    yield chunk
+            except BedrockThrottledError:
+                raise
+            except Exception as e:
+                if not fallback:
+                    raise
+                print(f"Warning: Bedrock streaming invocation failed: {e}")
+                outcome["source"] = "fallback"
+                if not chunks:
+                    chunks.append(f"Fallback response for: {prompt}")
+                    yield chunks[0]
+        
+        if session is not None and session.recording:
+            session.record_model(model_id, prompt, parameters, "".join(chunks))
+    
+    def _build_body(self, model_id: str, prompt: str, parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the request body for a model, applying default parameters."""
         # Default parameters if none provided
         if parameters is None:
             parameters = {
@@ -56,51 +410,183 @@ class BedrockClient:
                 "topP": 0.9
             }
         
-        try:
-            # Prepare the request body based on the model
-            if "anthropic" in model_id.lower():
-                body = {
-                    "prompt": f"\\n\\nHuman: {prompt}\\n\\nAssistant:",
-                    "max_tokens_to_sample": parameters.get("maxTokens", 512),
+        # Prepare the request body based on the model
+        if "anthropic" in model_id.lower():
+            return {
+                "prompt": f"\\n\\nHuman: {prompt}\\n\\nAssistant:",
+                "max_tokens_to_sample": parameters.get("maxTokens", 512),
+                "temperature": parameters.get("temperature", 0.7),
+                "top_p": parameters.get("topP", 0.9)
+            }
+        elif "amazon" in model_id.lower():
+            return {
+                "inputText": prompt,
+                "textGenerationConfig": {
+                    "maxTokenCount": parameters.get("maxTokens", 512),
                     "temperature": parameters.get("temperature", 0.7),
-                    "top_p": parameters.get("topP", 0.9)
-                }
-            elif "amazon" in model_id.lower():
-                body = {
-                    "inputText": prompt,
-                    "textGenerationConfig": {
-                        "maxTokenCount": parameters.get("maxTokens", 512),
-                        "temperature": parameters.get("temperature", 0.7),
-                        "topP": parameters.get("topP", 0.9)
-                    }
-                }
-            else:
-                # Generic format for other models
-                body = {
-                    "prompt": prompt,
-                    **parameters
+                    "topP": parameters.get("topP", 0.9)
                 }
+            }
+        else:
+            # Generic format for other models
+            return {
+                "prompt": prompt,
+                **parameters
+            }
+    
+    def _invoke_cached(self, model_id: str, prompt: str, parameters: Optional[Dict[str, Any]],
+                       outcome: Dict[str, Any]) -> str:
+        """
+        Serve low-temperature calls from the response cache, invoking the model on a miss.
+        
+        Concurrent identical misses are coalesced so only one request reaches
+        Bedrock. ``outcome["source"]`` is set to "model", "cache" or "coalesced".
+        """
+        outcome["source"] = "model"
+        cacheable = response_cache.is_cacheable(parameters)
+        coalesces = _coalesces(parameters)
+        if not cacheable and not coalesces:
+            return self._invoke_model(model_id, prompt, parameters)
+        
+        key = cache_key(model_id, prompt, parameters)
+        if cacheable:
+            response = response_cache.get(key)
+            if response is not None:
+                _count_cache_hit()
+                outcome["source"] = "cache"
+                return response
+        
+        executed = []
+        
+        def call():
+            executed.append(True)
+            response = self._invoke_model(model_id, prompt, parameters)
+            if cacheable:
+                response_cache.set(key, response)
+            return response
+        
+        if not coalesces:
+            return call()
+        response = model_flights.do(key, call)
+        if not executed:
+            # Another caller's request produced this response
+            outcome["source"] = "coalesced"
+        return response
+    
+    def _invoke_stream_cached(self, model_id: str, prompt: str, parameters: Optional[Dict[str, Any]],
+                              outcome: Dict[str, Any]) -> Iterator[str]:
+        """Stream a response, serving cached responses as a single chunk."""
+        outcome["source"] = "model"
+        if not response_cache.is_cacheable(parameters):
+            yield from self._invoke_model_stream(model_id, prompt, parameters)
+            return
+        
+        key = cache_key(model_id, prompt, parameters)
+        response = response_cache.get(key)
+        if response is not None:
+            _count_cache_hit()
+            outcome["source"] = "cache"
+            yield response
+            return
+        
+        chunks = []
+        for chunk in self._invoke_model_stream(model_id, prompt, parameters):
+            chunks.append(chunk)
+            yield chunk
+        response_cache.set(key, "".join(chunks))
+    
+    def _call_limited(self, model_id: str, call):
+        """
+        Run a Bedrock call under the model's rate and concurrency limits.
+        
+        Throttled calls shrink the model's concurrency limit and are retried
+        with exponential backoff; successful calls let the limit grow.
+        Transient failures (5xx, models not ready, timeouts, dropped
+        connections) are retried with the same backoff and leave the limit
+        alone.
+        
+        Args:
+            model_id: The model ID the call targets
+            call: Function performing the request
             
-            # Invoke the model
-            response = self.bedrock_runtime.invoke_model(
-                modelId=model_id,
-                body=json.dumps(body)
-            )
+        Returns:
+            The call's result
             
-            # Parse the response
-            response_body = json.loads(response["body"].read().decode("utf-8"))
+        Raises:
+            BedrockThrottledError: If the call is still throttled after all retries
+            Exception: The call's own error if it is not retryable, or is still
+                failing transiently after all retries
+        """
+        limits = rate_limiter.get(model_id)
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            limits.bucket.acquire()
+            try:
+                with limits.concurrency.slot() as outcome:
+                    try:
+                        return call()
+                    except Exception as e:
+                        if not is_throttling_error(e):
+                            raise
+                        outcome["throttled"] = True
+            except Exception as e:
+                if not is_transient_error(e) or attempt == MAX_THROTTLE_RETRIES:
+                    raise
+            
+            if attempt < MAX_THROTTLE_RETRIES:
+                span = tracer.current_span()
+                if span is not None:
+                    span.increment("retries")
+                time.sleep(random.uniform(0, THROTTLE_BACKOFF_BASE * 2 ** attempt))
+        
+        raise BedrockThrottledError(
+            f"Bedrock throttled {model_id} after {MAX_THROTTLE_RETRIES + 1} attempts"
+        )
+    
+    def _invoke_model(self, model_id: str, prompt: str, parameters: Dict[str, Any] = None) -> str:
+        """Invoke a Bedrock model, raising on failure."""
+        body = json.dumps(self._build_body(model_id, prompt, parameters))
+        
+        def call():
+            response = self.bedrock_runtime.invoke_model(modelId=model_id, body=body)
+            return json.loads(response["body"].read().decode("utf-8"))
+        
+        # Invoke the model and parse the response
+        return self._extract_text(model_id, self._call_limited(model_id, call))
+    
+    def _extract_text(self, model_id: str, response_body: Dict[str, Any]) -> str:
+        """Extract the completion text from a response body based on model type."""
+        if "anthropic" in model_id.lower():
+            return response_body.get("completion", "")
+        elif "amazon" in model_id.lower():
+            return response_body.get("results", [{}])[0].get("outputText", "")
+        else:
+            return str(response_body)
+    
+    def _invoke_model_stream(self, model_id: str, prompt: str, parameters: Dict[str, Any] = None) -> Iterator[str]:
+        """Stream a Bedrock model response, raising on failure."""
+        body = json.dumps(self._build_body(model_id, prompt, parameters))
+        # The limits apply to opening the stream; throttles are reported at that point
+        response = self._call_limited(
+            model_id,
+            lambda: self.bedrock_runtime.invoke_model_with_response_stream(modelId=model_id, body=body)
+        )
+        
+        for event in response["body"]:
+            chunk = event.get("chunk")
+            if not chunk:
+                continue
+            chunk_body = json.loads(chunk["bytes"].decode("utf-8"))
             
             # Extract text based on model type
             if "anthropic" in model_id.lower():
-                return response_body.get("completion", "")
+                text = chunk_body.get("completion", "")
             elif "amazon" in model_id.lower():
-                return response_body.get("results", [{}])[0].get("outputText", "")
+                text = chunk_body.get("outputText", "")
             else:
-                return str(response_body)
-                
-        except Exception as e:
-            print(f"Warning: Bedrock model invocation failed: {e}")
-            return f"Fallback response for: {prompt}"
+                text = str(chunk_body)
+            
+            if text:
+                yield text
     
     def create_agent(self, name: str, description: str, instructions: str, model_id: str) -> Dict[str, Any]:
         """
@@ -164,4 +650,36 @@ class BedrockClient:
             "action_group": action_group,
             "prepare": prepare_response,
             "deploy": deploy_response
-        }
\ No newline at end of file
+        }
+
+
+def get_bedrock_client(region_name: Optional[str] = None) -> BedrockClient:
+    """
+    Get the process-wide Bedrock client for a region.
+    
+    The client is created on first use and then shared by every caller.
+    boto3 clients are thread-safe, so the shared client can be used from
+    request handler threads concurrently.
+    
+    Args:
+        region_name: AWS region name (defaults to environment variable or 'us-east-1')
+        
+    Returns:
+        The shared BedrockClient instance
+    """
+    region_name = region_name or os.environ.get("AWS_REGION", "us-east-1")
+    client = _shared_clients.get(region_name)
+    if client is None:
+        # Creating clients from the default boto3 session is not thread-safe
+        with _shared_clients_lock:
+            client = _shared_clients.get(region_name)
+            if client is None:
+                client = BedrockClient(region_name=region_name)
+                _shared_clients[region_name] = client
+    return client
+
+
+def reset_bedrock_clients() -> None:
+    """Drop the shared clients so the next caller creates fresh ones."""
+    with _shared_clients_lock:
+        _shared_clients.clear()
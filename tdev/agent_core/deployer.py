@@ -13,7 +13,7 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 from tdev.core.registry import get_registry
-from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.agent_core.bedrock_client import get_bedrock_client
 
 class AgentDeployer:
     """Deployer for AWS Bedrock Agent Core."""
@@ -26,7 +26,7 @@ class AgentDeployer:
             region_name: AWS region name (defaults to environment variable or 'us-east-1')
         """
         self.region_name = region_name or os.environ.get("AWS_REGION", "us-east-1")
-        self.bedrock_client = BedrockClient(region_name=self.region_name)
+        self.bedrock_client = get_bedrock_client(self.region_name)
         try:
             self.lambda_client = boto3.client("lambda", region_name=self.region_name)
         except Exception as e:
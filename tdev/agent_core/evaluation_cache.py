@@ -0,0 +1,75 @@
+"""
+Evaluation cache for T-Developer.
+
+Evaluating a workflow costs a model call, and the same workflow is
+evaluated again every time a cached plan is served for a repeat goal.
+This module caches evaluation results under a canonical content hash of
+the workflow, a digest of the test results and the capability
+fingerprint of the registry, in the same memory and disk tiers as the
+plan cache. The fingerprint changes whenever a capability is added,
+removed or changed, since agent availability affects the evaluation.
+"""
+import os
+import json
+import hashlib
+from typing import Dict, Any, Optional
+
+from tdev.agent_core.plan_cache import CapabilityCache
+from tdev.agent_core.response_cache import MemoryCache, DiskCache
+
+
+def content_hash(value: Any) -> str:
+    """
+    Hash a JSON value canonically, ignoring key order and formatting.
+    
+    Args:
+        value: The value to hash
+        
+    Returns:
+        A hex digest
+    """
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache(CapabilityCache):
+    """Two-tier cache of workflow evaluations with hit/miss metrics."""
+    
+    def key(self, workflow: Dict[str, Any], test_results: Optional[Dict[str, Any]], fingerprint: str) -> str:
+        """
+        Build the cache key for an evaluation.
+        
+        Args:
+            workflow: The workflow definition
+            test_results: The test results the evaluation incorporates, if any
+            fingerprint: The capability fingerprint
+            
+        Returns:
+            A hex digest identifying the evaluation
+        """
+        results_digest = content_hash(test_results) if test_results else "none"
+        return hashlib.sha256(f"{content_hash(workflow)}:{results_digest}:{fingerprint}".encode("utf-8")).hexdigest()
+
+
+def _create_evaluation_cache() -> EvaluationCache:
+    """Create the process-wide evaluation cache from environment settings."""
+    ttl = float(os.environ.get("TDEV_EVAL_CACHE_TTL", 7 * 86400))
+    disk = None
+    if os.environ.get("TDEV_EVAL_CACHE_DISK", "true").lower() == "true":
+        directory = os.environ.get("TDEV_EVAL_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".tdev", "cache", "evaluations"
+        )
+        disk = DiskCache(
+            directory=directory,
+            max_bytes=int(os.environ.get("TDEV_EVAL_CACHE_DISK_MAX_BYTES", 20 * 1024 * 1024)),
+            ttl=ttl
+        )
+    return EvaluationCache(
+        memory=MemoryCache(max_entries=int(os.environ.get("TDEV_EVAL_CACHE_MEMORY_ENTRIES", 500)), ttl=ttl),
+        disk=disk,
+        enabled=os.environ.get("TDEV_EVAL_CACHE_ENABLED", "true").lower() == "true"
+    )
+
+
+# Global evaluation cache instance
+evaluation_cache = _create_evaluation_cache()
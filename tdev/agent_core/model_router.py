@@ -0,0 +1,350 @@
+"""
+Model routing for T-Developer.
+
+ModelRouter picks the Bedrock model for each call instead of using one
+global BEDROCK_MODEL_ID. Every task class (planning, evaluation,
+capability enhancement) has a fallback chain of models in order of
+preference. For each call the chain is filtered by the prompt's size and
+reordered using live statistics: models that were just throttled, are
+failing, or are much slower than the alternatives are tried last. If a
+model is throttled or fails, the call moves on to the next one.
+"""
+import os
+import json
+import time
+import threading
+from typing import Dict, Any, List, Optional, Iterator
+
+from tdev.core.prompt_budget import estimate_tokens
+from tdev.monitoring.telemetry import tracer
+from tdev.agent_core.rate_limit import BedrockThrottledError
+from tdev.agent_core.bedrock_client import run_concurrently
+
+# Task classes used by the agents
+PLANNING = "planning"
+EVALUATION = "evaluation"
+CAPABILITY_ENHANCEMENT = "capability_enhancement"
+DEFAULT = "default"
+
+# Known models: context window (tokens), price per 1,000 input/output tokens (USD)
+MODEL_PROFILES = {
+    "anthropic.claude-v2": {"max_input_tokens": 100000, "input_cost": 0.008, "output_cost": 0.024},
+    "anthropic.claude-v2:1": {"max_input_tokens": 200000, "input_cost": 0.008, "output_cost": 0.024},
+    "anthropic.claude-instant-v1": {"max_input_tokens": 100000, "input_cost": 0.0008, "output_cost": 0.0024},
+    "amazon.titan-text-express-v1": {"max_input_tokens": 8000, "input_cost": 0.0002, "output_cost": 0.0006},
+    "amazon.titan-text-lite-v1": {"max_input_tokens": 4000, "input_cost": 0.00015, "output_cost": 0.0002},
+}
+
+# Assumed for models missing from MODEL_PROFILES
+UNKNOWN_MODEL_PROFILE = {"max_input_tokens": 100000, "input_cost": 0.0, "output_cost": 0.0}
+
+
+def default_routes() -> Dict[str, List[str]]:
+    """
+    Build the routing table from the environment.
+    
+    BEDROCK_MODEL_ID is the preferred model for every task class, with a
+    faster, cheaper model (Claude Instant unless TDEV_FAST_MODEL_ID names
+    another) as its fallback. Setting TDEV_FAST_MODEL_ID also opts
+    evaluation into preferring that model. TDEV_MODEL_ROUTES, a JSON object
+    mapping task classes to lists of model IDs, overrides individual entries.
+    
+    Returns:
+        A mapping of task class to fallback chain
+    """
+    primary = os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-v2")
+    chosen_fast = os.environ.get("TDEV_FAST_MODEL_ID")
+    fast = chosen_fast or "anthropic.claude-instant-v1"
+    routes = {
+        PLANNING: [primary, fast],
+        EVALUATION: [fast, primary] if chosen_fast else [primary, fast],
+        CAPABILITY_ENHANCEMENT: [primary, fast],
+        DEFAULT: [primary],
+    }
+    
+    overrides = os.environ.get("TDEV_MODEL_ROUTES")
+    if overrides:
+        try:
+            routes.update(json.loads(overrides))
+        except ValueError as e:
+            print(f"Warning: Ignoring invalid TDEV_MODEL_ROUTES: {e}")
+    
+    # A model listed twice would only be retried after a failure
+    return {task: list(dict.fromkeys(chain)) for task, chain in routes.items()}
+
+
+class ModelStats:
+    """Live latency, error and cost statistics for one model."""
+    
+    def __init__(self, alpha: float = 0.2):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            alpha: Weight of the newest sample in the moving averages
+        """
+        self.alpha = alpha
+        self.calls = 0
+        self.failures = 0
+        self.throttles = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.cost = 0.0
+        self.cooldown_until = 0.0
+    
+    def record_success(self, latency: float, cost: float) -> None:
+        """Record a successful call."""
+        self.calls += 1
+        self.cost += cost
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = (1 - self.alpha) * self.error_rate
+    
+    def record_failure(self, throttled: bool, cooldown: float) -> None:
+        """Record a failed call, putting the model in cooldown if it was throttled."""
+        self.calls += 1
+        self.failures += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        if throttled:
+            self.throttles += 1
+            self.cooldown_until = time.monotonic() + cooldown
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the statistics to a dictionary."""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "throttles": self.throttles,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "cost": self.cost,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+class ModelRouter:
+    """Chooses a model for each call and fails over along a fallback chain."""
+    
+    def __init__(self, routes: Optional[Dict[str, List[str]]] = None, cooldown: float = 10.0,
+                 max_error_rate: float = 0.5, slow_factor: float = 2.0):
+        """
+        Initialize the router.
+        
+        Args:
+            routes: Fallback chain of model IDs for each task class (defaults to default_routes())
+            cooldown: Seconds a throttled model is tried last
+            max_error_rate: Moving-average error rate above which a model is tried last
+            slow_factor: A model this many times slower than the fastest healthy
+                model in the chain is tried after the others
+        """
+        self.routes = routes if routes is not None else default_routes()
+        self.cooldown = cooldown
+        self.max_error_rate = max_error_rate
+        self.slow_factor = slow_factor
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+    
+    def route(self, task: str, prompt: str) -> List[str]:
+        """
+        Order the models to try for a call.
+        
+        Args:
+            task: The task class
+            prompt: The prompt to send
+            
+        Returns:
+            Model IDs, best first
+        """
+        chain = self.routes.get(task) or self.routes.get(DEFAULT) or [
+            os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-v2")
+        ]
+        
+        # Drop models whose context window cannot hold the prompt, unless none can
+        tokens = estimate_tokens(prompt)
+        fitting = [model_id for model_id in chain if self._profile(model_id)["max_input_tokens"] >= tokens]
+        chain = fitting or chain
+        
+        now = time.monotonic()
+        with self._lock:
+            stats = {model_id: self._stats.get(model_id) for model_id in chain}
+        
+        def healthy(model_id):
+            model_stats = stats[model_id]
+            return model_stats is None or (
+                model_stats.cooldown_until <= now and model_stats.error_rate <= self.max_error_rate
+            )
+        
+        latencies = [stats[model_id].latency for model_id in chain
+                     if healthy(model_id) and stats[model_id] is not None and stats[model_id].latency is not None]
+        fastest = min(latencies) if latencies else None
+        
+        def slow(model_id):
+            model_stats = stats[model_id]
+            return (fastest is not None and model_stats is not None and model_stats.latency is not None
+                    and model_stats.latency > self.slow_factor * fastest)
+        
+        # sorted() is stable, so the chain's order of preference breaks ties
+        return sorted(chain, key=lambda model_id: (not healthy(model_id), slow(model_id)))
+    
+    def invoke(self, client, task: str, prompt: str, parameters: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Invoke the best model for a task, failing over along its chain.
+        
+        The last model in the chain keeps BedrockClient's fallback behaviour,
+        so a call that fails on every model degrades exactly as a single
+        invoke_model call would. Only responses that came from a model
+        request update the statistics and the open span's usage; cached and
+        coalesced responses cost nothing, and fallback text counts as a
+        failure.
+        
+        Args:
+            client: The BedrockClient to call
+            task: The task class
+            prompt: The prompt to send
+            parameters: Optional parameters for the model
+            
+        Returns:
+            The model's response as a string
+            
+        Raises:
+            BedrockThrottledError: If the last model in the chain is throttled as well
+        """
+        models = self.route(task, prompt)
+        for index, model_id in enumerate(models):
+            last = index == len(models) - 1
+            start = time.perf_counter()
+            outcome = {}
+            try:
+                response = client.invoke_model(model_id=model_id, prompt=prompt, parameters=parameters,
+                                               fallback=last, outcome=outcome)
+            except Exception as e:
+                self._record_failure(model_id, e)
+                if last:
+                    raise
+                print(f"Warning: {model_id} failed for {task}, trying {models[index + 1]}: {e}")
+                continue
+            
+            self._record_outcome(model_id, prompt, response, time.perf_counter() - start, outcome)
+            return response
+    
+    def invoke_many(self, client, task: str, prompts: List[str], parameters: Optional[Dict[str, Any]] = None,
+                    max_concurrency: Optional[int] = None, return_exceptions: bool = False) -> List[str]:
+        """
+        Invoke the best models for many prompts of one task class concurrently.
+        
+        Args:
+            client: The BedrockClient to call
+            task: The task class
+            prompts: The prompts to send
+            parameters: Optional parameters for the model, shared by all prompts
+            max_concurrency: Maximum calls in flight (defaults to TDEV_BEDROCK_BATCH_CONCURRENCY)
+            return_exceptions: Whether a failed call's exception is returned in
+                its place instead of being raised
+                
+        Returns:
+            The responses, in the order of the prompts
+        """
+        return run_concurrently(
+            lambda prompt: self.invoke(client, task, prompt, parameters),
+            list(prompts), max_concurrency, return_exceptions
+        )
+    
+    def invoke_stream(self, client, task: str, prompt: str,
+                      parameters: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Stream a response from the best model for a task, failing over along its chain.
+        
+        A model can only be replaced before it has produced any output; a
+        failure mid-stream is raised to the caller.
+        
+        Args:
+            client: The BedrockClient to call
+            task: The task class
+            prompt: The prompt to send
+            parameters: Optional parameters for the model
+            
+        Yields:
+            Chunks of the model's response text
+        """
+        models = self.route(task, prompt)
+        for index, model_id in enumerate(models):
+            last = index == len(models) - 1
+            start = time.perf_counter()
+            chunks = []
+            outcome = {}
+            try:
+                for chunk in client.invoke_model_stream(model_id=model_id, prompt=prompt, parameters=parameters,
+                                                        fallback=last, outcome=outcome):
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                self._record_failure(model_id, e)
+                if last or chunks:
+                    raise
+                print(f"Warning: {model_id} failed for {task}, trying {models[index + 1]}: {e}")
+                continue
+            
+            self._record_outcome(model_id, prompt, "".join(chunks), time.perf_counter() - start, outcome)
+            return
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the live statistics for every model used so far.
+        
+        Returns:
+            A mapping of model ID to its statistics
+        """
+        with self._lock:
+            return {model_id: model_stats.to_dict() for model_id, model_stats in self._stats.items()}
+    
+    def reset(self) -> None:
+        """Forget all statistics."""
+        with self._lock:
+            self._stats.clear()
+    
+    def _profile(self, model_id: str) -> Dict[str, Any]:
+        """Get the profile for a model."""
+        return MODEL_PROFILES.get(model_id, UNKNOWN_MODEL_PROFILE)
+    
+    def _get_stats(self, model_id: str) -> ModelStats:
+        """Get the statistics for a model, creating them if needed (lock held)."""
+        if model_id not in self._stats:
+            self._stats[model_id] = ModelStats()
+        return self._stats[model_id]
+    
+    def _record_outcome(self, model_id: str, prompt: str, response: Any, latency: float,
+                        outcome: Dict[str, Any]) -> None:
+        """Update a model's statistics according to where a returned response came from."""
+        # Clients that do not report a source are assumed to have called the model
+        source = outcome.get("source", "model")
+        if source == "model":
+            self._record_success(model_id, prompt, response, latency)
+        elif source == "fallback":
+            with self._lock:
+                self._get_stats(model_id).record_failure(False, self.cooldown)
+    
+    def _record_success(self, model_id: str, prompt: str, response: Any, latency: float) -> None:
+        """Update a model's statistics after a successful call."""
+        profile = self._profile(model_id)
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(str(response))
+        cost = (input_tokens * profile["input_cost"] + output_tokens * profile["output_cost"]) / 1000
+        with self._lock:
+            self._get_stats(model_id).record_success(latency, cost)
+        
+        # Usage on the open span feeds the per-agent cost profiles
+        span = tracer.current_span()
+        if span is not None:
+            span.set_attribute("model_id", model_id)
+            span.increment("model_calls")
+            span.increment("input_tokens", input_tokens)
+            span.increment("output_tokens", output_tokens)
+            span.increment("cost", cost)
+    
+    def _record_failure(self, model_id: str, error: Exception) -> None:
+        """Update a model's statistics after a failed call."""
+        with self._lock:
+            self._get_stats(model_id).record_failure(isinstance(error, BedrockThrottledError), self.cooldown)
+
+
+# Global model router instance
+model_router = ModelRouter()
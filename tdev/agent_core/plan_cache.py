@@ -0,0 +1,221 @@
+"""
+Plan cache for T-Developer.
+
+Planning a goal costs a model call, yet most goals arrive again and again.
+This module caches planning results under a stable hash of the normalized
+goal and a fingerprint of the registered agents and tools, in a bounded
+in-memory LRU and a size-capped directory on disk (the same tiers as the
+model response cache). Registering, removing or changing a capability
+changes the fingerprint, so plans made against the old registry are no
+longer found.
+"""
+import os
+import re
+import copy
+import json
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from tdev.agent_core.response_cache import MemoryCache, DiskCache
+
+# Registry metadata that affects planning
+FINGERPRINT_FIELDS = ("name", "class", "description", "tags", "triggers", "version")
+
+
+def normalize_goal(goal: str) -> str:
+    """
+    Normalize a goal so trivially different phrasings share a cache entry.
+    
+    Case, surrounding and repeated whitespace, and trailing punctuation are ignored.
+    
+    Args:
+        goal: The goal text
+        
+    Returns:
+        The normalized goal
+    """
+    return re.sub(r"\s+", " ", goal).strip().lower().rstrip(".!?").strip()
+
+
+def goal_hash(goal: str) -> str:
+    """Get a stable hex digest of a normalized goal, the same in every process."""
+    return hashlib.sha256(normalize_goal(goal).encode("utf-8")).hexdigest()
+
+
+def capability_fingerprint(agents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> str:
+    """
+    Fingerprint the capabilities a plan can use.
+    
+    Args:
+        agents: Registry metadata of the available agents
+        tools: Registry metadata of the available tools
+        
+    Returns:
+        A hex digest that changes whenever a capability is added, removed or changed
+    """
+    entries = sorted(
+        json.dumps([component.get(field) for field in FINGERPRINT_FIELDS], default=str)
+        for component in list(agents) + list(tools) if isinstance(component, dict)
+    )
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+class CapabilityCache:
+    """
+    Two-tier cache of results computed against the registered capabilities, with hit/miss metrics.
+    
+    Subclasses define how their keys are built; each key should include the
+    capability fingerprint so results made against an old registry are not found.
+    """
+    
+    def __init__(self, memory: MemoryCache, disk: Optional[DiskCache] = None, enabled: bool = True):
+        """
+        Initialize the cache.
+        
+        Args:
+            memory: The in-memory tier
+            disk: The optional on-disk tier
+            enabled: Whether caching is enabled at all
+        """
+        self.memory = memory
+        self.disk = disk
+        self.enabled = enabled
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+        self._fingerprints: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+    
+    def fingerprint(self, registry: Any, agents: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> str:
+        """
+        Get the capability fingerprint, reusing it while the registry generation is unchanged.
+        
+        Args:
+            registry: The registry the capabilities came from
+            agents: Registry metadata of the available agents
+            tools: Registry metadata of the available tools
+            
+        Returns:
+            The capability fingerprint
+        """
+        generation = getattr(registry, "generation", None)
+        if not isinstance(generation, int):
+            return capability_fingerprint(agents, tools)
+        
+        memo_key = (id(registry), generation)
+        with self._lock:
+            fingerprint = self._fingerprints.get(memo_key)
+        if fingerprint is None:
+            fingerprint = capability_fingerprint(agents, tools)
+            with self._lock:
+                # Only the current generation of each registry is worth keeping
+                self._fingerprints = {
+                    key: value for key, value in self._fingerprints.items() if key[0] != id(registry)
+                }
+                self._fingerprints[memo_key] = fingerprint
+        return fingerprint
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result, checking memory first and then disk.
+        
+        Args:
+            key: The cache key
+            
+        Returns:
+            A copy of the cached result, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        result = self.memory.get(key)
+        if result is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                self.memory.set(key, result, expires_at)
+        
+        self._count("hits" if result is not None else "misses")
+        # Callers may modify the result they get back
+        return copy.deepcopy(result)
+    
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers.
+        
+        Args:
+            key: The cache key
+            result: The result
+        """
+        if not self.enabled:
+            return
+        result = copy.deepcopy(result)
+        self.memory.set(key, result)
+        if self.disk is not None:
+            self.disk.set(key, result)
+        self._count("stores")
+    
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss metrics.
+        
+        Returns:
+            A dictionary of counters, the hit rate and the entry count
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        return stats
+    
+    def _count(self, counter: str) -> None:
+        """Increment a metric counter."""
+        with self._lock:
+            self._stats[counter] += 1
+
+
+class PlanCache(CapabilityCache):
+    """Two-tier cache of planning results with hit/miss metrics."""
+    
+    def key(self, goal: str, fingerprint: str) -> str:
+        """
+        Build the cache key for a goal.
+        
+        Args:
+            goal: The goal text
+            fingerprint: The capability fingerprint
+            
+        Returns:
+            A hex digest identifying the plan
+        """
+        return hashlib.sha256(f"{goal_hash(goal)}:{fingerprint}".encode("utf-8")).hexdigest()
+
+
+def _create_plan_cache() -> PlanCache:
+    """Create the process-wide plan cache from environment settings."""
+    ttl = float(os.environ.get("TDEV_PLAN_CACHE_TTL", 7 * 86400))
+    disk = None
+    if os.environ.get("TDEV_PLAN_CACHE_DISK", "true").lower() == "true":
+        directory = os.environ.get("TDEV_PLAN_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".tdev", "cache", "plans"
+        )
+        disk = DiskCache(
+            directory=directory,
+            max_bytes=int(os.environ.get("TDEV_PLAN_CACHE_DISK_MAX_BYTES", 20 * 1024 * 1024)),
+            ttl=ttl
+        )
+    return PlanCache(
+        memory=MemoryCache(max_entries=int(os.environ.get("TDEV_PLAN_CACHE_MEMORY_ENTRIES", 500)), ttl=ttl),
+        disk=disk,
+        enabled=os.environ.get("TDEV_PLAN_CACHE_ENABLED", "true").lower() == "true"
+    )
+
+
+# Global plan cache instance
+plan_cache = _create_plan_cache()
@@ -0,0 +1,326 @@
+"""
+Similar-goal plan index for T-Developer.
+
+The plan cache only helps when a goal is repeated word for word, but most
+goals are paraphrases of a few dozen intents. This module keeps a vector
+for every goal Bedrock planned successfully: hashed word and character
+trigram features in a NumPy matrix, one L2-normalized row per goal. A new
+goal whose cosine similarity to a past goal planned against the same
+capabilities reaches the threshold reuses that goal's workflow steps
+instead of calling the model. Goals that only differ in their parameters
+(numbers, e-mail addresses, URLs, quoted strings or proper nouns, as in
+"translate it to French" and "... to German") are never matched, since
+the reused steps are not adapted to the new goal.
+
+Entries are appended to a JSONL file as they are added and their vectors
+are rebuilt when the file is loaded, so the index survives restarts
+without rewriting it on every insertion.
+"""
+import os
+import re
+import copy
+import json
+import math
+import hashlib
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from tdev.core.capability_index import stem
+from tdev.agent_core.plan_cache import normalize_goal
+
+_WORD_PATTERN = re.compile(r"\w+")
+# Words that say nothing about the intent of a goal
+_STOP_WORDS = {
+    "a", "an", "and", "the", "to", "of", "for", "in", "on", "with", "from", "into", "by", "is", "it",
+    "that", "this", "these", "those", "be", "as", "or", "at", "me", "my", "i", "please", "can", "you",
+    "give", "get", "show", "provide", "need", "want", "would", "like", "could", "let",
+}
+
+# Parts of a goal that parameterize it rather than describe its intent
+_PARAMETER_PATTERNS = (
+    re.compile(r"https?://\S+"),
+    re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+    re.compile(r"(?<!\w)[\"']([^\"']+)[\"'](?!\w)"),
+    re.compile(r"\d+(?:\.\d+)?"),
+)
+# A capitalized word that does not start a sentence
+_PROPER_NOUN_PATTERN = re.compile(r"(?<![.!?:]\s)(?<=\s)[A-Z][\w-]*")
+
+
+def goal_features(goal: str) -> Counter:
+    """
+    Extract the features of a goal.
+    
+    The stem of every word other than a stop word is a feature, and so is
+    every character trigram of the stem, which lets related forms
+    (summarize/summary) and small typos still overlap.
+    
+    Args:
+        goal: The goal text
+        
+    Returns:
+        Feature counts
+    """
+    features = Counter()
+    for word in _WORD_PATTERN.findall(normalize_goal(goal)):
+        if word in _STOP_WORDS:
+            continue
+        word = stem(word)
+        features["w:" + word] += 1
+        padded = f"<{word}>"
+        for start in range(len(padded) - 2):
+            features["c:" + padded[start:start + 3]] += 1
+    return features
+
+
+def goal_parameters(goal: str) -> frozenset:
+    """
+    Extract the parameters of a goal.
+    
+    URLs, e-mail addresses, quoted strings, numbers and capitalized words
+    that do not start a sentence are parameters: two goals with the same
+    intent but different parameters need different plans.
+    
+    Args:
+        goal: The goal text
+        
+    Returns:
+        The parameters, lowercased
+    """
+    parameters = set()
+    for pattern in _PARAMETER_PATTERNS:
+        for match in pattern.finditer(goal):
+            parameters.add(match.group(match.lastindex or 0).lower())
+    parameters.update(word.lower() for word in _PROPER_NOUN_PATTERN.findall(goal))
+    return frozenset(parameters)
+
+
+def embed_goal(goal: str, dimensions: int) -> np.ndarray:
+    """
+    Embed a goal as an L2-normalized hashed feature vector.
+    
+    Features are hashed with BLAKE2b rather than hash(), so vectors are the
+    same in every process. A hash bit picks each feature's sign, which keeps
+    colliding features from inflating similarities.
+    
+    Args:
+        goal: The goal text
+        dimensions: Length of the vector
+        
+    Returns:
+        The vector, all zeros if the goal has no words
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, count in goal_features(goal).items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        sign = 1.0 if digest >> 63 else -1.0
+        vector[digest % dimensions] += sign * (1.0 + math.log(count))
+    
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class PlanIndex:
+    """Nearest-neighbour index from past goals to their workflow steps."""
+    
+    def __init__(self, path: Optional[str] = None, threshold: float = 0.8, dimensions: int = 2048,
+                 max_entries: int = 2000, enabled: bool = True):
+        """
+        Initialize the index.
+        
+        Args:
+            path: JSONL file the entries persist to (None keeps the index in memory only)
+            threshold: Minimum cosine similarity for a past plan to be reused
+            dimensions: Length of the goal vectors
+            max_entries: Maximum number of goals kept; the oldest are dropped first
+            enabled: Whether the index is used at all
+        """
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        """Drop the in-memory index; it is reloaded from disk on next use."""
+        with self._lock:
+            self._entries: List[Dict[str, Any]] = []
+            self._parameters: List[frozenset] = []
+            self._vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+            self._rows: Dict[str, List[int]] = {}
+            self._positions: Dict[tuple, int] = {}
+            self._loaded = self.path is None
+    
+    def search(self, goal: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar past goal planned against the same capabilities.
+        
+        Args:
+            goal: The goal to plan
+            fingerprint: Capability fingerprint of the current registry
+            
+        Returns:
+            The match (``goal``, ``steps``, ``similarity``) if one reaches the
+            threshold and has the same parameters, otherwise None
+        """
+        if not self.enabled:
+            return None
+        
+        query = embed_goal(goal, self.dimensions)
+        parameters = goal_parameters(goal)
+        with self._lock:
+            self._ensure_loaded()
+            rows = self._rows.get(fingerprint)
+            if not rows:
+                return None
+            similarities = self._vectors[rows] @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            # Most similar first; a near miss with other parameters gives way to the next candidate
+            for best in candidates[np.argsort(-similarities[candidates], kind="stable")]:
+                if self._parameters[rows[best]] == parameters:
+                    entry = self._entries[rows[best]]
+                    similarity = float(similarities[best])
+                    return {"goal": entry["goal"], "steps": copy.deepcopy(entry["steps"]), "similarity": similarity}
+            return None
+    
+    def add(self, goal: str, fingerprint: str, steps: List[Dict[str, Any]]) -> None:
+        """
+        Add a successfully planned goal, replacing an earlier plan for the same goal.
+        
+        Args:
+            goal: The goal text
+            fingerprint: Capability fingerprint the goal was planned against
+            steps: The workflow steps planned for it
+        """
+        if not self.enabled:
+            return
+        
+        entry = {"goal": goal, "fingerprint": fingerprint, "steps": copy.deepcopy(steps)}
+        with self._lock:
+            self._ensure_loaded()
+            self._insert(entry)
+            if len(self._entries) > self.max_entries:
+                # Keep the newest three quarters so the file is not rewritten on every insertion
+                self._rebuild(self._entries[-(self.max_entries * 3 // 4):])
+                self._rewrite()
+            else:
+                self._append(entry)
+    
+    def clear(self) -> None:
+        """Drop all entries, including the file on disk."""
+        with self._lock:
+            self._rebuild([])
+            self._loaded = True
+            if self.path is not None:
+                try:
+                    self.path.unlink()
+                except OSError:
+                    pass
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+    
+    def _insert(self, entry: Dict[str, Any]) -> None:
+        """Add an entry to the in-memory index (lock held)."""
+        identity = (normalize_goal(entry["goal"]), entry["fingerprint"])
+        position = self._positions.get(identity)
+        if position is not None:
+            self._entries[position] = entry
+            self._parameters[position] = goal_parameters(entry["goal"])
+            return
+        
+        count = len(self._entries)
+        if count == len(self._vectors):
+            # Grow geometrically so insertion stays amortized O(1)
+            grown = np.zeros((max(16, 2 * count), self.dimensions), dtype=np.float32)
+            grown[:count] = self._vectors[:count]
+            self._vectors = grown
+        self._vectors[count] = embed_goal(entry["goal"], self.dimensions)
+        self._entries.append(entry)
+        self._parameters.append(goal_parameters(entry["goal"]))
+        self._rows.setdefault(entry["fingerprint"], []).append(count)
+        self._positions[identity] = count
+    
+    def _rebuild(self, entries: List[Dict[str, Any]]) -> None:
+        """Replace the in-memory index with the given entries (lock held)."""
+        self._entries = []
+        self._parameters = []
+        self._vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+        self._rows = {}
+        self._positions = {}
+        for entry in entries:
+            self._insert(entry)
+    
+    def _ensure_loaded(self) -> None:
+        """Load the entries from disk on first use (lock held)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A partially written last line
+                        continue
+                    if isinstance(entry, dict) and {"goal", "fingerprint", "steps"} <= entry.keys():
+                        entries.append(entry)
+        except OSError:
+            return
+        self._rebuild(entries[-self.max_entries:])
+    
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Append an entry to the file (lock held)."""
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            print(f"Warning: Failed to persist plan index entry: {e}")
+    
+    def _rewrite(self) -> None:
+        """Replace the file with the current entries (lock held)."""
+        if self.path is None:
+            return
+        temporary = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8') as f:
+                for entry in self._entries:
+                    f.write(json.dumps(entry, default=str) + "\n")
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Warning: Failed to compact plan index: {e}")
+
+
+def _create_plan_index() -> PlanIndex:
+    """Create the process-wide plan index from environment settings."""
+    path = os.environ.get("TDEV_PLAN_INDEX_PATH") or os.path.join(
+        os.path.expanduser("~"), ".tdev", "cache", "plan_index.jsonl"
+    )
+    return PlanIndex(
+        path=path,
+        threshold=float(os.environ.get("TDEV_PLAN_INDEX_THRESHOLD", 0.8)),
+        dimensions=int(os.environ.get("TDEV_PLAN_INDEX_DIMENSIONS", 2048)),
+        max_entries=int(os.environ.get("TDEV_PLAN_INDEX_MAX_ENTRIES", 2000)),
+        enabled=os.environ.get("TDEV_PLAN_INDEX_ENABLED", "true").lower() == "true"
+    )
+
+
+# Global plan index instance
+plan_index = _create_plan_index()
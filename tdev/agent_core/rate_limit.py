@@ -0,0 +1,271 @@
+"""
+Client-side rate limiting for Bedrock model calls.
+
+Each model ID gets a token bucket that smooths the request rate and an
+adaptive (AIMD) concurrency limit: every successful call raises the limit
+a little, and a throttling response cuts it multiplicatively. Together
+they keep T-Developer just under its Bedrock quota instead of bursting
+into throttles and backing off blindly. is_transient_error() recognizes
+the other failures (5xx, models not ready, timeouts, dropped connections)
+that are worth retrying.
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from botocore.exceptions import HTTPClientError, ConnectionError as BotoConnectionError
+
+# Error codes Bedrock uses to signal that the caller is over quota
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException"}
+
+# Error codes for failures that may succeed when retried
+TRANSIENT_ERROR_CODES = {
+    "ModelNotReadyException", "ModelTimeoutException", "ServiceUnavailableException",
+    "InternalServerException", "InternalFailure", "RequestTimeout", "RequestTimeoutException",
+}
+
+
+class BedrockThrottledError(RuntimeError):
+    """Raised when a model call is still throttled after all retries."""
+    pass
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Check whether an exception is a Bedrock throttling response.
+    
+    Args:
+        error: The exception raised by a boto3 call
+        
+    Returns:
+        True if the error signals that the caller is over quota
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+    return type(error).__name__ in THROTTLING_ERROR_CODES
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether an exception is a transient failure worth retrying.
+    
+    Server errors (5xx), models that are not ready yet, read timeouts and
+    dropped connections are transient; throttles are not, since they are
+    handled by the adaptive limiter.
+    
+    Args:
+        error: The exception raised by a boto3 call
+        
+    Returns:
+        True if the call may succeed when retried
+    """
+    if isinstance(error, (HTTPClientError, BotoConnectionError)):
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        code = response.get("Error", {}).get("Code")
+        return code in TRANSIENT_ERROR_CODES or (status >= 500 and code not in THROTTLING_ERROR_CODES)
+    return type(error).__name__ in TRANSIENT_ERROR_CODES
+
+
+class TokenBucket:
+    """A thread-safe token bucket."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (the allowed burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take a token, waiting for one to accrue if necessary.
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            True if a token was taken, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                wait = min(wait, deadline - now)
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits in-flight calls, adapting the limit with additive increase / multiplicative decrease."""
+    
+    def __init__(self, initial_limit: float = 4, min_limit: float = 1, max_limit: float = 16,
+                 decrease_factor: float = 0.5, decrease_cooldown: float = 1.0):
+        """
+        Initialize the limiter.
+        
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: The limit never drops below this
+            max_limit: The limit never rises above this
+            decrease_factor: Multiplier applied to the limit on a throttle
+            decrease_cooldown: Seconds after a decrease during which further throttles
+                (typically from calls already in flight) do not decrease it again
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+    
+    def acquire(self) -> None:
+        """Wait until a call may start, then count it as in flight."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+    
+    def release(self, throttled: bool = False, succeeded: bool = True) -> None:
+        """
+        Mark a call as finished and adapt the limit.
+        
+        Args:
+            throttled: Whether the call was throttled
+            succeeded: Whether the call succeeded (failures other than throttles leave the limit alone)
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif succeeded:
+                # Roughly +1 once a full window of calls has succeeded
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+    
+    @contextmanager
+    def slot(self) -> Iterator[Dict[str, bool]]:
+        """
+        Hold a concurrency slot for the duration of a ``with`` block.
+        
+        Set ``outcome["throttled"] = True`` inside the block to report a
+        throttle; an exception leaving the block counts as a failure.
+        
+        Yields:
+            A mutable outcome dictionary
+        """
+        self.acquire()
+        outcome = {"throttled": False}
+        succeeded = False
+        try:
+            yield outcome
+            succeeded = not outcome["throttled"]
+        finally:
+            self.release(throttled=outcome["throttled"], succeeded=succeeded)
+
+
+class ModelLimits:
+    """The rate and concurrency limits for one model ID."""
+    
+    def __init__(self, rate: float, burst: float, max_concurrency: float):
+        """
+        Initialize the limits.
+        
+        Args:
+            rate: Requests per second
+            burst: Requests allowed in a burst
+            max_concurrency: Upper bound for the adaptive concurrency limit
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial_limit=min(4, max_concurrency),
+            max_limit=max_concurrency
+        )
+
+
+class RateLimiter:
+    """Hands out per-model limits, created on first use."""
+    
+    def __init__(self, rate: float = 10, burst: float = 20, max_concurrency: float = 16):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rate: Requests per second allowed for each model
+            burst: Burst size allowed for each model
+            max_concurrency: Maximum in-flight calls for each model
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self._models: Dict[str, ModelLimits] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, model_id: str) -> ModelLimits:
+        """
+        Get the limits for a model.
+        
+        Args:
+            model_id: The model ID
+            
+        Returns:
+            The model's limits
+        """
+        limits = self._models.get(model_id)
+        if limits is None:
+            with self._lock:
+                limits = self._models.setdefault(
+                    model_id, ModelLimits(self.rate, self.burst, self.max_concurrency)
+                )
+        return limits
+    
+    def reset(self) -> None:
+        """Forget all per-model state."""
+        with self._lock:
+            self._models.clear()
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    rate=float(os.environ.get("TDEV_BEDROCK_RATE", 10)),
+    burst=float(os.environ.get("TDEV_BEDROCK_BURST", 20)),
+    max_concurrency=float(os.environ.get("TDEV_BEDROCK_MAX_IN_FLIGHT", 16))
+)
@@ -0,0 +1,330 @@
+"""
+Model response cache for T-Developer.
+
+This module caches model completions in two tiers: a bounded in-memory LRU
+for the current process and a size-capped directory on local disk that
+survives restarts. Entries expire after a TTL. Only low-temperature calls
+(such as planning and evaluation) are cached, since their output is close
+to deterministic for a given prompt.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+# Parameters BedrockClient applies when a caller passes none
+DEFAULT_PARAMETERS = {
+    "maxTokens": 512,
+    "temperature": 0.7,
+    "topP": 0.9
+}
+
+
+def cache_key(model_id: str, prompt: str, parameters: Optional[Dict[str, Any]]) -> str:
+    """
+    Build the cache key for a model call.
+    
+    Prompts that differ only in leading or trailing whitespace share a key;
+    whitespace inside a prompt is kept, since indentation and line breaks
+    are significant in code and YAML.
+    
+    Args:
+        model_id: The model ID
+        prompt: The prompt
+        parameters: The sampling parameters, or None for the defaults
+        
+    Returns:
+        A hex digest identifying the call
+    """
+    normalized_prompt = prompt.strip()
+    payload = json.dumps(
+        [model_id, normalized_prompt, parameters if parameters is not None else DEFAULT_PARAMETERS],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """A bounded LRU cache with per-entry expiry."""
+    
+    def __init__(self, max_entries: int = 1000, ttl: float = 86400):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of entries to keep
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (expires_at or time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """A directory of JSON entries capped by total size, evicting least recently used first."""
+    
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 100 * 1024 * 1024, ttl: float = 86400):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory: Directory to store entries in (defaults to ~/.tdev/cache/responses)
+            max_bytes: Maximum total size of stored entries
+            ttl: Seconds an entry stays valid
+        """
+        self.directory = Path(directory) if directory else Path.home() / ".tdev" / "cache" / "responses"
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evictions = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def _path(self, key: str) -> Path:
+        """Get the file path for a key."""
+        return self.directory / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Get (expires_at, value) for a key, or None if it is missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if entry.get("expires_at", 0) < time.time():
+            self._remove(path)
+            return None
+        
+        # Touch the file so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["expires_at"], entry["value"]
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting old entries if the size cap is exceeded."""
+        path = self._path(key)
+        data = json.dumps({"expires_at": time.time() + self.ttl, "value": value}).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write response cache entry: {e}")
+            return
+        
+        with self._lock:
+            if self._size is None:
+                # The first scan already includes the entry just written
+                self._current_size()
+            else:
+                self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            for path in self.directory.glob("*/*.json"):
+                self._remove(path)
+            self._size = 0
+    
+    def _current_size(self) -> int:
+        """Get the total size of stored entries, scanning the directory once."""
+        if self._size is None:
+            self._size = sum(path.stat().st_size for path in self.directory.glob("*/*.json"))
+        return self._size
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache is below 90% of its cap."""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * 0.9
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            self._remove(path)
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+    
+    def _remove(self, path: Path) -> None:
+        """Delete an entry file, ignoring races with other processes."""
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """Two-tier cache of model responses with hit/miss metrics."""
+    
+    def __init__(self, memory: MemoryCache, disk: Optional[DiskCache] = None,
+                 max_temperature: float = 0.3, enabled: bool = True):
+        """
+        Initialize the cache.
+        
+        Args:
+            memory: The in-memory tier
+            disk: The optional on-disk tier
+            max_temperature: Highest sampling temperature whose responses are cached
+            enabled: Whether caching is enabled at all
+        """
+        self.memory = memory
+        self.disk = disk
+        self.max_temperature = max_temperature
+        self.enabled = enabled
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+    
+    def is_cacheable(self, parameters: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether responses for these sampling parameters may be cached.
+        
+        Args:
+            parameters: The sampling parameters, or None for the defaults
+            
+        Returns:
+            True if the call is low-temperature enough to cache
+        """
+        if not self.enabled:
+            return False
+        temperature = (parameters if parameters is not None else DEFAULT_PARAMETERS).get("temperature", 0.7)
+        return temperature <= self.max_temperature
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a response, checking memory first and then disk.
+        
+        Args:
+            key: The cache key
+            
+        Returns:
+            The cached response, or None on a miss
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                # Promote to memory, keeping the original expiry
+                self.memory.set(key, value, expires_at)
+                self._count("disk_hits")
+                return value
+        
+        self._count("misses")
+        return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a response in both tiers.
+        
+        Args:
+            key: The cache key
+            value: The response
+        """
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count("stores")
+    
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss metrics.
+        
+        Returns:
+            A dictionary of counters, the hit rate, entry count and evictions
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["evictions"] = self.memory.evictions + (self.disk.evictions if self.disk is not None else 0)
+        return stats
+    
+    def _count(self, counter: str) -> None:
+        """Increment a metric counter."""
+        with self._lock:
+            self._stats[counter] += 1
+
+
+def _create_response_cache() -> ResponseCache:
+    """Create the process-wide response cache from environment settings."""
+    ttl = float(os.environ.get("TDEV_CACHE_TTL", 86400))
+    disk = None
+    if os.environ.get("TDEV_CACHE_DISK", "true").lower() == "true":
+        disk = DiskCache(
+            directory=os.environ.get("TDEV_CACHE_DIR") or None,
+            max_bytes=int(os.environ.get("TDEV_CACHE_DISK_MAX_BYTES", 100 * 1024 * 1024)),
+            ttl=ttl
+        )
+    return ResponseCache(
+        memory=MemoryCache(max_entries=int(os.environ.get("TDEV_CACHE_MEMORY_ENTRIES", 1000)), ttl=ttl),
+        disk=disk,
+        max_temperature=float(os.environ.get("TDEV_CACHE_MAX_TEMPERATURE", 0.3)),
+        enabled=os.environ.get("TDEV_CACHE_ENABLED", "true").lower() == "true"
+    )
+
+
+# Global response cache instance
+response_cache = _create_response_cache()
@@ -0,0 +1,115 @@
+"""
+Request coalescing for T-Developer.
+
+SingleFlight makes concurrent callers asking for the same key share one
+execution: the first caller runs the work and everyone else who arrives
+while it is in flight waits for, and receives, the same result or
+exception. It is used to collapse bursts of identical model calls into a
+single Bedrock request.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+    
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "shared": 0}
+    
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Get the future for a key, creating it if this caller is the leader."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["shared"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._stats["executed"] += 1
+            return future, True
+    
+    def _finish(self, key: str) -> None:
+        """Forget a finished call so the next caller starts a new one."""
+        with self._lock:
+            self._calls.pop(key, None)
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` unless a call with the same key is already in flight.
+        
+        Args:
+            key: Identifies equivalent calls
+            fn: The work to run if this caller is the leader
+            
+        Returns:
+            The result of the leader's call
+            
+        Raises:
+            Exception: Whatever the leader's call raised
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+    
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` unless a call with the same key is already in flight.
+        
+        Waiters are suspended on the event loop rather than holding a thread.
+        
+        Args:
+            key: Identifies equivalent calls
+            fn: Returns the awaitable to run if this caller is the leader
+            
+        Returns:
+            The result of the leader's call
+            
+        Raises:
+            Exception: Whatever the leader's call raised
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+    
+    def in_flight(self) -> int:
+        """Get the number of calls currently in flight."""
+        with self._lock:
+            return len(self._calls)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing metrics.
+        
+        Returns:
+            Calls executed, and calls that shared another call's result
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,366 @@
+"""
+Local stand-in for the Bedrock runtime API.
+
+BedrockStubServer answers the bedrock-runtime InvokeModel and
+InvokeModelWithResponseStream operations over plain HTTP, so the whole
+stack can be load-tested without AWS. Point BedrockClient at it with the
+BEDROCK_ENDPOINT_URL environment variable. Latency, error and throttle
+rates are configurable, and responses are either scripted or generated:
+planner and evaluator prompts get valid JSON plans and evaluations.
+"""
+import re
+import json
+import time
+import base64
+import random
+import struct
+import binascii
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Union
+from urllib.parse import unquote
+
+# Error type header values botocore maps to exception codes
+THROTTLING_ERROR_TYPE = "ThrottlingException"
+SERVER_ERROR_TYPE = "ServiceUnavailableException"
+
+
+class LatencyDistribution:
+    """A distribution of simulated model latencies, in seconds."""
+    
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+    
+    def __init__(self, kind: str = "fixed", *params: float):
+        """
+        Initialize the distribution.
+        
+        Args:
+            kind: One of fixed (seconds), uniform (low, high), normal (mean, stddev),
+                lognormal (mu, sigma of the underlying normal) or exponential (mean)
+            params: The distribution's parameters
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = params or (0.0,)
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyDistribution':
+        """
+        Parse a distribution from a spec such as ``uniform:0.05,0.2``.
+        
+        A bare number is a fixed latency.
+        
+        Args:
+            spec: The distribution spec
+            
+        Returns:
+            A LatencyDistribution instance
+        """
+        kind, _, params = spec.partition(":")
+        try:
+            return cls("fixed", float(kind))
+        except ValueError:
+            pass
+        return cls(kind, *(float(param) for param in params.split(",") if param))
+    
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency, never negative."""
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params[:2])
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params[:2])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(*self.params[:2])
+        else:
+            value = rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+def default_response(prompt: str) -> str:
+    """
+    Generate a plausible completion for a prompt.
+    
+    Planner prompts get a JSON array of steps using the listed agents and
+    evaluator prompts get a JSON evaluation, so orchestration follows its
+    model-driven path rather than the rule-based fallbacks.
+    
+    Args:
+        prompt: The prompt text
+        
+    Returns:
+        The completion text
+    """
+    if "AI workflow planner" in prompt:
+        match = re.search(r"Available agents:\s*\n(.*)", prompt)
+        # Skip the "(and N more)" note a budgeted agent list may end with
+        agents = [name.strip() for name in match.group(1).split(",") if re.fullmatch(r"\s*\w+\s*", name)] if match else []
+        steps = [{"agent": agent} for agent in agents[:3]] or [{"agent": "EchoAgent"}]
+        return " " + json.dumps(steps)
+    if "AI workflow evaluator" in prompt:
+        return " " + json.dumps({
+            "score": 85,
+            "metrics": {
+                "structural_completeness": 0.9,
+                "agent_suitability": 0.85,
+                "error_resilience": 0.8,
+                "efficiency": 0.85,
+                "clarity": 0.85
+            },
+            "suggestions": []
+        })
+    return f" Stub response for: {prompt[:80]}"
+
+
+class ResponseScript:
+    """Chooses the completion for each request from scripted rules."""
+    
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the script.
+        
+        Args:
+            rules: Rules tried in order, each with a ``match`` regex (searched in
+                the prompt; omit to match everything) and a ``response`` that is
+                either a string or a list of strings returned in turn
+        """
+        self.rules = []
+        for rule in rules or []:
+            responses = rule["response"]
+            self.rules.append({
+                "pattern": re.compile(rule.get("match", ""), re.DOTALL),
+                "responses": responses if isinstance(responses, list) else [responses],
+                "calls": 0
+            })
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, path: str) -> 'ResponseScript':
+        """Load rules from a JSON file holding a list of rules."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+    
+    def respond(self, prompt: str) -> str:
+        """
+        Get the completion for a prompt.
+        
+        Args:
+            prompt: The prompt text
+            
+        Returns:
+            The first matching rule's next response, or the default response
+        """
+        with self._lock:
+            for rule in self.rules:
+                if rule["pattern"].search(prompt):
+                    response = rule["responses"][rule["calls"] % len(rule["responses"])]
+                    rule["calls"] += 1
+                    return response
+        return default_response(prompt)
+
+
+def encode_event(payload: bytes, event_type: str = "chunk") -> bytes:
+    """
+    Encode one message in the AWS event stream format used for streamed responses.
+    
+    Args:
+        payload: The message payload
+        event_type: The event type header
+        
+    Returns:
+        The encoded message
+    """
+    headers = b""
+    for name, value in ((":event-type", event_type), (":content-type", "application/json"),
+                        (":message-type", "event")):
+        name_bytes, value_bytes = name.encode("utf-8"), value.encode("utf-8")
+        # Header value type 7 is a string
+        headers += struct.pack(">B", len(name_bytes)) + name_bytes + struct.pack(">BH", 7, len(value_bytes)) + value_bytes
+    
+    prelude = struct.pack(">II", 16 + len(headers) + len(payload), len(headers))
+    message = prelude + struct.pack(">I", binascii.crc32(prelude)) + headers + payload
+    return message + struct.pack(">I", binascii.crc32(message))
+
+
+def _completion_body(model_id: str, text: str, final: bool = True) -> Dict[str, Any]:
+    """Build a response body in the shape the model family uses."""
+    if "amazon" in model_id.lower():
+        if final:
+            return {"results": [{"outputText": text, "completionReason": "FINISH"}]}
+        return {"outputText": text}
+    return {"completion": text, "stop_reason": "stop_sequence" if final else None}
+
+
+def _request_prompt(body: Dict[str, Any]) -> str:
+    """Get the prompt text from a request body, without the Human/Assistant wrapper."""
+    prompt = body.get("prompt") or body.get("inputText") or ""
+    match = re.fullmatch(r"(?:\\n|\s)*Human:\s*(.*?)(?:\\n|\s)*Assistant:\s*", prompt, re.DOTALL)
+    return match.group(1) if match else prompt
+
+
+class BedrockStubServer:
+    """An HTTP server that stands in for bedrock-runtime."""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: Union[LatencyDistribution, str, float] = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 script: Optional[ResponseScript] = None, chunk_size: int = 16,
+                 seed: Optional[int] = None):
+        """
+        Initialize the server.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Latency before each response, as a distribution, a spec or seconds
+            error_rate: Fraction of requests that fail with a server error
+            throttle_rate: Fraction of requests that are throttled
+            script: Scripted responses (defaults to generated responses)
+            chunk_size: Characters per chunk in streamed responses
+            seed: Seed for the random source, for reproducible runs
+        """
+        if not isinstance(latency, LatencyDistribution):
+            latency = LatencyDistribution.parse(str(latency))
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.script = script or ResponseScript()
+        self.chunk_size = chunk_size
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats = {"requests": 0, "throttled": 0, "errors": 0, "streamed": 0}
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+    
+    @property
+    def endpoint_url(self) -> str:
+        """The URL to use as the bedrock-runtime endpoint."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'BedrockStubServer':
+        """Serve requests on a background thread."""
+        # A short poll interval keeps stop() quick for tests that start many servers
+        self._thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,),
+                                        name="bedrock-stub", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def serve_forever(self) -> None:
+        """Serve requests on the calling thread until interrupted."""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+    
+    def __enter__(self) -> 'BedrockStubServer':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get request counters.
+        
+        Returns:
+            Requests received, and how many were throttled, failed or streamed
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+    
+    def _count(self, counter: str) -> None:
+        """Increment a request counter."""
+        with self._stats_lock:
+            self._stats[counter] += 1
+    
+    def _draw(self) -> Dict[str, float]:
+        """Draw the fault roll and latency for one request."""
+        with self._rng_lock:
+            return {"roll": self._rng.random(), "latency": self.latency.sample(self._rng)}
+    
+    def _make_handler(self):
+        """Build the request handler class bound to this server."""
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_POST(self):
+                match = re.fullmatch(r"/model/([^/]+)/(invoke|invoke-with-response-stream)", self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                raw_body = self.rfile.read(length)
+                if not match:
+                    self._send_error(404, "UnknownOperationException", f"Unknown path: {self.path}")
+                    return
+                
+                model_id, operation = unquote(match.group(1)), match.group(2)
+                server._count("requests")
+                draw = server._draw()
+                time.sleep(draw["latency"])
+                
+                # Throttles and errors are drawn from one roll so the rates are exclusive
+                if draw["roll"] < server.throttle_rate:
+                    server._count("throttled")
+                    self._send_error(429, THROTTLING_ERROR_TYPE, "Too many requests, please wait before trying again.")
+                    return
+                if draw["roll"] < server.throttle_rate + server.error_rate:
+                    server._count("errors")
+                    self._send_error(503, SERVER_ERROR_TYPE, "The service is temporarily unavailable.")
+                    return
+                
+                try:
+                    body = json.loads(raw_body or b"{}")
+                except ValueError:
+                    self._send_error(400, "ValidationException", "Malformed input request")
+                    return
+                text = server.script.respond(_request_prompt(body))
+                
+                if operation == "invoke":
+                    self._send(200, "application/json", json.dumps(_completion_body(model_id, text)).encode("utf-8"))
+                else:
+                    server._count("streamed")
+                    self._send_stream(model_id, text)
+            
+            def _send(self, status: int, content_type: str, payload: bytes, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def _send_error(self, status: int, error_type: str, message: str):
+                self._send(status, "application/json", json.dumps({"message": message}).encode("utf-8"),
+                           {"x-amzn-ErrorType": error_type})
+            
+            def _send_stream(self, model_id: str, text: str):
+                size = max(1, server.chunk_size)
+                pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+                payload = b""
+                for index, piece in enumerate(pieces):
+                    chunk = _completion_body(model_id, piece, final=False)
+                    if index == len(pieces) - 1 and "completion" in chunk:
+                        chunk["stop_reason"] = "stop_sequence"
+                    encoded = base64.b64encode(json.dumps(chunk).encode("utf-8")).decode("ascii")
+                    payload += encode_event(json.dumps({"bytes": encoded}).encode("utf-8"))
+                self._send(200, "application/vnd.amazon.eventstream", payload)
+            
+            def log_message(self, format, *args):
+                # Load tests produce far too many requests to log each one
+                pass
+        
+        return Handler
@@ -1,16 +1,193 @@
 import os
 import ast
-import re
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, List, Optional, Tuple
 from tdev.core.agent import Agent
 
+# Base classes and decorators that mark each kind of component
+TEAM_BASES = {"Team"}
+AGENT_BASES = {"Agent"}
+TOOL_BASES = {"Tool"}
+TOOL_DECORATORS = {"tool"}
+
+# Statements and expressions that branch; boolean operators and comprehensions are counted separately
+DECISION_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler) + (
+    (ast.match_case,) if hasattr(ast, "match_case") else ()
+)
+
+# Reusability grade of each component type
+REUSABILITY = {"tool": "A", "agent": "B", "team": "D"}
+
+# Maximum number of analyses kept in the content-hash cache
+ANALYSIS_CACHE_SIZE = int(os.environ.get("TDEV_CLASSIFIER_CACHE_SIZE", 1024))
+
+# Analyses by SHA-256 of the source, and file digests by path: path -> (mtime_ns, size, digest)
+_analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_file_digests: Dict[str, Tuple[int, int, str]] = {}
+_cache_lock = threading.Lock()
+
+
+def _name_of(node: ast.AST) -> Optional[str]:
+    """Get the final name of a base class or decorator expression (``Team``, ``core.Team``, ``tool(...)``)."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+class _ComponentVisitor(ast.NodeVisitor):
+    """Collects component definitions and decision points in one walk of a module."""
+    
+    def __init__(self):
+        self.teams: List[str] = []
+        self.agents: List[str] = []
+        self.tools: List[str] = []
+        self.team_members = set()
+        self.decision_points = 0
+        # Classes defined in this module that derive from a component base
+        self._kinds: Dict[str, str] = {}
+        # Imported names by the alias they are bound to (``Agent as BaseAgent``)
+        self._aliases: Dict[str, str] = {}
+    
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.asname:
+                self._aliases[alias.asname] = alias.name.rsplit(".", 1)[-1]
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        for alias in node.names:
+            if alias.asname:
+                self._aliases[alias.asname] = alias.name
+    
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        bases = [self._resolve(_name_of(base)) for base in node.bases]
+        kinds = [self._kinds.get(base) or self._base_kind(base) for base in bases]
+        for kind, found in (("team", self.teams), ("agent", self.agents), ("tool", self.tools)):
+            if kind in kinds:
+                self._kinds[node.name] = kind
+                found.append(node.name)
+                break
+        self.generic_visit(node)
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        if any(self._resolve(_name_of(decorator)) in TOOL_DECORATORS for decorator in node.decorator_list):
+            self.tools.append(node.name)
+        self.generic_visit(node)
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_Call(self, node: ast.Call) -> None:
+        # Team members are added with self.add_agent("name", agent)
+        if isinstance(node.func, ast.Attribute) and node.func.attr == "add_agent":
+            key = node.args[0] if node.args else None
+            if isinstance(key, ast.Constant):
+                self.team_members.add(key.value)
+            else:
+                self.team_members.add(id(node))
+        self.generic_visit(node)
+    
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self.decision_points += len(node.values) - 1
+        self.generic_visit(node)
+    
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self.decision_points += 1 + len(node.ifs)
+        self.generic_visit(node)
+    
+    def generic_visit(self, node: ast.AST) -> None:
+        if isinstance(node, DECISION_NODES):
+            self.decision_points += 1
+        super().generic_visit(node)
+    
+    def _resolve(self, name: Optional[str]) -> Optional[str]:
+        """Get the imported name an alias stands for, or the name itself."""
+        return self._aliases.get(name, name)
+    
+    @staticmethod
+    def _base_kind(base: Optional[str]) -> Optional[str]:
+        if base in TEAM_BASES:
+            return "team"
+        if base in AGENT_BASES:
+            return "agent"
+        if base in TOOL_BASES:
+            return "tool"
+        return None
+
+
+def _strip_suffix(name: str, suffix: str) -> str:
+    """Drop a type suffix from a class name (``EchoAgent`` -> ``Echo``)."""
+    return name[:-len(suffix)] if name.endswith(suffix) and len(name) > len(suffix) else name
+
+
+def analyze_source(content: str, default_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Classify Python source with a single walk of its syntax tree.
+    
+    Teams subclass ``Team`` and have a brain per member they add (at least
+    two); agents subclass ``Agent`` and have a brain per agent class; tools
+    subclass ``Tool`` or use the ``@tool`` decorator and have none. Bases
+    and decorators imported under an alias (``Agent as BaseAgent``) count
+    as well. Source with no component is an agent if it has decision
+    points, else a tool.
+    
+    Args:
+        content: The source code
+        default_name: Name to use when no component name is found
+        
+    Returns:
+        The classification, or None if the source does not parse
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    
+    visitor = _ComponentVisitor()
+    visitor.visit(tree)
+    
+    if visitor.teams:
+        component_type, name = "team", _strip_suffix(visitor.teams[0], "Team")
+        brain_count = max(2, len(visitor.team_members))
+    elif visitor.agents:
+        component_type, name = "agent", _strip_suffix(visitor.agents[0], "Agent")
+        brain_count = len(visitor.agents)
+    elif visitor.tools:
+        component_type, name, brain_count = "tool", visitor.tools[0], 0
+    elif visitor.decision_points:
+        component_type, name, brain_count = "agent", default_name, 1
+    else:
+        component_type, name, brain_count = "tool", default_name, 0
+    
+    return {
+        "type": component_type,
+        "name": name,
+        "brain_count": brain_count,
+        "reusability": REUSABILITY[component_type],
+        "decision_points": visitor.decision_points
+    }
+
+
+def clear_classifier_cache() -> None:
+    """Drop all cached analyses and file digests."""
+    with _cache_lock:
+        _analysis_cache.clear()
+        _file_digests.clear()
+
+
 class ClassifierAgent(Agent):
     """
     Agent responsible for classifying components as Tool, Agent, or Team.
     
     The ClassifierAgent analyzes code to determine its type based on
     the number of decision points (brains) and coordination presence.
+    Analyses are cached by a hash of the source, and files are only read
+    again when their modification time or size changes.
     """
     
     def run(self, request: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
@@ -34,103 +211,84 @@ class ClassifierAgent(Agent):
         
         print(f"ClassifierAgent: Classifying {target_file}")
         
-        # Read the file content
+        # Extract the file name without extension
+        file_name = Path(target_file).stem
+        
+        # Read the file only if it changed, and parse it only if its content is new
         try:
-            with open(target_file, 'r') as f:
-                content = f.read()
+            digest, content = self._file_digest(target_file)
+            result = self._classify(digest, content, file_name, lambda: self._read(target_file))
         except Exception as e:
             print(f"Error reading file: {e}")
             return self._default_classification(target_file)
+        return result if result is not None else self._default_classification(target_file)
+    
+    def _classify_code_content(self, content: str) -> Dict[str, Any]:
+        """Classify code content directly."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        result = self._classify(digest, content, "unknown", lambda: content)
+        return result if result is not None else self._default_classification("unknown")
+    
+    def _classify(self, digest: str, content: Optional[str], default_name: str, read) -> Optional[Dict[str, Any]]:
+        """
+        Look up the analysis of some source by its hash, analyzing it on a miss.
         
-        # Extract the file name without extension
-        file_name = Path(target_file).stem
-        
-        # Check if it's a team (inherits from Team)
-        if self._is_team(content):
-            return {
-                "type": "team",
-                "name": self._extract_name(file_name, content, "team"),
-                "brain_count": 2,
-                "reusability": "D"
-            }
+        Args:
+            digest: SHA-256 of the source
+            content: The source, or None if it has not been read
+            default_name: Name to use when no component name is found
+            read: Callable returning the source when it has to be analyzed
+            
+        Returns:
+            A copy of the classification, or None if the source does not parse
+        """
+        with _cache_lock:
+            result = _analysis_cache.get(digest)
+            if result is not None:
+                _analysis_cache.move_to_end(digest)
         
-        # Check if it's a tool (has @tool decorator or no decision logic)
-        elif self._is_tool(content):
-            return {
-                "type": "tool",
-                "name": self._extract_name(file_name, content, "tool"),
-                "brain_count": 0,
-                "reusability": "A"
-            }
+        if result is None:
+            result = analyze_source(content if content is not None else read())
+            if result is None:
+                return None
+            with _cache_lock:
+                _analysis_cache[digest] = result
+                while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    _analysis_cache.popitem(last=False)
         
-        # Default to agent
-        else:
-            return {
-                "type": "agent",
-                "name": self._extract_name(file_name, content, "agent"),
-                "brain_count": 1,
-                "reusability": "B"
-            }
+        # The same source may be saved under several file names
+        return {**result, "name": result["name"] or default_name}
     
-    def _is_team(self, content):
-        """Check if the content defines a Team."""
-        # Check for Team import and inheritance
-        has_import = ("from tdev.core.team import Team" in content or "import Team" in content)
-        has_class = ("class" in content and "(Team)" in content)
-        return has_import and has_class
-    
-    def _is_tool(self, content):
-        """Check if the content defines a Tool."""
-        # Check for @tool decorator
-        return "@tool" in content
-    
-    def _extract_name(self, file_name, content, component_type):
-        """Extract the component name from the content."""
-        if component_type == "team":
-            # Try to find class NameTeam(Team):
-            match = re.search(r'class\s+([A-Za-z0-9_]+)Team\s*\(\s*Team\s*\)', content)
-            if match:
-                return match.group(1)
-        elif component_type == "agent":
-            # Try to find class NameAgent(Agent):
-            match = re.search(r'class\s+([A-Za-z0-9_]+)Agent\s*\(\s*Agent\s*\)', content)
-            if match:
-                return match.group(1)
-        elif component_type == "tool":
-            # Try to find @tool\ndef name_tool
-            match = re.search(r'@tool\s*\n\s*def\s+([A-Za-z0-9_]+)', content)
-            if match:
-                return match.group(1)
+    def _file_digest(self, target_file: str) -> Tuple[str, Optional[str]]:
+        """
+        Get the SHA-256 of a file, reading it only if it changed since it was last hashed.
+        
+        Returns:
+            The digest and the content, or None for the content if the file was not read
+        """
+        try:
+            stat = os.stat(target_file)
+        except OSError:
+            stat = None
         
-        # Default to file name
-        return file_name
+        path = os.path.abspath(target_file)
+        if stat is not None:
+            with _cache_lock:
+                entry = _file_digests.get(path)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                return entry[2], None
+        
+        content = self._read(target_file)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if stat is not None:
+            with _cache_lock:
+                _file_digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest, content
     
-    def _classify_code_content(self, content: str) -> Dict[str, Any]:
-        """Classify code content directly."""
-        # Check if it's a team
-        if self._is_team(content):
-            return {
-                "type": "team",
-                "name": self._extract_name("unknown", content, "team"),
-                "brain_count": 2,
-                "reusability": "D"
-            }
-        # Check if it's a tool
-        elif self._is_tool(content):
-            return {
-                "type": "tool",
-                "name": self._extract_name("unknown", content, "tool"),
-                "brain_count": 0,
-                "reusability": "A"
-            }
-        # Default to agent
-        else:
-            return {
-                "type": "agent",
-                "name": self._extract_name("unknown", content, "agent"),
-                "brain_count": 1,
-                "reusability": "B"
-            }
+    def _read(self, target_file: str) -> str:
+        """Read the source of a file."""
+        with open(target_file, 'r') as f:
+            return f.read()
     
     def _default_classification(self, target_file):
         """Provide a default classification based on file path."""
@@ -154,4 +312,4 @@ class ClassifierAgent(Agent):
                 "name": Path(target_file).stem,
                 "brain_count": 1,
                 "reusability": "B"
-            }
\ No newline at end of file
+            }
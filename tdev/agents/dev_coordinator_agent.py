@@ -4,7 +4,7 @@ DevCoordinator Agent - The central orchestrator for T-Developer using Agent Squa
 This agent coordinates the core agents (Classifier, Planner, Evaluator, WorkflowExecutor)
 to fulfill user requests end-to-end, replacing the legacy MetaAgent.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Generator
 import asyncio
 import os
 import json
@@ -13,7 +13,18 @@ from tdev.core.agent import Agent
 from tdev.core.registry import get_registry
 from tdev.agent_squad.agents import Agent as SquadAgent, AgentOptions, SupervisorAgent, SupervisorAgentOptions, BedrockAgent
 from tdev.agent_squad.wrappers import SquadWrapperAgent
-from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.agent_core.bedrock_client import get_bedrock_client, get_completion_text, run_concurrently
+from tdev.agent_core.model_router import model_router, CAPABILITY_ENHANCEMENT
+
+# Sampling parameters for capability enhancement calls
+ENHANCEMENT_PARAMETERS = {
+    "maxTokens": 1000,
+    "temperature": 0.4,
+    "topP": 0.9
+}
+
+# Candidate workflows planned to replace a plan the evaluator says needs improvement
+IMPROVEMENT_CANDIDATES = int(os.environ.get("TDEV_IMPROVEMENT_CANDIDATES", 3))
 
 
 class DevCoordinatorAgent(Agent):
@@ -29,7 +40,7 @@ class DevCoordinatorAgent(Agent):
         self.registry = get_registry()
         self.bedrock_client = None
         try:
-            self.bedrock_client = BedrockClient()
+            self.bedrock_client = get_bedrock_client()
         except Exception as e:
             print(f"Warning: Could not initialize Bedrock client: {e}")
         self.supervisor = self._create_supervisor()
@@ -88,7 +99,15 @@ class DevCoordinatorAgent(Agent):
             request: A dictionary containing the user request:
                 - goal: The user's goal or request
                 - code: Optional code to classify
-                - options: Optional configuration options
+                - options: Optional configuration options, including:
+                    - input: Input data for the workflow
+                    - candidates: Number of candidate workflows to plan
+                      concurrently and choose between by evaluation score;
+                      with one, TDEV_IMPROVEMENT_CANDIDATES candidates are
+                      planned only if the evaluator says the plan needs improvement
+                    - max_latency_ms: Reject workflows estimated to take longer
+                    - max_cost: Reject workflows estimated to cost more in
+                      model calls (USD)
                 
         Returns:
             A dictionary containing the result of processing the request:
@@ -126,81 +145,248 @@ class DevCoordinatorAgent(Agent):
             "type": "classification"
         }
     
+    def run_stream(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Process a user request, yielding progress events as agents work.
+        
+        Events are dictionaries with a ``type`` key:
+            - stage: a new stage started (``stage``)
+            - token / step: streamed output from the planner or evaluator (``agent``)
+            - candidates: scores of the candidate workflows and the index of
+              the selected one, in multi-candidate planning (``scores``, ``selected``)
+            - result: the final result, as returned by run() (``result``)
+            
+        Args:
+            request: The user request, as accepted by run()
+            
+        Yields:
+            Progress events, ending with a single result event
+        """
+        goal = request.get("goal", "")
+        code = request.get("code")
+        options = request.get("options", {})
+        
+        if code:
+            yield {"type": "stage", "stage": "classification"}
+            yield {"type": "result", "result": self._handle_code_request(code, options)}
+            return
+        
+        yield from self._goal_request_events(goal, options, stream=True)
+    
     def _handle_goal_request(self, goal: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """
         Handle a goal-based request by planning and executing a workflow.
         """
+        result = None
+        for event in self._goal_request_events(goal, options, stream=False):
+            if event["type"] == "result":
+                result = event["result"]
+        return result
+    
+    def _call_agent(self, agent, stream: bool, *args) -> Generator[Dict[str, Any], None, Any]:
+        """
+        Run an agent, forwarding its streamed events when streaming.
+        
+        Returns:
+            The agent's result, via the generator's return value
+        """
+        if not stream or not hasattr(agent, "run_stream"):
+            return agent.run(*args)
+        
+        result = None
+        for event in agent.run_stream(*args):
+            if event.get("type") == "result":
+                result = event.get("result")
+            else:
+                yield {**event, "agent": type(agent).__name__}
+        return result
+    
+    def _goal_request_events(self, goal: str, options: Dict[str, Any], stream: bool) -> Iterator[Dict[str, Any]]:
+        """
+        Plan, evaluate and execute a workflow for a goal, yielding progress events.
+        
+        The last event is always a result event.
+        """
         # Step 1: Plan a workflow
         planner = self.registry.get_instance("PlannerAgent")
         if not planner:
-            return {"success": False, "error": "PlannerAgent not found"}
+            yield {"type": "result", "result": {"success": False, "error": "PlannerAgent not found"}}
+            return
         
-        planning_result = planner.run(goal)
+        yield {"type": "stage", "stage": "planning"}
+        evaluation = None
+        candidate_count = int(options.get("candidates", 1) or 1)
+        if candidate_count > 1 and hasattr(planner, "plan_candidates"):
+            planning_result, evaluation, selection = self._select_candidate(planner, goal, candidate_count, options)
+            if selection:
+                yield {"type": "candidates", **selection}
+        else:
+            planning_result = yield from self._call_agent(planner, stream, goal)
         workflow = planning_result.get("workflow")
         missing_capabilities = planning_result.get("missing_capabilities", [])
         
         # Step 2: Handle any missing capabilities
         if missing_capabilities:
+            yield {"type": "stage", "stage": "generating_capabilities"}
             print(f"Found {len(missing_capabilities)} missing capabilities. Generating them...")
+            # Enhance all capability specs with more details using Bedrock if available, concurrently
+            if self.bedrock_client:
+                missing_capabilities = self.enhance_capability_specs(missing_capabilities, goal)
+            generated = {}
             for capability in missing_capabilities:
-                # Enhance the capability spec with more details using Bedrock if available
-                if self.bedrock_client:
-                    capability = self._enhance_capability_spec(capability, goal)
-                
                 # Generate the capability
                 generation_result = self.handle_missing_capability(capability)
                 if not generation_result.get("success", False):
-                    return {
+                    yield {"type": "result", "result": {
                         "success": False,
                         "error": f"Failed to generate capability: {capability['name']}",
                         "details": generation_result
-                    }
+                    }}
+                    return
                 print(f"Successfully generated capability: {capability['name']}")
+                generated[capability["name"]] = generation_result.get("metadata", {}).get("name")
             
-            # Re-plan with the new capabilities
-            planning_result = planner.run(goal)
+            # Patch the steps that used the missing capabilities rather than
+            # planning again, unless that leaves some still missing
+            yield {"type": "stage", "stage": "planning"}
+            repaired = None
+            if hasattr(planner, "repair"):
+                repaired = planner.repair(goal, planning_result, generated)
+            if repaired is None or repaired.get("missing_capabilities"):
+                repaired = yield from self._call_agent(planner, stream, goal)
+            planning_result = repaired
             workflow = planning_result.get("workflow")
+            evaluation = None
         
         # Step 3: Evaluate the workflow
         evaluator = self.registry.get_instance("EvaluatorAgent")
         if not evaluator:
-            return {"success": False, "error": "EvaluatorAgent not found"}
+            yield {"type": "result", "result": {"success": False, "error": "EvaluatorAgent not found"}}
+            return
         
-        evaluation = evaluator.run(workflow)
+        # Candidates were already evaluated while choosing between them
+        if evaluation is None:
+            yield {"type": "stage", "stage": "evaluation"}
+            evaluation = yield from self._call_agent(evaluator, stream, workflow)
         
-        # Step 4: If evaluation score is too low, refine the plan
-        if evaluation.get("needs_improvement", False):
-            print(f"Workflow needs improvement. Score: {evaluation.get('score')}")
-            print(f"Suggestions: {evaluation.get('suggestions')}")
-            
-            # In a more advanced implementation, we would refine the plan here
-            # For now, we'll proceed with the original plan
-            pass
+        # Step 4: If the plan needs improvement, plan candidates and keep a better one
+        if (evaluation.get("needs_improvement", False) and candidate_count <= 1
+                and IMPROVEMENT_CANDIDATES > 1 and hasattr(planner, "plan_candidates")):
+            yield {"type": "stage", "stage": "refinement"}
+            candidate, candidate_evaluation, selection = self._select_candidate(
+                planner, goal, IMPROVEMENT_CANDIDATES, options
+            )
+            if selection:
+                yield {"type": "candidates", **selection}
+            # A candidate needing capabilities that were never generated cannot run
+            if (candidate_evaluation is not None and not candidate.get("missing_capabilities")
+                    and (candidate_evaluation.get("score") or 0) > (evaluation.get("score") or 0)):
+                workflow, evaluation = candidate.get("workflow"), candidate_evaluation
+        
+        # Reject plans predicted to exceed the request's budgets before running them
+        violation = self._budget_violation(evaluator, workflow, evaluation, options)
+        if violation:
+            yield {"type": "result", "result": {
+                "success": False,
+                "error": violation,
+                "workflow_id": workflow.get("id"),
+                "evaluation": evaluation
+            }}
+            return
         
         # Step 5: Execute the workflow
         executor = self.registry.get_instance("WorkflowExecutorAgent")
         if not executor:
-            return {"success": False, "error": "WorkflowExecutorAgent not found"}
+            yield {"type": "result", "result": {"success": False, "error": "WorkflowExecutorAgent not found"}}
+            return
         
         # Prepare input data
         input_data = options.get("input", {"input": goal})
         
         # Execute the workflow
+        yield {"type": "stage", "stage": "execution"}
         execution_result = executor.run({
             "workflow": workflow,
             "input": input_data
         })
         
         # Return the final result
-        return {
+        yield {"type": "result", "result": {
             "success": True,
             "result": execution_result.get("output"),
             "workflow_id": workflow.get("id"),
             "steps": execution_result.get("steps", []),
             "evaluation": evaluation,
             "type": "workflow_execution"
-        }
+        }}
+        
+    def _budget_violation(self, evaluator, workflow: Dict[str, Any], evaluation: Optional[Dict[str, Any]],
+                          options: Dict[str, Any]) -> Optional[str]:
+        """
+        Check a workflow's cost estimate against the budgets set in the request options.
+        
+        Returns:
+            A description of the exceeded budget, or None if the workflow is within budget
+        """
+        max_latency = options.get("max_latency_ms")
+        max_cost = options.get("max_cost")
+        if max_latency is None and max_cost is None:
+            return None
         
+        estimate = evaluation.get("estimate") if isinstance(evaluation, dict) else None
+        if not isinstance(estimate, dict) and hasattr(evaluator, "estimate"):
+            estimate = evaluator.estimate(workflow)
+        if not isinstance(estimate, dict) or "latency_ms" not in estimate:
+            return None
+        
+        if max_latency is not None and estimate["latency_ms"] > max_latency:
+            return f"Workflow is estimated to take {estimate['latency_ms']:.0f} ms, over the {max_latency} ms budget"
+        if max_cost is not None and estimate["cost"] > max_cost:
+            return f"Workflow is estimated to cost ${estimate['cost']:.4f}, over the ${max_cost} budget"
+        return None
+    
+    def _select_candidate(self, planner, goal: str, count: int, options: Optional[Dict[str, Any]] = None):
+        """
+        Plan candidate workflows and keep the one the evaluator scores highest.
+        
+        All candidates are evaluated concurrently. Candidates estimated to
+        exceed the request's budgets rank last; ties go to the candidate
+        with fewer missing capabilities, then to the earlier one.
+        
+        Args:
+            planner: The PlannerAgent
+            goal: The goal to achieve
+            count: Number of candidates to plan
+            options: Optional request options with budgets
+            
+        Returns:
+            A tuple of the selected planning result, its evaluation and a
+            summary (``scores`` of every candidate, ``selected`` index); the
+            last two are None if no candidate could be evaluated
+        """
+        candidates = planner.plan_candidates(goal, count)
+        evaluator = self.registry.get_instance("EvaluatorAgent")
+        if not evaluator or len(candidates) == 1:
+            return candidates[0], None, None
+        
+        evaluations = run_concurrently(
+            lambda candidate: evaluator.run(candidate.get("workflow")), candidates, return_exceptions=True
+        )
+        scored = [
+            (index, evaluation) for index, evaluation in enumerate(evaluations)
+            if isinstance(evaluation, dict) and isinstance(evaluation.get("score"), (int, float))
+        ]
+        if not scored:
+            return candidates[0], None, None
+        
+        best, evaluation = min(scored, key=lambda item: (
+            self._budget_violation(evaluator, candidates[item[0]].get("workflow"), item[1], options or {}) is not None,
+            -item[1]["score"], len(candidates[item[0]].get("missing_capabilities", [])), item[0]
+        ))
+        print(f"Selected candidate workflow {best + 1} of {len(candidates)} (score {evaluation['score']})")
+        scores = [result.get("score") if isinstance(result, dict) else None for result in evaluations]
+        return candidates[best], evaluation, {"scores": scores, "selected": best}
+    
     def _run_with_supervisor(self, input_text: str, additional_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Run the request through the Agent Squad supervisor.
@@ -244,12 +430,46 @@ class DevCoordinatorAgent(Agent):
         Returns:
             Enhanced capability specification
         """
-        if not self.bedrock_client:
-            return capability_spec
+        return self.enhance_capability_specs([capability_spec], goal)[0]
+    
+    def enhance_capability_specs(self, capability_specs: List[Dict[str, Any]], goal: str) -> List[Dict[str, Any]]:
+        """
+        Enhance several capability specifications with more details using Bedrock.
         
-        try:
-            # Prepare the prompt for Bedrock
-            prompt = f"""You are an AI agent designer. Your task is to enhance a specification for a new AI agent.
+        The model calls run concurrently, so enhancing N specifications takes
+        about as long as the slowest call rather than N round trips.
+        
+        Args:
+            capability_specs: Basic specifications of the required capabilities
+            goal: The overall goal that these capabilities will help achieve
+            
+        Returns:
+            Enhanced capability specifications, in the same order
+        """
+        if not self.bedrock_client or not capability_specs:
+            return capability_specs
+        
+        prompts = [self._build_enhancement_prompt(spec, goal) for spec in capability_specs]
+        responses = model_router.invoke_many(
+            self.bedrock_client,
+            CAPABILITY_ENHANCEMENT,
+            prompts,
+            ENHANCEMENT_PARAMETERS,
+            return_exceptions=True
+        )
+        
+        enhanced_specs = []
+        for capability_spec, response in zip(capability_specs, responses):
+            if isinstance(response, Exception):
+                print(f"Error enhancing capability specification: {response}")
+            else:
+                self._merge_enhancement(capability_spec, get_completion_text(response))
+            enhanced_specs.append(capability_spec)
+        return enhanced_specs
+    
+    def _build_enhancement_prompt(self, capability_spec: Dict[str, Any], goal: str) -> str:
+        """Build the Bedrock prompt asking for an enhanced capability specification."""
+        return f"""You are an AI agent designer. Your task is to enhance a specification for a new AI agent.
 
 Overall Goal: {goal}
 
@@ -274,42 +494,23 @@ Format your response as a JSON object with the following fields:
 
 Enhanced Specification:
 """
-            
-            # Call Bedrock to enhance the specification
-            model_id = os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-v2")
-            response = self.bedrock_client.invoke_model(
-                model_id=model_id,
-                prompt=prompt,
-                max_tokens=1000,
-                temperature=0.4,
-                top_p=0.9
-            )
-            
-            # Extract the enhanced specification from the response
-            if "anthropic" in model_id.lower():
-                completion = response.get("completion", "")
-            else:
-                completion = response.get("outputText", "")
-            
-            # Try to parse the JSON response
-            try:
-                # Find JSON object in the response
-                json_start = completion.find('{')
-                json_end = completion.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = completion[json_start:json_end]
-                    enhanced_spec = json.loads(json_str)
-                    
-                    # Merge the enhanced spec with the original spec
-                    for key, value in enhanced_spec.items():
-                        if key not in capability_spec or not capability_spec[key]:
-                            capability_spec[key] = value
-            except Exception as e:
-                print(f"Error parsing enhanced specification: {e}")
+
+    def _merge_enhancement(self, capability_spec: Dict[str, Any], completion: str) -> None:
+        """Fill empty fields of a capability specification from a model completion."""
+        try:
+            # Find JSON object in the response
+            json_start = completion.find('{')
+            json_end = completion.rfind('}') + 1
+            if json_start >= 0 and json_end > json_start:
+                json_str = completion[json_start:json_end]
+                enhanced_spec = json.loads(json_str)
+                
+                # Merge the enhanced spec with the original spec
+                for key, value in enhanced_spec.items():
+                    if key not in capability_spec or not capability_spec[key]:
+                        capability_spec[key] = value
         except Exception as e:
-            print(f"Error enhancing capability specification: {e}")
-        
-        return capability_spec
+            print(f"Error parsing enhanced specification: {e}")
     
     def handle_missing_capability(self, capability_spec: Dict[str, Any]) -> Dict[str, Any]:
         """
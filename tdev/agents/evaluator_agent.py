@@ -1,10 +1,56 @@
-from typing import Dict, Any, List, Union, Optional
-import os
+from typing import Dict, Any, List, Set, Tuple, Union, Optional, Iterator, Generator
 import json
+
+import numpy as np
+
 from tdev.core.agent import Agent
-from tdev.core.workflow import Workflow, load_workflow
+from tdev.core.workflow import Workflow, load_workflow, is_control_step, iter_agent_steps
 from tdev.core.registry import get_registry
-from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.core.prompt_budget import compact_json, PROMPT_BUDGETS
+from tdev.agent_core.bedrock_client import get_bedrock_client, get_completion_text
+from tdev.agent_core.model_router import model_router, EVALUATION
+from tdev.agent_core.evaluation_cache import evaluation_cache
+from tdev.monitoring.cost_model import AgentProfiles, agent_profiles, estimate_workflow, LATENCY_BUDGET_MS, COST_BUDGET
+
+# Sampling parameters for evaluation calls
+EVALUATION_PARAMETERS = {
+    "maxTokens": 1000,
+    "temperature": 0.2,
+    "topP": 0.9
+}
+
+# Rule-based metrics and their weights in the overall score
+METRIC_WEIGHTS = {
+    "structural_completeness": 0.25,
+    "agent_suitability": 0.3,
+    "error_resilience": 0.15,
+    "efficiency": 0.15,
+    "clarity": 0.15
+}
+
+# Per-workflow features the rule-based metrics are computed from
+FEATURES = ("steps", "missing_agents", "unlinked_steps", "error_handling",
+            "description", "step_descriptions", "tested", "passed", "latency_ms", "cost")
+
+def scored_estimate(estimate: Dict[str, Any]) -> Tuple[float, float, float]:
+    """
+    Reduce a cost estimate to what the rule-based score depends on.
+    
+    Latencies are rounded to 0.1s and cost to $0.0001, as suggestions show
+    them, and values within budget are raised to the budget, which scores
+    the same. Estimates that only drift as telemetry accrues therefore score
+    identically, and cached evaluations keyed by this stay valid.
+    
+    Args:
+        estimate: The estimate, as returned by estimate_workflow()
+        
+    Returns:
+        The latency, critical path latency (0 within the latency budget) and cost
+    """
+    latency = max(round(estimate["latency_ms"], -2), LATENCY_BUDGET_MS)
+    critical_path = round(estimate["critical_path_ms"], -2) if latency > LATENCY_BUDGET_MS else 0.0
+    cost = max(round(estimate["cost"], 4), COST_BUDGET)
+    return latency, critical_path, cost
 
 class EvaluatorAgent(Agent):
     """
@@ -20,7 +66,7 @@ class EvaluatorAgent(Agent):
         super().__init__()
         self.bedrock_client = None
         try:
-            self.bedrock_client = BedrockClient()
+            self.bedrock_client = get_bedrock_client()
         except Exception as e:
             print(f"Warning: Could not initialize Bedrock client: {e}")
     
@@ -35,26 +81,29 @@ class EvaluatorAgent(Agent):
         Returns:
             A dictionary with evaluation results
         """
-        # Load the workflow
-        workflow = None
-        if isinstance(workflow_data, str):
-            print(f"EvaluatorAgent: Evaluating workflow at {workflow_data}")
-            workflow = load_workflow(workflow_data)
-            if not workflow:
-                return {
-                    "score": 0,
-                    "error": f"Could not load workflow: {workflow_data}"
-                }
-        else:
-            print("EvaluatorAgent: Evaluating workflow from dictionary")
-            workflow = workflow_data
+        workflow, error = self._load(workflow_data)
+        if error:
+            return error
+        
+        # Score and estimate against one snapshot of the profiles, which keep changing as steps run
+        profiles = agent_profiles.snapshot()
+        
+        # Reuse the evaluation of an identical workflow against the same capabilities
+        cache_key = self._cache_key(workflow, test_results, profiles)
+        cached = evaluation_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            print("Using cached evaluation")
+            return self._with_estimate(cached, workflow, profiles)
         
         # Perform evaluation using Bedrock if available
+        evaluation = None
         if self.bedrock_client and isinstance(workflow, dict):
             evaluation = self._evaluate_with_bedrock(workflow, test_results)
-        else:
+        # Only cache a rule-based evaluation when no model was meant to make it
+        cacheable = evaluation is not None or not self.bedrock_client
+        if evaluation is None:
             # Fall back to rule-based evaluation
-            evaluation = self._evaluate_workflow(workflow, test_results)
+            evaluation = self._evaluate_workflow(workflow, test_results, profiles)
         
         # Determine if the workflow needs improvement
         needs_improvement = evaluation["score"] < 70 or len(evaluation["suggestions"]) > 0
@@ -62,26 +111,128 @@ class EvaluatorAgent(Agent):
         # Add improvement flag to the result
         evaluation["needs_improvement"] = needs_improvement
         
+        if cache_key and cacheable:
+            evaluation_cache.set(cache_key, evaluation)
+        
+        return self._with_estimate(evaluation, workflow, profiles)
+    
+    def run_stream(self, workflow_data: Union[str, Dict], test_results: Optional[Dict] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluate a workflow, yielding model output as it is generated.
+        
+        Yields ``token`` events (``text``) while the model responds, then a
+        single ``result`` event whose ``result`` is what run() would return.
+        
+        Args:
+            workflow_data: Either a path to the workflow file or a workflow dictionary
+            test_results: Optional test results to incorporate in evaluation
+            
+        Yields:
+            Evaluation events
+        """
+        workflow, error = self._load(workflow_data)
+        if error:
+            yield {"type": "result", "result": error}
+            return
+        
+        profiles = agent_profiles.snapshot()
+        cache_key = self._cache_key(workflow, test_results, profiles)
+        cached = evaluation_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            yield {"type": "result", "result": self._with_estimate(cached, workflow, profiles)}
+            return
+        
+        evaluation = None
+        if self.bedrock_client and isinstance(workflow, dict):
+            evaluation = yield from self._evaluate_with_bedrock_stream(workflow, test_results)
+        cacheable = evaluation is not None or not self.bedrock_client
+        if evaluation is None:
+            evaluation = self._evaluate_workflow(workflow, test_results, profiles)
+        
+        evaluation["needs_improvement"] = evaluation["score"] < 70 or len(evaluation["suggestions"]) > 0
+        if cache_key and cacheable:
+            evaluation_cache.set(cache_key, evaluation)
+        yield {"type": "result", "result": self._with_estimate(evaluation, workflow, profiles)}
+    
+    def estimate(self, workflow_data: Union[str, Dict], profiles: Optional[AgentProfiles] = None) -> Dict[str, Any]:
+        """
+        Predict the latency, model calls and cost of running a workflow.
+        
+        Each step is costed from the telemetry recorded for its agent, and
+        independent steps are found from the workflow's data dependencies
+        to give the critical path. See estimate_workflow().
+        
+        Args:
+            workflow_data: Either a path to the workflow file or a workflow dictionary
+            profiles: Agent profiles to use (defaults to the global agent_profiles)
+            
+        Returns:
+            The estimate, or an error result if the workflow cannot be loaded
+        """
+        if isinstance(workflow_data, str):
+            workflow = load_workflow(workflow_data)
+            if not workflow:
+                return {"error": f"Could not load workflow: {workflow_data}"}
+            workflow_data = workflow
+        if isinstance(workflow_data, Workflow):
+            workflow_data = workflow_data.to_dict()
+        return estimate_workflow(workflow_data, profiles)
+    
+    def _with_estimate(self, evaluation: Dict[str, Any], workflow: Any, profiles: AgentProfiles) -> Dict[str, Any]:
+        """Attach the cost estimate from the profiles the evaluation was scored against."""
+        if isinstance(workflow, (dict, Workflow)):
+            evaluation["estimate"] = self.estimate(workflow, profiles)
         return evaluation
     
-    def _evaluate_with_bedrock(self, workflow: Dict, test_results: Optional[Dict] = None) -> Dict[str, Any]:
+    def _load(self, workflow_data: Union[str, Dict]):
+        """Load the workflow to evaluate, returning (workflow, error result)."""
+        if isinstance(workflow_data, str):
+            print(f"EvaluatorAgent: Evaluating workflow at {workflow_data}")
+            workflow = load_workflow(workflow_data)
+            if not workflow:
+                return None, {
+                    "score": 0,
+                    "error": f"Could not load workflow: {workflow_data}"
+                }
+            return workflow, None
+        
+        print("EvaluatorAgent: Evaluating workflow from dictionary")
+        return workflow_data, None
+    
+    def _cache_key(self, workflow: Any, test_results: Optional[Dict], profiles: AgentProfiles) -> Optional[str]:
         """
-        Evaluate a workflow using AWS Bedrock for intelligent analysis.
+        Build the evaluation cache key for a workflow.
+        
+        Only rule-based evaluations are cached when no model is available,
+        and their efficiency metric, score and suggestions depend on the
+        workflow's cost estimate, so the part of it they use is in their key.
         
         Args:
-            workflow: The workflow to evaluate
-            test_results: Optional test results to incorporate
+            workflow: The loaded workflow
+            test_results: Optional test results the evaluation incorporates
+            profiles: Agent profiles the evaluation is scored against
             
         Returns:
-            Evaluation results
+            The cache key, or None if the workflow is not a dictionary
         """
-        # Prepare the prompt for Bedrock
-        workflow_json = json.dumps(workflow, indent=2)
+        if not isinstance(workflow, dict):
+            return None
+        registry = get_registry()
+        fingerprint = evaluation_cache.fingerprint(
+            registry, registry.get_by_type("agent"), registry.get_by_type("tool")
+        )
+        if not self.bedrock_client:
+            fingerprint = f"{fingerprint}:{scored_estimate(self.estimate(workflow, profiles))}"
+        return evaluation_cache.key(workflow, test_results, fingerprint)
+    
+    def _build_evaluation_prompt(self, workflow: Dict, test_results: Optional[Dict] = None) -> str:
+        """Build the Bedrock prompt asking for a workflow evaluation, with minified JSON kept within budget."""
+        workflow_json = compact_json(workflow, PROMPT_BUDGETS["workflow_tokens"])
         test_results_str = "No test results available"
         if test_results:
-            test_results_str = json.dumps(test_results, indent=2)
+            test_results_str = compact_json(test_results, PROMPT_BUDGETS["test_results_tokens"])
         
-        prompt = f"""You are an AI workflow evaluator. Your task is to evaluate a workflow plan and provide a quality score and suggestions for improvement.
+        return f"""You are an AI workflow evaluator. Your task is to evaluate a workflow plan and provide a quality score and suggestions for improvement.
 
 Workflow:
 ```json
@@ -107,85 +258,213 @@ Provide your evaluation as a JSON object with the following fields:
 
 Evaluation:
 """
+
+    def _parse_evaluation(self, completion: str) -> Optional[Dict[str, Any]]:
+        """Parse the evaluation JSON object from a completion, or return None."""
+        try:
+            # Find JSON object in the response
+            json_start = completion.find('{')
+            json_end = completion.rfind('}') + 1
+            if json_start >= 0 and json_end > json_start:
+                json_str = completion[json_start:json_end]
+                evaluation = json.loads(json_str)
+                
+                # Ensure the evaluation has the required fields
+                if "score" not in evaluation:
+                    evaluation["score"] = 70  # Default score
+                if "metrics" not in evaluation:
+                    evaluation["metrics"] = {}
+                if "suggestions" not in evaluation:
+                    evaluation["suggestions"] = []
+                
+                # Add improvement flag
+                evaluation["needs_improvement"] = evaluation["score"] < 70 or len(evaluation["suggestions"]) > 0
+                
+                return evaluation
+        except Exception as e:
+            print(f"Error parsing Bedrock evaluation response: {e}")
+        return None
+    
+    def _evaluate_with_bedrock(self, workflow: Dict, test_results: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate a workflow using AWS Bedrock for intelligent analysis.
+        
+        Args:
+            workflow: The workflow to evaluate
+            test_results: Optional test results to incorporate
+            
+        Returns:
+            Evaluation results, or None if the model call fails
+        """
+        prompt = self._build_evaluation_prompt(workflow, test_results)
         
         try:
             # Call Bedrock to generate the evaluation
-            model_id = os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-v2")
-            response = self.bedrock_client.invoke_model(
-                model_id=model_id,
-                prompt=prompt,
-                parameters={
-                    "maxTokens": 1000,
-                    "temperature": 0.2,
-                    "topP": 0.9
-                }
-            )
+            response = model_router.invoke(self.bedrock_client, EVALUATION, prompt, EVALUATION_PARAMETERS)
             
-            # Extract the evaluation from the response
-            if "anthropic" in model_id.lower():
-                completion = response.get("completion", "")
-            else:
-                completion = response.get("outputText", "")
-            
-            # Try to parse the JSON response
-            try:
-                # Find JSON object in the response
-                json_start = completion.find('{')
-                json_end = completion.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = completion[json_start:json_end]
-                    evaluation = json.loads(json_str)
-                    
-                    # Ensure the evaluation has the required fields
-                    if "score" not in evaluation:
-                        evaluation["score"] = 70  # Default score
-                    if "metrics" not in evaluation:
-                        evaluation["metrics"] = {}
-                    if "suggestions" not in evaluation:
-                        evaluation["suggestions"] = []
-                    
-                    # Add improvement flag
-                    evaluation["needs_improvement"] = evaluation["score"] < 70 or len(evaluation["suggestions"]) > 0
-                    
-                    return evaluation
-            except Exception as e:
-                print(f"Error parsing Bedrock evaluation response: {e}")
+            evaluation = self._parse_evaluation(get_completion_text(response))
+            if evaluation is not None:
+                return evaluation
         except Exception as e:
             print(f"Error calling Bedrock for evaluation: {e}")
         
-        # Fall back to rule-based evaluation if Bedrock fails
-        return self._evaluate_workflow(workflow, test_results)
+        return None
+    
+    def _evaluate_with_bedrock_stream(self, workflow: Dict,
+                                      test_results: Optional[Dict] = None) -> Generator[Dict[str, Any], None, Optional[Dict[str, Any]]]:
+        """
+        Stream a Bedrock evaluation, yielding token events.
+        
+        Returns:
+            Evaluation results, or None if the model call fails, via the generator's return value
+        """
+        prompt = self._build_evaluation_prompt(workflow, test_results)
+        
+        try:
+            chunks = []
+            for text in model_router.invoke_stream(self.bedrock_client, EVALUATION, prompt, EVALUATION_PARAMETERS):
+                chunks.append(text)
+                yield {"type": "token", "text": text}
+            
+            evaluation = self._parse_evaluation("".join(chunks))
+            if evaluation is not None:
+                return evaluation
+        except Exception as e:
+            print(f"Error streaming Bedrock evaluation: {e}")
+        
+        return None
     
-    def _evaluate_workflow(self, workflow: Dict, test_results: Optional[Dict] = None) -> Dict[str, Any]:
+    def evaluate_many(self, workflows: List[Union[str, Dict]],
+                      test_results: Optional[List[Optional[Dict]]] = None,
+                      profiles: Optional[AgentProfiles] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate a batch of workflows with the rule-based criteria.
+        
+        The registry is read once for the whole batch, and the metrics and
+        scores of every workflow are computed together with NumPy array
+        operations. Each result is what run() returns without Bedrock.
+        Pass fixed profiles to compare scores across runs regardless of the
+        telemetry recorded in between.
+        
+        Args:
+            workflows: Paths to workflow files or workflow dictionaries
+            test_results: Optional test results for each workflow, in the same order
+            profiles: Agent profiles to estimate against (defaults to a snapshot
+                of the global agent_profiles)
+            
+        Returns:
+            One evaluation per workflow, in order
+        """
+        if test_results is not None and len(test_results) != len(workflows):
+            raise ValueError("test_results must have one entry per workflow")
+        test_results = test_results if test_results is not None else [None] * len(workflows)
+        print(f"EvaluatorAgent: Evaluating {len(workflows)} workflows")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(workflows)
+        positions, loaded = [], []
+        for position, workflow in enumerate(workflows):
+            if isinstance(workflow, str):
+                path = workflow
+                workflow = load_workflow(path)
+                if not workflow:
+                    results[position] = {"score": 0, "error": f"Could not load workflow: {path}"}
+                    continue
+            if isinstance(workflow, Workflow):
+                workflow = workflow.to_dict()
+            positions.append(position)
+            loaded.append(workflow)
+        
+        profiles = profiles if profiles is not None else agent_profiles.snapshot()
+        evaluations = self._evaluate_batch(loaded, [test_results[position] for position in positions], profiles)
+        for position, evaluation in zip(positions, evaluations):
+            results[position] = evaluation
+        return results
+    
+    def _evaluate_workflow(self, workflow: Dict, test_results: Optional[Dict] = None,
+                           profiles: Optional[AgentProfiles] = None) -> Dict[str, Any]:
         """
         Evaluate a workflow based on various criteria.
         """
-        # Get registry to check for agent availability
+        profiles = profiles if profiles is not None else agent_profiles.snapshot()
+        return self._evaluate_batch([workflow], [test_results], profiles)[0]
+    
+    def _evaluate_batch(self, workflows: List[Dict], test_results: List[Optional[Dict]],
+                        profiles: AgentProfiles) -> List[Dict[str, Any]]:
+        """
+        Evaluate loaded workflows based on various criteria.
+        
+        Each workflow is reduced to a row of features in a single pass, and
+        the metrics are then computed column by column for the whole batch.
+        """
+        # Get registry once to check for agent availability
         registry = get_registry()
+        available_agents = {name for name, metadata in registry.get_all().items() if metadata.get("type") == "agent"}
+        
+        rows = [self._workflow_features(workflow, available_agents, tests, profiles)
+                for workflow, tests in zip(workflows, test_results)]
+        features = np.array([row[0] for row in rows], dtype=np.float64).reshape(len(rows), len(FEATURES))
+        column = {name: features[:, index] for index, name in enumerate(FEATURES)}
+        step_counts = column["steps"]
         
-        # Initialize metrics
-        metrics = {
-            "structural_completeness": 0.0,
-            "agent_suitability": 0.0,
-            "error_resilience": 0.0,
-            "efficiency": 0.0,
-            "clarity": 0.0
-        }
+        metrics = np.empty((len(rows), len(METRIC_WEIGHTS)), dtype=np.float64)
+        # More steps = more complete, up to 5, reduced for each step without input
+        metrics[:, 0] = np.minimum(1.0, step_counts / 5)
+        unlinked = column["unlinked_steps"]
+        for count in range(int(unlinked.max(initial=0))):
+            metrics[unlinked > count, 0] *= 0.8
+        metrics[:, 1] = np.where(column["missing_agents"] > 0, 0.0, 1.0)
+        metrics[:, 2] = np.where(column["error_handling"] > 0, 0.5, 0.2)
+        # Expected latency and model spend against their budgets
+        latency_ratio = np.minimum(1.0, LATENCY_BUDGET_MS / np.maximum(column["latency_ms"], 1e-9))
+        cost_ratio = np.minimum(1.0, COST_BUDGET / np.maximum(column["cost"], 1e-12))
+        metrics[:, 3] = np.maximum(0.3, 0.9 * latency_ratio * cost_ratio)
+        described = column["description"] > 0
+        metrics[:, 4] = np.select([described & (column["step_descriptions"] > 0), described], [1.0, 0.7], 0.3)
         
+        # Incorporate test results: failing tests reduce completeness, passing tests boost every metric slightly
+        tested = column["tested"] > 0
+        passed = tested & (column["passed"] > 0)
+        metrics[tested & ~passed, 0] *= 0.7
+        metrics[passed] = np.minimum(1.0, metrics[passed] * 1.1)
+        
+        # Calculate overall score (weighted average), summed in metric order so scores round as they always have
+        scores = np.zeros(len(rows), dtype=np.float64)
+        for index, weight in enumerate(METRIC_WEIGHTS.values()):
+            scores += metrics[:, index] * weight
+        scores = np.rint(scores * 100)
+        
+        results = []
+        for (_, suggestions, estimate), values, score in zip(rows, metrics.tolist(), scores.tolist()):
+            results.append({
+                "score": int(score),
+                "metrics": dict(zip(METRIC_WEIGHTS, values)),
+                "suggestions": suggestions,
+                "needs_improvement": score < 70 or len(suggestions) > 0,
+                "estimate": estimate
+            })
+        return results
+    
+    def _workflow_features(self, workflow: Dict, available_agents: Set[str], test_results: Optional[Dict] = None,
+                           profiles: Optional[AgentProfiles] = None) -> Tuple[List[float], List[str], Dict[str, Any]]:
+        """
+        Extract the rule-based features of a workflow.
+        
+        Returns:
+            The feature values, in FEATURES order, the suggestions they imply
+            and the workflow's cost estimate
+        """
         suggestions = []
         
         # Check structural completeness
         steps = workflow.get("steps", [])
         if not steps:
             suggestions.append("Workflow has no steps defined.")
-            metrics["structural_completeness"] = 0.0
-        else:
-            metrics["structural_completeness"] = min(1.0, len(steps) / 5)  # More steps = more complete, up to 5
         
         # Check agent suitability
-        available_agents = {name: metadata for name, metadata in registry.get_all().items() if metadata.get("type") == "agent"}
         missing_agents = []
         for i, step in enumerate(steps):
+            if is_control_step(step):
+                continue
             agent_name = step.get("agent")
             if not agent_name:
                 suggestions.append(f"Step {i+1} does not specify an agent.")
@@ -195,82 +474,57 @@ Evaluation:
                 missing_agents.append(agent_name)
                 suggestions.append(f"Agent '{agent_name}' in step {i+1} is not available in the registry.")
         
-        if missing_agents:
-            metrics["agent_suitability"] = 0.0
-        else:
-            metrics["agent_suitability"] = 1.0
+        # Agents inside switch branches must be available as well
+        for step in steps:
+            if "switch" not in step:
+                continue
+            for branch_step in iter_agent_steps([step]):
+                agent_name = branch_step["agent"]
+                if agent_name not in available_agents and agent_name not in missing_agents:
+                    missing_agents.append(agent_name)
+                    suggestions.append(f"Agent '{agent_name}' in a switch branch is not available in the registry.")
         
         # Check data flow between steps
+        unlinked_steps = 0
         for i, step in enumerate(steps):
-            if i > 0 and "input" not in step:
+            if i > 0 and "input" not in step and not is_control_step(step):
                 suggestions.append(f"Step {i+1} does not specify how to get input from previous steps.")
-                metrics["structural_completeness"] *= 0.8  # Reduce completeness score
+                unlinked_steps += 1
         
         # Check error resilience
         has_error_handling = any("on_error" in step for step in steps)
-        metrics["error_resilience"] = 0.5 if has_error_handling else 0.2
         if not has_error_handling:
             suggestions.append("Workflow does not include error handling for steps.")
         
-        # Check efficiency
-        # Simple heuristic: penalize very long workflows
-        if len(steps) > 10:
-            metrics["efficiency"] = 0.6
-            suggestions.append("Workflow has many steps. Consider consolidating some steps.")
-        else:
-            metrics["efficiency"] = 0.9
+        # Check efficiency against the expected latency and model spend
+        estimate = estimate_workflow(workflow, profiles)
+        latency, critical_path, cost = scored_estimate(estimate)
+        if latency > LATENCY_BUDGET_MS:
+            advice = (f"Independent steps could finish in {critical_path / 1000:.1f}s if run in parallel."
+                      if critical_path < latency else "Consider consolidating or removing slow steps.")
+            suggestions.append(f"Workflow is estimated to take {latency / 1000:.1f}s, "
+                               f"over the {LATENCY_BUDGET_MS / 1000:.0f}s budget. {advice}")
+        if cost > COST_BUDGET:
+            suggestions.append(f"Workflow is estimated to cost ${cost:.4f} per run in model calls, "
+                               f"over the ${COST_BUDGET:.4f} budget.")
         
         # Check clarity
-        has_description = "description" in workflow and workflow["description"]
+        has_description = bool("description" in workflow and workflow["description"])
         has_step_descriptions = all("description" in step for step in steps)
-        if has_description and has_step_descriptions:
-            metrics["clarity"] = 1.0
-        elif has_description:
-            metrics["clarity"] = 0.7
+        if has_description and not has_step_descriptions:
             suggestions.append("Add descriptions to individual steps for better clarity.")
-        else:
-            metrics["clarity"] = 0.3
+        elif not has_description:
             suggestions.append("Workflow lacks a clear description.")
         
-        # Incorporate test results if available
-        if test_results:
-            self._incorporate_test_results(metrics, suggestions, test_results)
-        
-        # Calculate overall score (weighted average)
-        weights = {
-            "structural_completeness": 0.25,
-            "agent_suitability": 0.3,
-            "error_resilience": 0.15,
-            "efficiency": 0.15,
-            "clarity": 0.15
-        }
-        
-        score = sum(metrics[key] * weights[key] for key in metrics) * 100
-        
-        result = {
-            "score": round(score),
-            "metrics": metrics,
-            "suggestions": suggestions,
-            "needs_improvement": round(score) < 70 or len(suggestions) > 0
-        }
-        
-        return result
-    
-    def _incorporate_test_results(self, metrics: Dict[str, float], suggestions: List[str], test_results: Dict) -> None:
-        """
-        Incorporate test results into the evaluation.
-        """
-        # Check if tests passed
-        tests_passed = test_results.get("passed", False)
-        if not tests_passed:
-            metrics["structural_completeness"] *= 0.7  # Reduce score
+        # Check test results
+        tests_passed = bool(test_results and test_results.get("passed", False))
+        if test_results and not tests_passed:
             suggestions.append("Workflow failed tests. Review test results for details.")
-            
             # Add specific test failures to suggestions
             failures = test_results.get("failures", [])
             for failure in failures[:3]:  # Limit to first 3 failures
                 suggestions.append(f"Test failure: {failure}")
-        else:
-            # Boost score slightly for passing tests
-            for key in metrics:
-                metrics[key] = min(1.0, metrics[key] * 1.1)
\ No newline at end of file
+        
+        features = [len(steps), len(missing_agents), unlinked_steps, has_error_handling, has_description,
+                    has_step_descriptions, bool(test_results), tests_passed, latency, cost]
+        return [float(value) for value in features], suggestions, estimate
@@ -1,11 +1,36 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Generator, Tuple
 import re
+import copy
 import json
-import os
+import hashlib
 from tdev.core.agent import Agent
-from tdev.core.workflow import Workflow
+from tdev.core.workflow import Workflow, iter_agent_steps
 from tdev.core.registry import get_registry
-from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.core.json_stream import JsonArrayStream
+from tdev.core.prompt_budget import compact_capabilities, PROMPT_BUDGETS
+from tdev.core.capability_index import CapabilityIndex
+from tdev.core.triggers import TriggerMatcher
+from tdev.core.init_registry import CORE_TRIGGERS
+from tdev.agent_core.bedrock_client import get_bedrock_client, get_completion_text, run_concurrently
+from tdev.agent_core.model_router import model_router, PLANNING
+from tdev.agent_core.plan_cache import plan_cache, normalize_goal, capability_fingerprint
+from tdev.agent_core.plan_index import plan_index
+
+# Sampling parameters for planning calls
+PLANNING_PARAMETERS = {
+    "maxTokens": 1000,
+    "temperature": 0.2,
+    "topP": 0.9
+}
+
+# Sampling temperature range of the model-based candidates in multi-candidate planning
+CANDIDATE_TEMPERATURES = (0.2, 1.0)
+
+# Minimum relevance of an agent to a clause of the goal for rule-based planning
+MIN_CAPABILITY_SCORE = 0.3
+
+# Separators between the parts of a goal that become separate steps
+_CLAUSE_PATTERN = re.compile(r",|;|\band then\b|\bthen\b|\band\b", re.IGNORECASE)
 
 class PlannerAgent(Agent):
     """
@@ -21,9 +46,12 @@ class PlannerAgent(Agent):
         super().__init__()
         self.bedrock_client = None
         try:
-            self.bedrock_client = BedrockClient()
+            self.bedrock_client = get_bedrock_client()
         except Exception as e:
             print(f"Warning: Could not initialize Bedrock client: {e}")
+        # The capability key and the matchers built for it, replaced together so
+        # concurrent planners never pair one key with another key's matchers
+        self._matchers: Optional[Tuple[str, Tuple[CapabilityIndex, CapabilityIndex, TriggerMatcher]]] = None
     
     def run(self, goal: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -43,13 +71,214 @@ class PlannerAgent(Agent):
         available_agents = registry.get_by_type("agent")
         available_tools = registry.get_by_type("tool")
         
+        # Repeat goals against the same capabilities reuse their earlier plan
+        fingerprint = plan_cache.fingerprint(registry, available_agents, available_tools)
+        cache_key = plan_cache.key(goal, fingerprint)
+        cached = plan_cache.get(cache_key)
+        if cached is not None:
+            print("PlannerAgent: Reusing cached plan")
+            return cached
+        
+        # Paraphrases of an earlier goal reuse its steps
+        workflow_steps = self._reuse_similar_plan(goal, fingerprint)
+        reused = workflow_steps is not None
+        
         # Use Bedrock for intelligent planning if available
-        if self.bedrock_client:
-            workflow_steps = self._plan_with_bedrock(goal, available_agents, available_tools)
-        else:
-            # Fallback to rule-based planning
-            workflow_steps = self._analyze_goal(goal, available_agents, available_tools)
+        planned_by_model = False
+        if not reused and self.bedrock_client:
+            workflow_steps = self._plan_with_bedrock(goal, available_agents, available_tools, fingerprint=fingerprint)
+            planned_by_model = workflow_steps is not None
+        # A rule-based plan stands in for a failed model call and a similar goal's
+        # plan for this goal's own, so neither is cached as this goal's plan
+        cacheable = planned_by_model or not (self.bedrock_client or reused)
+        if workflow_steps is None:
+            workflow_steps = self._analyze_goal(goal, available_agents, available_tools, fingerprint)
+        
+        result = self._build_result(goal, workflow_steps, available_agents, available_tools)
+        if cacheable:
+            plan_cache.set(cache_key, result)
+        if planned_by_model:
+            plan_index.add(goal, fingerprint, workflow_steps)
+        return result
+    
+    def run_stream(self, goal: str, context: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Plan a workflow to achieve a goal, yielding progress as the model responds.
+        
+        Events are dictionaries with a ``type`` key:
+            - token: a chunk of model output (``text``)
+            - step: a workflow step parsed from the output so far (``index``, ``step``)
+            - result: the final planning result, as returned by run() (``result``)
+            
+        Steps are reported as soon as they are complete. If the full response
+        turns out to be unusable the planner falls back to rule-based
+        planning, so the result is authoritative.
+        
+        Args:
+            goal: The goal to achieve
+            context: Optional context information (available agents, constraints, etc.)
+            
+        Yields:
+            Planning events
+        """
+        print(f"PlannerAgent: Planning workflow for goal: {goal}")
+        
+        # Get available agents from registry
+        registry = get_registry()
+        available_agents = registry.get_by_type("agent")
+        available_tools = registry.get_by_type("tool")
+        
+        fingerprint = plan_cache.fingerprint(registry, available_agents, available_tools)
+        cache_key = plan_cache.key(goal, fingerprint)
+        cached = plan_cache.get(cache_key)
+        if cached is not None:
+            for index, step in enumerate(cached["workflow"].get("steps", [])):
+                yield {"type": "step", "index": index, "step": step}
+            yield {"type": "result", "result": cached}
+            return
+        
+        workflow_steps = self._reuse_similar_plan(goal, fingerprint)
+        reused = workflow_steps is not None
+        if reused:
+            for index, step in enumerate(workflow_steps):
+                yield {"type": "step", "index": index, "step": step}
+        
+        planned_by_model = False
+        if not reused and self.bedrock_client:
+            workflow_steps = yield from self._plan_with_bedrock_stream(goal, available_agents, available_tools,
+                                                                       fingerprint)
+            planned_by_model = workflow_steps is not None
+        cacheable = planned_by_model or not (self.bedrock_client or reused)
+        if workflow_steps is None:
+            workflow_steps = self._analyze_goal(goal, available_agents, available_tools, fingerprint)
+        
+        result = self._build_result(goal, workflow_steps, available_agents, available_tools)
+        if cacheable:
+            plan_cache.set(cache_key, result)
+        if planned_by_model:
+            plan_index.add(goal, fingerprint, workflow_steps)
+        yield {"type": "result", "result": result}
+    
+    def plan_candidates(self, goal: str, count: int = 3) -> List[Dict[str, Any]]:
+        """
+        Plan several candidate workflows for a goal concurrently.
+        
+        count - 1 plans are sampled from the model at once, at temperatures
+        spread over CANDIDATE_TEMPERATURES, and the rule-based plan is always
+        added, so the whole set costs about one model round trip. Candidates
+        with identical steps are returned once. The caches are bypassed; this
+        is for exploring alternatives to the usual plan.
+        
+        Args:
+            goal: The goal to achieve
+            count: Number of candidates to generate, including the rule-based one
+            
+        Returns:
+            Planning results as returned by run(), model-based ones first in
+            order of temperature
+        """
+        print(f"PlannerAgent: Planning {count} candidate workflows for goal: {goal}")
+        
+        registry = get_registry()
+        available_agents = registry.get_by_type("agent")
+        available_tools = registry.get_by_type("tool")
+        fingerprint = plan_cache.fingerprint(registry, available_agents, available_tools)
+        
+        candidates = []
+        if self.bedrock_client and count > 1:
+            low, high = CANDIDATE_TEMPERATURES
+            samples = count - 1
+            temperatures = [round(low + (high - low) * i / max(samples - 1, 1), 2) for i in range(samples)]
+            plans = run_concurrently(
+                lambda temperature: self._plan_with_bedrock(
+                    goal, available_agents, available_tools, {**PLANNING_PARAMETERS, "temperature": temperature},
+                    fingerprint
+                ),
+                temperatures
+            )
+            candidates.extend(steps for steps in plans if steps is not None)
+        candidates.append(self._analyze_goal(goal, available_agents, available_tools, fingerprint))
+        
+        unique = {}
+        for steps in candidates:
+            unique.setdefault(json.dumps(steps, sort_keys=True, default=str), steps)
+        return [self._build_result(goal, steps, available_agents, available_tools) for steps in unique.values()]
+    
+    def repair(self, goal: str, planning_result: Dict[str, Any],
+               replacements: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Patch an earlier plan after its missing capabilities were generated.
+        
+        Only steps that referenced a missing agent change: each is pointed at
+        its replacement (e.g. the name a generated agent was registered
+        under), or else at the available agent that best matches the missing
+        capability's name and description. Every other step is kept, so
+        repairing costs no model call. The repaired plan is cached like any
+        other once nothing is missing, so a replan after an incomplete repair
+        still plans afresh.
+        
+        Args:
+            goal: The goal the plan was made for
+            planning_result: The earlier result of run()
+            replacements: Optional names of generated agents by the missing
+                name they replace
+                
+        Returns:
+            A planning result as returned by run(), with missing capabilities
+            recomputed against the current registry
+        """
+        registry = get_registry()
+        available_agents = registry.get_by_type("agent")
+        available_tools = registry.get_by_type("tool")
+        available_names = {agent.get("name") for agent in available_agents if isinstance(agent, dict)}
+        fingerprint = plan_cache.fingerprint(registry, available_agents, available_tools)
+        agent_index, _, _ = self._capability_matchers(available_agents, available_tools, fingerprint)
+        
+        descriptions = {
+            capability.get("name"): capability.get("description", "")
+            for capability in planning_result.get("missing_capabilities", [])
+        }
+        steps = copy.deepcopy(planning_result.get("workflow", {}).get("steps", []))
+        patched = 0
+        for step in iter_agent_steps(steps):
+            name = step["agent"]
+            if name in available_names:
+                continue
+            replacement = (replacements or {}).get(name)
+            if replacement not in available_names:
+                best = agent_index.match(f"{name} {descriptions.get(name, '')}", MIN_CAPABILITY_SCORE)[:1]
+                replacement = best[0].get("name") if best else None
+            if replacement:
+                step["agent"] = replacement
+                patched += 1
+        print(f"PlannerAgent: Repaired {patched} step(s) of the plan for goal: {goal}")
         
+        result = self._build_result(goal, steps, available_agents, available_tools)
+        if not result["missing_capabilities"]:
+            plan_cache.set(plan_cache.key(goal, fingerprint), result)
+        return result
+    
+    def _reuse_similar_plan(self, goal: str, fingerprint: str) -> Optional[List[Dict]]:
+        """
+        Get the steps planned for the most similar earlier goal, if it is similar enough.
+        
+        Args:
+            goal: The goal to achieve
+            fingerprint: Capability fingerprint of the current registry
+            
+        Returns:
+            List of workflow steps, or None if no earlier goal is close enough
+        """
+        match = plan_index.search(goal, fingerprint)
+        if match is None:
+            return None
+        print(f"PlannerAgent: Reusing plan of similar goal '{match['goal']}' "
+              f"(similarity {match['similarity']:.2f})")
+        return match["steps"]
+    
+    def _build_result(self, goal: str, workflow_steps: List[Dict], available_agents: List[Dict],
+                      available_tools: List[Dict]) -> Dict[str, Any]:
+        """Wrap planned steps in a workflow and report missing capabilities."""
         # Create workflow with the identified steps
         workflow = Workflow(
             id=f"goal-workflow-{self._generate_id(goal)}",
@@ -69,31 +298,26 @@ class PlannerAgent(Agent):
         
         return result
     
-    def _plan_with_bedrock(self, goal: str, available_agents: List[Dict], available_tools: List[Dict]) -> List[Dict]:
-        """
-        Use AWS Bedrock to generate an intelligent plan for the goal.
-        
-        Args:
-            goal: The goal to achieve
-            available_agents: List of available agents
-            available_tools: List of available tools
-            
-        Returns:
-            List of workflow steps
-        """
-        # Prepare the prompt for Bedrock
-        agent_names = [agent.get("name", str(agent)) for agent in available_agents if isinstance(agent, dict)]
-        tool_names = [tool.get("name", str(tool)) for tool in available_tools if isinstance(tool, dict)]
+    def _build_plan_prompt(self, goal: str, available_agents: List[Dict], available_tools: List[Dict],
+                           fingerprint: Optional[str] = None) -> str:
+        """Build the Bedrock prompt asking for a workflow plan, listing the capabilities most relevant to the goal."""
+        agent_index, tool_index, _ = self._capability_matchers(available_agents, available_tools, fingerprint)
+        agent_names = compact_capabilities(
+            available_agents, goal, PROMPT_BUDGETS["max_agents"], PROMPT_BUDGETS["capability_tokens"], agent_index
+        )
+        tool_names = compact_capabilities(
+            available_tools, goal, PROMPT_BUDGETS["max_tools"], PROMPT_BUDGETS["capability_tokens"], tool_index
+        )
         
-        prompt = f"""You are an AI workflow planner. Your task is to create a workflow plan to achieve a goal.
+        return f"""You are an AI workflow planner. Your task is to create a workflow plan to achieve a goal.
 
 Goal: {goal}
 
 Available agents:
-{', '.join(agent_names)}
+{agent_names}
 
 Available tools:
-{', '.join(tool_names)}
+{tool_names}
 
 Create a workflow plan with 2-5 steps to achieve the goal. Each step should use one of the available agents.
 For each step, specify:
@@ -105,69 +329,93 @@ Example: [{{'agent': 'AgentName', 'input': {{'data': '${{0.result}}'}}}}
 
 Workflow plan:
 """
+
+    def _plan_with_bedrock(self, goal: str, available_agents: List[Dict], available_tools: List[Dict],
+                           parameters: Optional[Dict[str, Any]] = None,
+                           fingerprint: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        Use AWS Bedrock to generate an intelligent plan for the goal.
+        
+        Args:
+            goal: The goal to achieve
+            available_agents: List of available agents
+            available_tools: List of available tools
+            parameters: Sampling parameters (defaults to PLANNING_PARAMETERS)
+            fingerprint: Capability fingerprint of the agents and tools, if already known
+            
+        Returns:
+            List of workflow steps, or None if Bedrock did not produce a usable plan
+        """
+        prompt = self._build_plan_prompt(goal, available_agents, available_tools, fingerprint)
         
         try:
             # Call Bedrock to generate the plan
-            model_id = os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-v2")
-            response = self.bedrock_client.invoke_model(
-                model_id=model_id,
-                prompt=prompt,
-                parameters={
-                    "maxTokens": 1000,
-                    "temperature": 0.2,
-                    "topP": 0.9
-                }
-            )
+            response = model_router.invoke(self.bedrock_client, PLANNING, prompt, parameters or PLANNING_PARAMETERS)
             
             # Extract the workflow steps from the response
-            if "anthropic" in model_id.lower():
-                completion = response.get("completion", "")
-            else:
-                completion = response.get("outputText", "")
-            
-            # Try to parse the JSON response
+            parser = JsonArrayStream()
             try:
-                # Find JSON array in the response
-                json_start = completion.find('[')
-                json_end = completion.rfind(']') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = completion[json_start:json_end]
-                    steps = json.loads(json_str)
-                    return steps
+                parser.feed(get_completion_text(response))
+                if parser.done:
+                    return parser.items
             except Exception as e:
                 print(f"Error parsing Bedrock response: {e}")
-                # Fall back to rule-based planning
         except Exception as e:
             print(f"Error calling Bedrock: {e}")
         
-        # Fallback to rule-based planning if Bedrock fails
-        return self._analyze_goal(goal, available_agents, available_tools)
+        # The caller falls back to rule-based planning
+        return None
     
-    def _analyze_goal(self, goal: str, available_agents: List[Dict], available_tools: List[Dict]) -> List[Dict]:
+    def _plan_with_bedrock_stream(self, goal: str, available_agents: List[Dict], available_tools: List[Dict],
+                                  fingerprint: Optional[str] = None
+                                  ) -> Generator[Dict[str, Any], None, Optional[List[Dict]]]:
+        """
+        Stream a Bedrock plan, yielding token and step events.
+        
+        Returns:
+            List of workflow steps, or None if Bedrock did not produce a usable
+            plan, via the generator's return value
+        """
+        prompt = self._build_plan_prompt(goal, available_agents, available_tools, fingerprint)
+        parser = JsonArrayStream()
+        
+        try:
+            for text in model_router.invoke_stream(self.bedrock_client, PLANNING, prompt, PLANNING_PARAMETERS):
+                yield {"type": "token", "text": text}
+                for step in parser.feed(text):
+                    yield {"type": "step", "index": len(parser.items) - 1, "step": step}
+            
+            if parser.done:
+                return parser.items
+        except Exception as e:
+            print(f"Error streaming Bedrock plan: {e}")
+        
+        # The caller falls back to rule-based planning
+        return None
+    
+    def _analyze_goal(self, goal: str, available_agents: List[Dict], available_tools: List[Dict],
+                      fingerprint: Optional[str] = None) -> List[Dict]:
         """
         Analyze the goal and break it down into steps using rule-based matching.
         
-        This is a simplified implementation that uses keyword matching as a fallback
-        when the Bedrock LLM is not available.
+        This is a simplified implementation used as a fallback when the Bedrock
+        LLM is not available. Each clause of the goal ("... and then ...")
+        becomes a step using the agent whose name, description, tags and
+        specification match it best; goals that match no agent that way fall
+        back to the trigger keywords agents declare in the registry.
         """
         steps = []
         
-        # Common patterns and corresponding agents
-        patterns = [
-            (r"\becho\b|\brepeat\b|\bsay\b", "EchoAgent"),
-            (r"\btest\b|\bvalidate\b|\bverify\b", "AgentTesterAgent"),
-            (r"\bclassify\b|\bidentify\b|\bcategorize\b", "ClassifierAgent"),
-            (r"\bevaluate\b|\bscore\b|\bassess\b", "EvaluatorAgent"),
-            (r"\bexecute\b|\brun\b|\bperform\b", "WorkflowExecutorAgent"),
-            (r"\bgenerate\b|\bcreate\b|\bcompose\b", "AutoAgentComposerAgent"),
-            # Add more patterns as needed
-        ]
-        
-        # Check for matches in the goal
+        agent_index, _, triggers = self._capability_matchers(available_agents, available_tools, fingerprint)
         matched_agents = []
-        for pattern, agent in patterns:
-            if re.search(pattern, goal.lower()):
-                matched_agents.append(agent)
+        for clause in _CLAUSE_PATTERN.split(goal):
+            best = agent_index.match(clause, MIN_CAPABILITY_SCORE)[:1]
+            if best and best[0].get("name") and best[0]["name"] not in matched_agents:
+                matched_agents.append(best[0]["name"])
+        
+        # Check for trigger keywords in the goal
+        if not matched_agents:
+            matched_agents = triggers.match(goal)
         
         # If no specific agents matched, use a default sequence
         if not matched_agents:
@@ -190,6 +438,30 @@ Workflow plan:
         
         return steps
     
+    def _capability_matchers(self, available_agents: List[Dict], available_tools: List[Dict],
+                             fingerprint: Optional[str] = None
+                             ) -> Tuple[CapabilityIndex, CapabilityIndex, TriggerMatcher]:
+        """
+        Get the agent and tool indexes and the agent trigger matcher.
+        
+        They are rebuilt only when the capabilities change. Callers that
+        read the registry pass the fingerprint plan_cache memoizes per
+        registry generation, so the capabilities are not serialized again
+        on every call.
+        """
+        key = fingerprint or capability_fingerprint(available_agents, available_tools)
+        cached = self._matchers
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        matchers = (
+            CapabilityIndex(available_agents),
+            CapabilityIndex(available_tools),
+            # Registries initialized before agents declared triggers fall back to the core ones
+            TriggerMatcher.from_components(available_agents, CORE_TRIGGERS)
+        )
+        self._matchers = (key, matchers)
+        return matchers
+    
     def _identify_missing_capabilities(self, steps: List[Dict], available_agents: List[Dict], available_tools: List[Dict]) -> List[Dict]:
         """
         Identify any capabilities (agents/tools) that are needed but not available.
@@ -203,7 +475,7 @@ Workflow plan:
                 name = agent.get("name") or agent.get("id") or str(agent)
                 available_agent_names.append(name)
         
-        for step in steps:
+        for step in iter_agent_steps(steps):
             agent_name = step.get("agent")
             if agent_name and agent_name not in available_agent_names:
                 missing.append({
@@ -217,8 +489,12 @@ Workflow plan:
     def _generate_id(self, goal: str) -> str:
         """
         Generate a simple ID based on the goal.
+        
+        The suffix is derived from a stable hash of the normalized goal, so
+        the same goal gets the same ID in every process.
         """
         # Create a simplified slug from the goal
         slug = re.sub(r'[^\w\s]', '', goal.lower())
         slug = re.sub(r'\s+', '-', slug)[:20]  # Limit length
-        return f"{slug}-{hash(goal) % 10000:04d}"
\ No newline at end of file
+        digest = hashlib.sha256(normalize_goal(goal).encode("utf-8")).hexdigest()
+        return f"{slug}-{int(digest, 16) % 10000:04d}"
\ No newline at end of file
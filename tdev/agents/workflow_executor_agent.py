@@ -1,8 +1,182 @@
-from typing import Dict, Any, Optional
+import os
+import json
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union
 
 from tdev.core.agent import Agent
 from tdev.core.registry import get_registry
 from tdev.core.workflow import Workflow, load_workflow, get_workflow_path
+from tdev.core.expressions import compile_expression, CompiledExpression
+from tdev.monitoring.telemetry import tracer, payload_size
+from tdev.monitoring.cost_model import agent_profiles
+from tdev.monitoring.replay import get_active_session
+
+# Finished step spans feed the per-agent cost profiles workflows are estimated from
+tracer.add_exporter(agent_profiles)
+
+# Deepest nesting of workflows inside workflows; inline definitions without an ID
+# cannot be checked for cycles, so this bounds them
+MAX_WORKFLOW_DEPTH = int(os.environ.get("TDEV_MAX_WORKFLOW_DEPTH", 16))
+
+
+@dataclass
+class CompiledStep:
+    """A workflow step with its expressions compiled and references resolved."""
+    path: str
+    kind: str  # "agent", "switch", "exit" or "workflow"
+    agent: Optional[str] = None
+    input_from: str = "input"
+    output_to: str = "output"
+    guard_source: Optional[Any] = None
+    guard: Optional[CompiledExpression] = None
+    selector_source: Optional[str] = None
+    selector: Optional[CompiledExpression] = None
+    cases: Dict[str, List['CompiledStep']] = field(default_factory=dict)
+    default: List['CompiledStep'] = field(default_factory=list)
+    workflow: Optional[Union[str, Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+
+def _compile_value(source: Any) -> CompiledExpression:
+    """Compile an expression, treating non-string literals as constants."""
+    if isinstance(source, str):
+        return compile_expression(source)
+    return lambda ctx: source
+
+
+def compile_steps(steps: List[Dict[str, Any]], prefix: str = "") -> List[CompiledStep]:
+    """
+    Compile workflow steps into an executable plan.
+    
+    Guards and switch selectors are compiled up front. An expression that
+    fails to compile is kept on the step as an error and reported when the
+    step is reached, so one bad guard does not prevent the rest of the
+    workflow from running.
+    
+    Args:
+        steps: The raw step definitions
+        prefix: Position prefix for nested steps
+        
+    Returns:
+        The compiled steps
+    """
+    compiled = []
+    for i, step in enumerate(steps):
+        path = f"{prefix}{i}"
+        if "switch" in step:
+            kind = "switch"
+        elif step.get("exit"):
+            kind = "exit"
+        elif step.get("workflow"):
+            kind = "workflow"
+        else:
+            kind = "agent"
+        
+        node = CompiledStep(
+            path=path,
+            kind=kind,
+            agent=step.get("agent"),
+            input_from=step.get("input_from", "input"),
+            output_to=step.get("output_to", "output"),
+            workflow=step.get("workflow"),
+        )
+        try:
+            if "when" in step:
+                node.guard_source = step["when"]
+                node.guard = _compile_value(step["when"])
+            if kind == "switch":
+                node.selector_source = step["switch"]
+                node.selector = _compile_value(step["switch"])
+                node.cases = {
+                    str(key): compile_steps(branch, prefix=f"{path}.{key}.")
+                    for key, branch in step.get("cases", {}).items()
+                }
+                node.default = compile_steps(step.get("default", []), prefix=f"{path}.default.")
+        except ValueError as e:
+            node.error = str(e)
+        compiled.append(node)
+    return compiled
+
+
+class AgentPool:
+    """
+    Reuses agent instances across steps, runs and nested workflows.
+    
+    Instances are pooled per registry and dropped when the registry's
+    generation changes, so re-registered components are picked up.
+    """
+    
+    def __init__(self):
+        """Initialize the pool."""
+        self._pools = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+    
+    def get(self, registry, name: str):
+        """
+        Get a pooled instance of a component, creating it on first use.
+        
+        Args:
+            registry: The registry used to create instances
+            name: The name of the component
+            
+        Returns:
+            The instance, or None if the registry cannot create it
+        """
+        generation = getattr(registry, "generation", None)
+        with self._lock:
+            entry = self._pools.get(registry)
+            if entry is None or entry[0] != generation:
+                entry = (generation, {})
+                self._pools[registry] = entry
+            instance = entry[1].get(name)
+        if instance is not None:
+            return instance
+        
+        instance = registry.get_instance(name)
+        if instance is not None:
+            with self._lock:
+                instance = entry[1].setdefault(name, instance)
+        return instance
+    
+    def clear(self) -> None:
+        """Drop every pooled instance."""
+        with self._lock:
+            self._pools = weakref.WeakKeyDictionary()
+
+
+# Compiled plans for workflows loaded from files. load_workflow() returns the
+# same Workflow object while the file is unchanged, so plans live exactly as
+# long as the cached workflow they were compiled from.
+_plan_cache = weakref.WeakKeyDictionary()
+_plan_cache_lock = threading.Lock()
+
+# Process-wide pool of agent instances used by workflow steps
+agent_pool = AgentPool()
+
+
+def get_compiled_plan(workflow: Union[Workflow, Dict[str, Any]]) -> List[CompiledStep]:
+    """
+    Get the compiled plan for a workflow, reusing it for loaded workflows.
+    
+    Args:
+        workflow: A Workflow instance or a workflow dictionary
+        
+    Returns:
+        The compiled steps
+    """
+    if not isinstance(workflow, Workflow):
+        return compile_steps(workflow.get('steps', []))
+    
+    with _plan_cache_lock:
+        plan = _plan_cache.get(workflow)
+    if plan is None:
+        plan = compile_steps(workflow.steps)
+        with _plan_cache_lock:
+            _plan_cache[workflow] = plan
+    return plan
+
 
 class WorkflowExecutorAgent(Agent):
     """
@@ -10,6 +184,11 @@ class WorkflowExecutorAgent(Agent):
     
     The WorkflowExecutorAgent loads a workflow definition and executes
     each step in sequence, passing data between steps as needed.
+    Steps may be guarded by ``when`` expressions, grouped into ``switch``
+    branches, or end the run early with ``exit``, so agents whose work is
+    unnecessary are never invoked. A ``workflow`` step runs another
+    workflow inline, sharing compiled plans and pooled agent instances.
+    Every run is recorded as a trace with one child span per step.
     """
     
     def run(self, request: Dict[str, Any]) -> Dict[str, Any]:
@@ -20,7 +199,7 @@ class WorkflowExecutorAgent(Agent):
             request: A dictionary containing:
                 - workflow: The workflow definition (dict) or workflow_id (str)
                 - input: Optional input data for the workflow
-            
+                
         Returns:
             The output data from the workflow
         """
@@ -28,78 +207,224 @@ class WorkflowExecutorAgent(Agent):
         workflow_data = request.get("workflow")
         input_data = request.get("input", {})
         
-        if isinstance(workflow_data, str):
-            # It's a workflow ID
-            workflow_id = workflow_data
-            print(f"WorkflowExecutorAgent: Running workflow {workflow_id}")
-            workflow_path = get_workflow_path(workflow_id)
-            workflow = load_workflow(workflow_path)
-        elif isinstance(workflow_data, dict):
-            # It's a workflow definition
-            print(f"WorkflowExecutorAgent: Running workflow {workflow_data}")
-            workflow = workflow_data
-        else:
+        if not isinstance(workflow_data, (str, dict)):
             return {"error": "Invalid workflow data provided"}
         
         # Initialize context with input data
         context = input_data or {}
         
-        if not workflow:
-            return {"error": "Workflow not found or invalid"}
+        return self._execute(workflow_data, context, get_registry(), stack=())
+    
+    def _resolve_workflow(self, workflow_data: Union[str, Dict[str, Any]]):
+        """Load a workflow by ID, or return an inline definition unchanged."""
+        if isinstance(workflow_data, str):
+            with tracer.span("workflow.load", workflow_id=workflow_data):
+                return load_workflow(get_workflow_path(workflow_data))
+        return workflow_data
+    
+    def _execute(self, workflow_data: Union[str, Dict[str, Any]], context: Dict[str, Any],
+                 registry, stack: tuple) -> Dict[str, Any]:
+        """
+        Execute a workflow against a context.
         
-        # Handle both Workflow objects and dict workflows
-        if hasattr(workflow, 'id'):
-            workflow_id = workflow.id
-            steps = workflow.steps
-            outputs = workflow.outputs
-        else:
-            workflow_id = workflow.get('id', 'unknown')
-            steps = workflow.get('steps', [])
-            outputs = workflow.get('outputs', {})
+        Args:
+            workflow_data: A workflow ID or inline workflow definition
+            context: The context for this run, updated in place
+            registry: The registry used to resolve agents
+            stack: IDs of the workflows currently executing, outermost first
+                (None for inline definitions without one)
+            
+        Returns:
+            The output data from the workflow
+        """
+        with tracer.span("workflow.run", depth=len(stack)) as run_span:
+            run_span.set_attribute("source", "id" if isinstance(workflow_data, str) else "inline")
+            workflow = self._resolve_workflow(workflow_data)
+            if not workflow:
+                run_span.status = "error"
+                run_span.error = "Workflow not found or invalid"
+                return {"error": "Workflow not found or invalid"}
+            
+            # Handle both Workflow objects and dict workflows
+            if isinstance(workflow, Workflow):
+                workflow_id = workflow.id
+                outputs = workflow.outputs
+            else:
+                workflow_id = workflow.get('id')
+                outputs = workflow.get('outputs', {})
+            
+            plan = get_compiled_plan(workflow)
+            run_span.set_attribute("workflow_id", workflow_id or "unknown")
+            run_span.set_attribute("step_count", len(plan))
+            
+            # Execute the steps; an exit step stops the run early
+            completed = self._run_steps(plan, context, registry, stack + (workflow_id,))
+            run_span.set_attribute("exited_early", not completed)
+            
+            # Extract the final output
+            output = {}
+            for output_name, source_key in outputs.items():
+                output[output_name] = context.get(source_key)
+            
+            # If no outputs defined, return the entire context
+            if not output:
+                output = context
+            
+            return output
+    
+    def _run_steps(self, steps: List[CompiledStep], context: Dict[str, Any], registry,
+                   stack: tuple) -> bool:
+        """
+        Run a sequence of compiled steps, honouring guards, switches and exit steps.
         
-        print(f"WorkflowExecutorAgent: Loaded workflow {workflow_id}")
+        Args:
+            steps: The compiled steps to run
+            context: The workflow context, updated in place
+            registry: The registry used to resolve agents
+            stack: IDs of the workflows currently executing
+            
+        Returns:
+            False if an exit step ended the run, True otherwise
+        """
+        for step in steps:
+            if step.error:
+                self._record_step_error(step, context, f"Invalid guard: {step.error}")
+                continue
+            
+            # Evaluate the step guard before touching the agent
+            if step.guard is not None:
+                try:
+                    should_run = step.guard(context)
+                except Exception as e:
+                    self._record_step_error(step, context, f"Invalid guard: {e}")
+                    continue
+                if not should_run:
+                    with tracer.span("workflow.step", index=step.path, agent=step.agent) as span:
+                        span.status = "skipped"
+                        span.set_attribute("guard", step.guard_source)
+                    continue
+            
+            if step.kind == "exit":
+                with tracer.span("workflow.exit", index=step.path):
+                    pass
+                return False
+            
+            if step.kind == "switch":
+                if not self._run_switch(step, context, registry, stack):
+                    return False
+            elif step.kind == "workflow":
+                self._run_subworkflow(step, context, registry, stack)
+            else:
+                self._run_step(step, context, registry)
+        
+        return True
+    
+    def _run_switch(self, step: CompiledStep, context: Dict[str, Any], registry, stack: tuple) -> bool:
+        """
+        Run the branch of a switch step selected by its expression.
         
-        # Get the registry
-        registry = get_registry()
+        Case keys are matched against the selector value as written in JSON
+        (workflow files can only use string keys, so ``true`` matches True and
+        ``null`` matches None), falling back to the ``default`` branch.
         
-        # Execute each step
-        for i, step in enumerate(steps):
-            agent_name = step.get('agent')
-            if not agent_name:
-                print(f"WorkflowExecutorAgent: Step {i+1} has no agent specified")
-                continue
+        Returns:
+            False if an exit step inside the branch ended the run, True otherwise
+        """
+        with tracer.span("workflow.switch", index=step.path, selector=step.selector_source) as span:
+            try:
+                value = step.selector(context)
+            except Exception as e:
+                span.status = "error"
+                span.error = str(e)
+                context[f"error_{step.path}"] = str(e)
+                return True
             
-            print(f"WorkflowExecutorAgent: Step {i+1}: Running {agent_name}")
+            key = value if isinstance(value, str) else json.dumps(value, default=str)
+            branch = step.cases.get(key)
+            if branch is None:
+                key, branch = "default", step.default
+            span.set_attribute("branch", key)
+            
+            return self._run_steps(branch, context, registry, stack)
+    
+    def _run_subworkflow(self, step: CompiledStep, context: Dict[str, Any], registry, stack: tuple) -> None:
+        """
+        Run another workflow inline as a nested run.
+        
+        The nested run gets its own context seeded with this step's input,
+        and its outputs are stored under the step's ``output_to`` key.
+        """
+        workflow_ref = step.workflow
+        ref_id = workflow_ref if isinstance(workflow_ref, str) else workflow_ref.get('id')
+        if ref_id is not None and ref_id in stack:
+            cycle = " -> ".join(str(workflow_id or "<inline>") for workflow_id in stack + (ref_id,))
+            self._record_step_error(step, context, f"Recursive workflow reference: {cycle}")
+            return
+        if len(stack) >= MAX_WORKFLOW_DEPTH:
+            self._record_step_error(step, context, f"Workflows nested more than {MAX_WORKFLOW_DEPTH} levels deep")
+            return
+        
+        nested_context = {"input": context.get(step.input_from, {})}
+        result = self._execute(workflow_ref, nested_context, registry, stack)
+        if isinstance(result, dict) and set(result) == {"error"}:
+            context[f"error_{step.path}"] = result["error"]
+            return
+        context[step.output_to] = result
+    
+    def _record_step_error(self, step: CompiledStep, context: Dict[str, Any], error: str) -> None:
+        """Record a step that could not run; the step is skipped."""
+        with tracer.span("workflow.step", index=step.path, agent=step.agent) as span:
+            span.status = "error"
+            span.error = error
+        context[f"error_{step.path}"] = error
+    
+    def _run_step(self, step: CompiledStep, context: Dict[str, Any], registry) -> None:
+        """
+        Run a single agent step inside its own trace span.
+        
+        Args:
+            step: The compiled step
+            context: The workflow context, updated in place with the step output
+            registry: The registry used to resolve agents
+        """
+        agent_name = step.agent
+        with tracer.span("workflow.step", index=step.path, agent=agent_name,
+                         cache_hits=0, retries=0) as span:
+            if not agent_name:
+                span.status = "skipped"
+                span.error = "No agent specified"
+                return
             
             # Get the agent
-            agent = registry.get_instance(agent_name)
+            agent = agent_pool.get(registry, agent_name)
             if not agent:
-                print(f"WorkflowExecutorAgent: Agent not found: {agent_name}")
-                continue
+                span.status = "error"
+                span.error = f"Agent not found: {agent_name}"
+                return
             
             # Get input for this step
-            step_input = context.get(step.get('input_from', 'input'), {})
+            step_input = context.get(step.input_from, {})
+            span.set_attribute("input_bytes", payload_size(step_input))
             
-            # Run the agent
+            # Run the agent, or serve its recorded output when replaying
+            session = get_active_session()
             try:
-                step_output = agent.run(step_input)
-                print(f"WorkflowExecutorAgent: Step {i+1}: {agent_name} completed")
-                
-                # Store the output in the context
-                output_key = step.get('output_to', 'output')
-                context[output_key] = step_output
+                if session is not None and session.replaying:
+                    step_output = session.replay_agent(agent_name, step_input)
+                else:
+                    step_output = agent.run(step_input)
             except Exception as e:
-                print(f"WorkflowExecutorAgent: Error executing {agent_name}: {e}")
-                context[f"error_{i}"] = str(e)
-        
-        # Extract the final output
-        output = {}
-        for output_name, source_key in outputs.items():
-            output[output_name] = context.get(source_key)
-        
-        # If no outputs defined, return the entire context
-        if not output:
-            output = context
-        
-        print(f"WorkflowExecutorAgent: Workflow {workflow_id} completed")
-        return output
\ No newline at end of file
+                if session is not None and session.recording:
+                    session.record_agent(agent_name, step_input, error=str(e))
+                span.status = "error"
+                span.error = str(e)
+                context[f"error_{step.path}"] = str(e)
+                return
+            
+            if session is not None and session.recording:
+                session.record_agent(agent_name, step_input, step_output)
+            
+            span.set_attribute("output_bytes", payload_size(step_output))
+            
+            # Store the output in the context
+            context[step.output_to] = step_output
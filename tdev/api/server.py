@@ -11,6 +11,8 @@ import uvicorn
 from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 
@@ -45,6 +47,15 @@ feedback_collector = FeedbackCollector()
 # WebSocket connections
 active_connections: Dict[str, WebSocket] = {}
 
+async def run_coordinator(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the coordinator on a worker thread so model calls don't block the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, coordinator.run, request)
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Format a coordinator event as a Server-Sent Events message."""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+
 # Models
 class OrchestrationRequest(BaseModel):
     goal: str
@@ -130,7 +141,7 @@ async def orchestrate(request: OrchestrationRequest, user=Depends(get_current_us
     if user and hasattr(user, 'permissions') and not auth_manager.check_permission(user, "write"):
         raise HTTPException(status_code=403, detail=i18n.translate("error.permission_denied", lang))
     
-    result = coordinator.run({"goal": request.goal, "options": request.options or {}})
+    result = await run_coordinator({"goal": request.goal, "options": request.options or {}})
     if not result.get("success", False):
         error_msg = i18n.translate("orchestrate.failed", lang)
         raise HTTPException(status_code=400, detail=result.get("error", error_msg))
@@ -138,10 +149,23 @@ async def orchestrate(request: OrchestrationRequest, user=Depends(get_current_us
     result["message"] = i18n.translate("orchestrate.success", lang)
     return result
 
+@app.post("/orchestrate/stream")
+async def orchestrate_stream(request: OrchestrationRequest, user=Depends(get_current_user), lang: str = "en"):
+    """Orchestrate a goal, streaming progress as Server-Sent Events."""
+    i18n.set_language(lang)
+    
+    # Check permissions
+    if user and hasattr(user, 'permissions') and not auth_manager.check_permission(user, "write"):
+        raise HTTPException(status_code=403, detail=i18n.translate("error.permission_denied", lang))
+    
+    # The coordinator is a blocking generator; StreamingResponse iterates it on a worker thread
+    events = coordinator.run_stream({"goal": request.goal, "options": request.options or {}})
+    return StreamingResponse((format_sse(event) for event in events), media_type="text/event-stream")
+
 @app.post("/classify")
 async def classify(request: CodeRequest):
     """Classify code."""
-    result = coordinator.run({"code": request.code, "options": request.options or {}})
+    result = await run_coordinator({"code": request.code, "options": request.options or {}})
     if not result.get("success", False):
         raise HTTPException(status_code=400, detail=result.get("error", "Classification failed"))
     return result
@@ -204,13 +228,20 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             request = json.loads(data)
             
             # Handle different request types
-            if "goal" in request:
+            if request.get("stream") and ("goal" in request or "code" in request):
+                # Stream progress events, one frame per event
+                events = coordinator.run_stream({
+                    key: request[key] for key in ("goal", "code", "options") if key in request
+                })
+                async for event in iterate_in_threadpool(events):
+                    await websocket.send_json(event)
+            elif "goal" in request:
                 # Orchestrate a goal
-                result = coordinator.run({"goal": request["goal"], "options": request.get("options", {})})
+                result = await run_coordinator({"goal": request["goal"], "options": request.get("options", {})})
                 await websocket.send_json(result)
             elif "code" in request:
                 # Classify code
-                result = coordinator.run({"code": request["code"], "options": request.get("options", {})})
+                result = await run_coordinator({"code": request["code"], "options": request.get("options", {})})
                 await websocket.send_json(result)
             else:
                 await websocket.send_json({"error": "Invalid request"})
@@ -4,10 +4,12 @@ import json
 import click
 from pathlib import Path
 from datetime import datetime
+from contextlib import nullcontext
 
 from tdev.core import config
 from tdev.core.init_registry import initialize_registry
 from tdev.core.registry import get_registry
+from tdev.monitoring import replay as replay_module
 
 @click.group()
 def main():
@@ -592,7 +594,9 @@ def run_team(team_name, input):
 @click.argument('goal')
 @click.option('--code', help='Path to code file to classify')
 @click.option('--options', help='Options as JSON string')
-def orchestrate(goal, code, options):
+@click.option('--record', 'record_path', type=click.Path(),
+              help='Record agent outputs and model responses to a trace file')
+def orchestrate(goal, code, options, record_path):
     """Orchestrate agents to fulfill a goal using Agent Squad."""
     click.echo(f"Orchestrating to fulfill goal: {goal}")
     
@@ -641,7 +645,11 @@ def orchestrate(goal, code, options):
         
         # Run the DevCoordinatorAgent
         click.echo("Starting orchestration with DevCoordinatorAgent...")
-        result = coordinator.run(request)
+        recording = replay_module.record(record_path, {"request": request}) if record_path else nullcontext()
+        with recording:
+            result = coordinator.run(request)
+        if record_path:
+            click.echo(f"Trace recorded to {record_path}")
     
     # Display the result
     click.echo("Orchestration completed.")
@@ -649,6 +657,57 @@ def orchestrate(goal, code, options):
     
     return result
 
+@main.command()
+@click.argument('trace', type=click.Path(exists=True))
+@click.option('--iterations', default=1, help='Number of times to replay the trace')
+def replay(trace, iterations):
+    """Replay a recorded orchestration without calling models or AWS."""
+    coordinator = get_registry().get_instance("DevCoordinatorAgent")
+    if not coordinator:
+        click.echo("DevCoordinatorAgent not found")
+        return
+    
+    results = []
+    stats = replay_module.benchmark_replay(
+        trace, lambda metadata: results.append(coordinator.run(metadata.get("request", {}))), iterations
+    )
+    
+    click.echo("Replay completed.")
+    click.echo(f"Result: {results[-1] if results else None}")
+    click.echo(f"Iterations: {stats['iterations']}")
+    click.echo(f"Mean: {stats['mean_ms']:.2f} ms, Min: {stats['min_ms']:.2f} ms, P95: {stats['p95_ms']:.2f} ms")
+    
+    return stats
+
+@main.command()
+@click.option('--host', default='127.0.0.1', help='Interface to listen on')
+@click.option('--port', default=8123, help='Port to listen on')
+@click.option('--latency', default='0', help='Latency per request, e.g. 0.2, uniform:0.1,0.5 or lognormal:-1.5,0.5')
+@click.option('--error-rate', default=0.0, help='Fraction of requests that fail with a server error')
+@click.option('--throttle-rate', default=0.0, help='Fraction of requests that are throttled')
+@click.option('--script', type=click.Path(exists=True), help='JSON file of scripted responses')
+@click.option('--seed', type=int, help='Random seed for reproducible runs')
+def stub_bedrock(host, port, latency, error_rate, throttle_rate, script, seed):
+    """Run a local stand-in for the Bedrock runtime API for load testing."""
+    from tdev.agent_core.stub_server import BedrockStubServer, ResponseScript
+    
+    server = BedrockStubServer(
+        host=host,
+        port=port,
+        latency=latency,
+        error_rate=error_rate,
+        throttle_rate=throttle_rate,
+        script=ResponseScript.load(script) if script else None,
+        seed=seed
+    )
+    click.echo(f"Bedrock stub listening on {server.endpoint_url}")
+    click.echo(f"Set BEDROCK_ENDPOINT_URL={server.endpoint_url} to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"Stats: {server.stats()}")
+
 @main.command()
 def init_registry():
     """Initialize the registry with core components."""
@@ -0,0 +1,246 @@
+"""
+Capability index for T-Developer.
+
+Matching a goal against the registry used to mean scanning every
+component's name and description. CapabilityIndex instead builds, once
+per set of components, a sparse TF-IDF matrix over each component's
+name, description, tags, trigger keywords and specification (``specs/agents/*.json``,
+``specs/tools/*.json``), stored in CSR form with NumPy arrays. Scoring a
+goal against every component is then a single sparse matrix-vector
+product, which keeps rule-based planning and prompt filtering fast with
+thousands of generated agents.
+"""
+import os
+import re
+import json
+import math
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+# Default location of the component specifications
+SPECS_DIR = os.environ.get("TDEV_SPECS_DIR") or str(Path(__file__).resolve().parents[2] / "specs")
+
+# Specification fields that describe what a component does
+SPEC_FIELDS = ("goal", "input", "output")
+
+_WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_STOP_WORDS = {
+    "a", "an", "and", "the", "to", "of", "for", "in", "on", "with", "from", "into", "by",
+    "is", "it", "that", "this", "be", "as", "or", "at", "me", "my", "i", "agent", "tool",
+    "any", "some", "such", "other", "responsible",
+}
+# Suffix rules applied in turn: inflections, then derivations, then word-class endings
+_INFLECTIONS = (("sses", "ss"), ("ies", "y"), ("ied", "y"), ("ing", ""), ("ed", ""), ("s", ""))
+_DERIVATIONS = (
+    ("ization", "ize"), ("isation", "ize"), ("ification", "ify"), ("ational", "ate"), ("ation", "ate"),
+    ("ator", "ate"), ("izer", "ize"), ("ifier", "ify"), ("ment", ""), ("ness", ""), ("ly", ""), ("er", ""),
+)
+_ENDINGS = ("ize", "ise", "ify", "ate", "y", "e")
+
+
+def _strip(word: str, rules) -> str:
+    """Apply the first rule whose suffix the word ends with, keeping a stem of at least three letters."""
+    for suffix, replacement in rules:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def stem(word: str) -> str:
+    """
+    Reduce a lowercase word to its stem with a small suffix stemmer.
+    
+    Inflections are removed first (summarizing -> summarize), then
+    derivations (summarizer -> summarize) and finally the word-class
+    ending, so summarize/summary/summarizer and test/testing share a stem
+    while translate, transcribe and transfer stay apart.
+    
+    Args:
+        word: The word to stem
+        
+    Returns:
+        The stem
+    """
+    if not (word.endswith(("ss", "us", "is")) and not word.endswith("sses")):
+        stemmed = _strip(word, _INFLECTIONS)
+        if stemmed != word and word.endswith(("ing", "ed")):
+            if stemmed.endswith(("at", "iz", "is", "bl")):
+                # translating -> translat -> translate
+                stemmed += "e"
+            elif len(stemmed) > 3 and stemmed[-1] == stemmed[-2] and stemmed[-1] not in "lsz":
+                # planned -> plann -> plan
+                stemmed = stemmed[:-1]
+        word = stemmed
+    word = _strip(word, _DERIVATIONS)
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text, including CamelCase names, into stemmed terms.
+    
+    Args:
+        text: The text to split
+        
+    Returns:
+        The terms, stop words removed
+    """
+    terms = []
+    for word in _WORD_PATTERN.findall(text or ""):
+        word = word.lower()
+        if word not in _STOP_WORDS:
+            terms.append(stem(word))
+    return terms
+
+
+@lru_cache(maxsize=8)
+def load_specs(directory: str = SPECS_DIR) -> Dict[str, str]:
+    """
+    Load the text of every component specification under a directory.
+    
+    Args:
+        directory: Directory containing ``agents/`` and ``tools/`` specifications
+        
+    Returns:
+        A mapping of specification name to its descriptive text
+    """
+    specs = {}
+    for spec_file in sorted(Path(directory).glob("*/*.json")):
+        try:
+            with open(spec_file, 'r') as f:
+                spec = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(spec, dict) and spec.get("name"):
+            specs[spec["name"]] = " ".join(str(spec.get(field, "")) for field in SPEC_FIELDS)
+    return specs
+
+
+def component_text(component: Dict[str, Any], specs: Dict[str, str]) -> str:
+    """
+    Collect the text describing a component.
+    
+    The name is counted twice so a match on it outweighs one in the
+    description. A specification belongs to a component with the same name,
+    with or without the type suffix (``AgentTester`` for ``AgentTesterAgent``).
+    
+    Args:
+        component: Registry metadata of the component
+        specs: Specification texts by name
+        
+    Returns:
+        The component's text
+    """
+    name = str(component.get("name", ""))
+    suffix = str(component.get("type", "")).capitalize()
+    spec = specs.get(name) or (specs.get(name[:-len(suffix)]) if suffix and name.endswith(suffix) else None)
+    keywords = list(component.get("tags") or []) + list(component.get("triggers") or [])
+    return " ".join([name, name, str(component.get("description") or ""), " ".join(map(str, keywords)), spec or ""])
+
+
+class CapabilityIndex:
+    """Sparse TF-IDF index scoring components against a query."""
+    
+    def __init__(self, components: List[Dict[str, Any]], specs: Optional[Dict[str, str]] = None):
+        """
+        Build the index.
+        
+        Args:
+            components: Registry metadata of the components to index
+            specs: Specification texts by name (defaults to load_specs())
+        """
+        self.components = [component for component in components if isinstance(component, dict)]
+        specs = load_specs() if specs is None else specs
+        
+        counts = [Counter(tokenize(component_text(component, specs))) for component in self.components]
+        self.vocabulary: Dict[str, int] = {}
+        for row in counts:
+            for term in row:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+        
+        document_frequency = np.zeros(len(self.vocabulary), dtype=np.float32)
+        indptr = [0]
+        indices: List[int] = []
+        tf: List[float] = []
+        for row in counts:
+            for term, count in row.items():
+                column = self.vocabulary[term]
+                indices.append(column)
+                tf.append(1.0 + math.log(count))
+                document_frequency[column] += 1
+            indptr.append(len(indices))
+        
+        # Smoothed IDF, as in scikit-learn, so a term in every document still counts a little
+        self.idf = np.log((1.0 + len(counts)) / (1.0 + document_frequency)) + 1.0
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self._rows = np.repeat(np.arange(len(counts)), np.diff(self.indptr))
+        data = np.asarray(tf, dtype=np.float32) * self.idf[self.indices]
+        
+        # L2-normalize each row so scores are cosine similarities
+        norms = np.sqrt(np.bincount(self._rows, weights=data * data, minlength=len(counts)))
+        norms[norms == 0] = 1.0
+        self.data = (data / norms[self._rows]).astype(np.float32)
+    
+    def __len__(self) -> int:
+        return len(self.components)
+    
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Score every component against a query.
+        
+        Args:
+            query: The text to match, usually a goal
+            
+        Returns:
+            Cosine similarity of each component to the query, in index order
+        """
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in Counter(tokenize(query)).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                vector[column] = (1.0 + math.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return np.zeros(len(self.components), dtype=np.float32)
+        vector /= norm
+        
+        # CSR matrix-vector product: weight every stored entry, then sum per row
+        return np.bincount(self._rows, weights=self.data * vector[self.indices],
+                           minlength=len(self.components)).astype(np.float32)
+    
+    def rank(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Order the components by relevance to a query.
+        
+        Args:
+            query: The text to match, usually a goal
+            limit: Optional maximum number of components to return
+            
+        Returns:
+            The components, most relevant first; ties keep index order
+        """
+        order = np.argsort(-self.scores(query), kind="stable")
+        return [self.components[position] for position in order[:limit]]
+    
+    def match(self, query: str, min_score: float) -> List[Dict[str, Any]]:
+        """
+        Find the components relevant to a query.
+        
+        Args:
+            query: The text to match, usually a goal
+            min_score: Minimum cosine similarity for a component to count
+            
+        Returns:
+            The matching components, most relevant first
+        """
+        scores = self.scores(query)
+        order = np.argsort(-scores, kind="stable")
+        return [self.components[position] for position in order if scores[position] >= min_score]
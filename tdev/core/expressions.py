@@ -0,0 +1,245 @@
+"""
+Guard expressions for workflow steps.
+
+Workflow steps can carry small expressions (``when`` guards, ``switch``
+selectors) that are evaluated against the workflow context. Expressions use
+a safe subset of Python syntax and are compiled once into closures, so
+evaluating a guard on every run costs a few function calls rather than a
+parse.
+
+Examples:
+    classification.type != 'tool'
+    evaluation.score >= 70 and not evaluation.needs_improvement
+    'error' in output or len(steps) > 3
+"""
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+# A compiled expression takes the workflow context and returns a value
+CompiledExpression = Callable[[Mapping[str, Any]], Any]
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+# Longest string, list or tuple a repetition (``'x' * n``) may produce
+MAX_REPEAT_LENGTH = 100000
+
+
+def _multiply(left: Any, right: Any) -> Any:
+    """Multiply two values, refusing to repeat a sequence beyond MAX_REPEAT_LENGTH."""
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, (str, list, tuple)) and isinstance(count, int):
+            if len(sequence) * count > MAX_REPEAT_LENGTH:
+                raise ExpressionError(f"Repetition longer than {MAX_REPEAT_LENGTH} items is not allowed")
+    return operator.mul(left, right)
+
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+}
+
+_UNARY_OPS = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_FUNCTIONS = {
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "lower": lambda value: str(value).lower(),
+}
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression uses unsupported syntax."""
+    pass
+
+
+def _get_field(obj: Any, key: Any) -> Any:
+    """
+    Look up a key, index or attribute, returning None when it is missing.
+    
+    Raises:
+        ExpressionError: If a private attribute is looked up on an object
+            that is not a mapping, as in ``agent['__class__']``
+    """
+    if obj is None:
+        return None
+    if isinstance(obj, Mapping):
+        return obj.get(key)
+    if isinstance(obj, (list, tuple, str)) and isinstance(key, int):
+        return obj[key] if -len(obj) <= key < len(obj) else None
+    if isinstance(key, str):
+        if key.startswith("_"):
+            raise ExpressionError(f"Access to private attribute '{key}' is not allowed")
+        return getattr(obj, key, None)
+    return None
+
+
+
+def _compile_node(node: ast.AST) -> CompiledExpression:
+    """Compile an AST node into a closure over the context."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda ctx: value
+    
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda ctx: ctx.get(name)
+    
+    if isinstance(node, ast.Attribute):
+        if node.attr.startswith("_"):
+            raise ExpressionError(f"Access to private attribute '{node.attr}' is not allowed")
+        base = _compile_node(node.value)
+        attr = node.attr
+        return lambda ctx: _get_field(base(ctx), attr)
+    
+    if isinstance(node, ast.Subscript):
+        base = _compile_node(node.value)
+        index_node = node.slice
+        # Python 3.8 wraps plain subscripts in ast.Index
+        if hasattr(ast, "Index") and isinstance(index_node, getattr(ast, "Index")):
+            index_node = index_node.value
+        if isinstance(index_node, ast.Slice):
+            raise ExpressionError("Slices are not supported")
+        index = _compile_node(index_node)
+        return lambda ctx: _get_field(base(ctx), index(ctx))
+    
+    if isinstance(node, ast.BoolOp):
+        values = [_compile_node(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def and_(ctx):
+                result = True
+                for value in values:
+                    result = value(ctx)
+                    if not result:
+                        return result
+                return result
+            return and_
+        
+        def or_(ctx):
+            result = False
+            for value in values:
+                result = value(ctx)
+                if result:
+                    return result
+            return result
+        return or_
+    
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand)
+        return lambda ctx: op(operand(ctx))
+    
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        return lambda ctx: op(left(ctx), right(ctx))
+    
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left)
+        ops = []
+        for op_node, comparator in zip(node.ops, node.comparators):
+            if type(op_node) not in _COMPARE_OPS:
+                raise ExpressionError(f"Unsupported comparison: {type(op_node).__name__}")
+            ops.append((_COMPARE_OPS[type(op_node)], _compile_node(comparator)))
+        
+        def compare(ctx):
+            current = left(ctx)
+            for op, comparator in ops:
+                right = comparator(ctx)
+                try:
+                    if not op(current, right):
+                        return False
+                except TypeError:
+                    # Comparing missing values (None) with numbers is simply false
+                    return False
+                current = right
+            return True
+        return compare
+    
+    if isinstance(node, ast.IfExp):
+        test = _compile_node(node.test)
+        body = _compile_node(node.body)
+        orelse = _compile_node(node.orelse)
+        return lambda ctx: body(ctx) if test(ctx) else orelse(ctx)
+    
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile_node(item) for item in node.elts]
+        container = {ast.List: list, ast.Tuple: tuple, ast.Set: set}[type(node)]
+        return lambda ctx: container(item(ctx) for item in items)
+    
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise ExpressionError("Only the functions " + ", ".join(sorted(_FUNCTIONS)) + " may be called")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        func = _FUNCTIONS[node.func.id]
+        args = [_compile_node(arg) for arg in node.args]
+        return lambda ctx: func(*(arg(ctx) for arg in args))
+    
+    raise ExpressionError(f"Unsupported expression syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> CompiledExpression:
+    """
+    Compile an expression into a callable over the workflow context.
+    
+    Compiled expressions are cached by source text, so the same guard used
+    across runs or workflows is parsed only once.
+    
+    Args:
+        source: The expression source
+        
+    Returns:
+        A callable taking the context mapping and returning the value
+        
+    Raises:
+        ExpressionError: If the expression is invalid or uses unsupported syntax
+    """
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression '{source}': {e.msg}") from e
+    return _compile_node(tree.body)
+
+
+def evaluate(source: Any, context: Mapping[str, Any]) -> Any:
+    """
+    Evaluate an expression against a context.
+    
+    Non-string values (e.g. a literal ``true`` in a workflow file) are
+    returned unchanged.
+    
+    Args:
+        source: The expression source, or a literal value
+        context: The workflow context
+        
+    Returns:
+        The value of the expression
+    """
+    if not isinstance(source, str):
+        return source
+    return compile_expression(source)(context)
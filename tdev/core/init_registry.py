@@ -1,6 +1,16 @@
 from tdev.core.registry import get_registry
 from tdev.core.schema import ToolMeta, AgentMeta, TeamMeta
 
+# Trigger keywords of the core agents
+CORE_TRIGGERS = {
+    "EchoAgent": ["echo", "repeat", "say"],
+    "WorkflowExecutorAgent": ["execute", "run", "perform"],
+    "ClassifierAgent": ["classify", "identify", "categorize"],
+    "EvaluatorAgent": ["evaluate", "score", "assess"],
+    "AgentTesterAgent": ["test", "validate", "verify"],
+    "AutoAgentComposerAgent": ["generate", "create", "compose"],
+}
+
 def initialize_registry():
     """Initialize the registry with core components."""
     registry = get_registry()
@@ -19,7 +29,8 @@ def initialize_registry():
         name="EchoAgent",
         class_path="tdev.agents.echo_agent.EchoAgent",
         description="A simple agent that echoes the input data.",
-        tags=["utility", "example"]
+        tags=["utility", "example"],
+        triggers=list(CORE_TRIGGERS["EchoAgent"])
     )
     registry.register("EchoAgent", echo_agent_meta.to_dict())
     
@@ -28,7 +39,8 @@ def initialize_registry():
         name="WorkflowExecutorAgent",
         class_path="tdev.agents.workflow_executor_agent.WorkflowExecutorAgent",
         description="Agent responsible for executing workflows.",
-        tags=["core", "workflow"]
+        tags=["core", "workflow"],
+        triggers=list(CORE_TRIGGERS["WorkflowExecutorAgent"])
     )
     registry.register("WorkflowExecutorAgent", workflow_executor_meta.to_dict())
     
@@ -37,7 +49,8 @@ def initialize_registry():
         name="ClassifierAgent",
         class_path="tdev.agents.classifier_agent.ClassifierAgent",
         description="Agent responsible for classifying components as Tool, Agent, or Team.",
-        tags=["core", "classification"]
+        tags=["core", "classification"],
+        triggers=list(CORE_TRIGGERS["ClassifierAgent"])
     )
     registry.register("ClassifierAgent", classifier_meta.to_dict())
     
@@ -55,7 +68,8 @@ def initialize_registry():
         name="EvaluatorAgent",
         class_path="tdev.agents.evaluator_agent.EvaluatorAgent",
         description="Agent responsible for evaluating workflows and agents.",
-        tags=["core", "evaluation"]
+        tags=["core", "evaluation"],
+        triggers=list(CORE_TRIGGERS["EvaluatorAgent"])
     )
     registry.register("EvaluatorAgent", evaluator_meta.to_dict())
     
@@ -64,7 +78,8 @@ def initialize_registry():
         name="AgentTesterAgent",
         class_path="tdev.agents.agent_tester_agent.AgentTesterAgent",
         description="Agent responsible for testing other agents and tools.",
-        tags=["core", "testing"]
+        tags=["core", "testing"],
+        triggers=list(CORE_TRIGGERS["AgentTesterAgent"])
     )
     registry.register("AgentTesterAgent", tester_meta.to_dict())
     
@@ -82,7 +97,8 @@ def initialize_registry():
         name="AutoAgentComposerAgent",
         class_path="tdev.agents.auto_agent_composer.AutoAgentComposer",
         description="Agent responsible for generating new agents and tools (Agno).",
-        tags=["core", "generation", "agno"]
+        tags=["core", "generation", "agno"],
+        triggers=list(CORE_TRIGGERS["AutoAgentComposerAgent"])
     )
     registry.register("AutoAgentComposerAgent", auto_agent_composer_meta.to_dict())
     
@@ -0,0 +1,101 @@
+"""
+Incremental JSON parsing for streamed model output.
+
+Models often wrap the JSON they are asked for in prose. JsonArrayStream
+finds the first JSON array in text that arrives in chunks and hands back
+each element as soon as it is complete, so callers can act on the first
+workflow step before the model has finished writing the rest.
+"""
+import json
+from typing import Any, List
+
+
+class JsonArrayStream:
+    """Extracts the elements of the first JSON array in a stream of text."""
+    
+    def __init__(self):
+        """Initialize the parser."""
+        self.items: List[Any] = []
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start = None
+    
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add a chunk of text and return the array elements it completed.
+        
+        Args:
+            text: The next chunk of text
+            
+        Returns:
+            Elements completed by this chunk, in order
+            
+        Raises:
+            json.JSONDecodeError: If a completed element is not valid JSON
+        """
+        if self.done:
+            return []
+        self._buffer += text
+        completed = []
+        
+        while self._pos < len(self._buffer) and not self.done:
+            char = self._buffer[self._pos]
+            
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                    self._depth = 1
+                self._pos += 1
+                continue
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+                self._mark_item_start()
+            elif char in "[{":
+                self._mark_item_start()
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    # The closing bracket of the array ends the last element
+                    self._finish_item(completed)
+                    self.done = True
+                elif self._depth == 1:
+                    # A nested object or array just closed a top-level element
+                    self._pos += 1
+                    self._finish_item(completed)
+                    continue
+            elif char == "," and self._depth == 1:
+                self._finish_item(completed)
+            elif not char.isspace():
+                self._mark_item_start()
+            
+            self._pos += 1
+        
+        return completed
+    
+    def _mark_item_start(self) -> None:
+        """Remember where the current top-level element begins."""
+        if self._depth == 1 and self._item_start is None:
+            self._item_start = self._pos
+    
+    def _finish_item(self, completed: List[Any]) -> None:
+        """Parse the current top-level element, if any, and record it."""
+        if self._item_start is None:
+            return
+        item = json.loads(self._buffer[self._item_start:self._pos])
+        self._item_start = None
+        self.items.append(item)
+        completed.append(item)
@@ -0,0 +1,173 @@
+"""
+Prompt budgeting for T-Developer.
+
+Model prompts built from the registry or from workflows grow with them.
+This module estimates prompt size in tokens and compacts prompt sections
+to explicit budgets: capability lists are filtered to the entries most
+relevant to the goal, JSON is minified with long strings shortened, and
+anything still over budget is truncated with a visible marker.
+"""
+import os
+import re
+import json
+from typing import Dict, Any, List, Optional
+
+from tdev.core.capability_index import CapabilityIndex
+
+# Token budgets for prompt sections
+PROMPT_BUDGETS = {
+    "max_agents": int(os.environ.get("TDEV_PROMPT_MAX_AGENTS", 30)),
+    "max_tools": int(os.environ.get("TDEV_PROMPT_MAX_TOOLS", 20)),
+    "capability_tokens": int(os.environ.get("TDEV_PROMPT_CAPABILITY_TOKENS", 400)),
+    "workflow_tokens": int(os.environ.get("TDEV_PROMPT_WORKFLOW_TOKENS", 3000)),
+    "test_results_tokens": int(os.environ.get("TDEV_PROMPT_TEST_RESULTS_TOKENS", 1000)),
+}
+
+# Marker appended to truncated text
+TRUNCATION_MARKER = " ...[truncated]"
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+    
+    Words count as one token per four letters, numbers one per three
+    digits, and each punctuation character as one token, which tracks
+    subword tokenizers closely enough for budgeting.
+    
+    Args:
+        text: The text to measure
+        
+    Returns:
+        The estimated token count
+    """
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isalpha():
+            tokens += (len(piece) + 3) // 4
+        elif piece[0].isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate a text to a token budget.
+    
+    Args:
+        text: The text to truncate
+        max_tokens: The token budget
+        
+    Returns:
+        The text, cut short with a truncation marker if it was over budget
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    
+    # Binary search for the longest prefix that fits alongside the marker
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + TRUNCATION_MARKER
+
+
+def _shorten_strings(value: Any, max_chars: int) -> Any:
+    """Shorten every string longer than max_chars inside a JSON value."""
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + "..."
+    if isinstance(value, dict):
+        return {key: _shorten_strings(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shorten_strings(item, max_chars) for item in value]
+    return value
+
+
+def compact_json(value: Any, max_tokens: Optional[int] = None, max_string_chars: int = 200) -> str:
+    """
+    Serialize a value as minified JSON within a token budget.
+    
+    Args:
+        value: The value to serialize
+        max_tokens: Optional token budget for the result
+        max_string_chars: Strings longer than this are shortened
+        
+    Returns:
+        The JSON text
+    """
+    text = json.dumps(_shorten_strings(value, max_string_chars), separators=(",", ":"), default=str)
+    if max_tokens is not None:
+        text = truncate_to_tokens(text, max_tokens)
+    return text
+
+
+def rank_by_relevance(components: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """
+    Order registry components by relevance to a query.
+    
+    Relevance is TF-IDF cosine similarity (see CapabilityIndex), so a term
+    shared with the component's name outweighs one shared with its
+    description. Ties keep the original order.
+    
+    Args:
+        components: Registry component metadata
+        query: The text to match against, usually the goal
+        
+    Returns:
+        The components, most relevant first
+    """
+    return CapabilityIndex(components).rank(query)
+
+
+def format_names(names: List[str], max_tokens: int, max_items: Optional[int] = None) -> str:
+    """
+    Join names into a comma-separated list within a budget.
+    
+    Args:
+        names: The names, most important first
+        max_tokens: The token budget
+        max_items: Optional maximum number of names to list
+        
+    Returns:
+        The list, noting how many names were left out
+    """
+    included = []
+    used = 0
+    for name in names[:max_items]:
+        cost = estimate_tokens(name) + 1
+        if included and used + cost > max_tokens:
+            break
+        included.append(name)
+        used += cost
+    
+    text = ", ".join(included)
+    if len(included) < len(names):
+        text += f" (and {len(names) - len(included)} more)"
+    return text
+
+
+def compact_capabilities(components: List[Dict[str, Any]], query: str, max_items: int, max_tokens: int,
+                         index: Optional[CapabilityIndex] = None) -> str:
+    """
+    List the names of the components most relevant to a query, within budget.
+    
+    Args:
+        components: Registry component metadata
+        query: The text to match against, usually the goal
+        max_items: Maximum number of names to list
+        max_tokens: Token budget for the list
+        index: Optional prebuilt index over the same components
+        
+    Returns:
+        A comma-separated list of names
+    """
+    ranked = (index or CapabilityIndex(components)).rank(query)
+    return format_names([component.get("name", str(component)) for component in ranked], max_tokens, max_items)
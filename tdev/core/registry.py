@@ -18,6 +18,8 @@ class AgentRegistry:
     def __init__(self):
         """Initialize the registry."""
         self._registry = {}
+        # Incremented on every change so caches can detect stale entries
+        self.generation = 0
         self._load_registry()
     
     def _load_registry(self):
@@ -45,6 +47,7 @@ class AgentRegistry:
             metadata: The metadata for the component
         """
         self._registry[name] = metadata
+        self.generation += 1
         self._save_registry()
     
     def get_metadata(self, name: str) -> Optional[Dict[str, Any]]:
@@ -111,6 +114,7 @@ class AgentRegistry:
     def update(self, name: str, metadata: Dict[str, Any]):
         """Update a component's metadata."""
         self._registry[name] = metadata
+        self.generation += 1
         self._save_registry()
     
     def list_components(self, component_type: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
@@ -17,6 +17,7 @@ class BaseMeta:
     input_schema: Dict[str, str] = field(default_factory=dict)
     output_schema: Dict[str, str] = field(default_factory=dict)
     tags: List[str] = field(default_factory=list)
+    triggers: List[str] = field(default_factory=list)
     path: Optional[str] = None
     
     def to_dict(self) -> MetadataDict:
@@ -31,6 +32,7 @@ class BaseMeta:
             "input_schema": self.input_schema,
             "output_schema": self.output_schema,
             "tags": self.tags,
+            "triggers": self.triggers,
             "path": self.path,
         }
 
@@ -69,6 +71,7 @@ class TeamMeta(BaseMeta):
             input_schema=data.get("input_schema"),
             output_schema=data.get("output_schema"),
             tags=data.get("tags"),
+            triggers=data.get("triggers") or [],
             path=data.get("path"),
         )
 
@@ -108,6 +111,7 @@ class AgentMeta(BaseMeta):
             input_schema=data.get("input_schema"),
             output_schema=data.get("output_schema"),
             tags=data.get("tags"),
+            triggers=data.get("triggers") or [],
             path=data.get("path"),
         )
 
@@ -147,5 +151,6 @@ class ToolMeta(BaseMeta):
             input_schema=data.get("input_schema"),
             output_schema=data.get("output_schema"),
             tags=data.get("tags"),
+            triggers=data.get("triggers") or [],
             path=data.get("path"),
         )
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Trigger keyword matching for T-Developer.
+
+Components can declare ``triggers``, words or short phrases that signal
+they are needed ("echo", "send email"). TriggerMatcher compiles the
+triggers of a set of components into a trie over words, so finding every
+triggered component in a goal takes one pass over the goal's words,
+however many components declare triggers.
+"""
+import re
+from typing import Dict, Any, List, Optional
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Key under which a trie node stores the components its phrase triggers
+_MATCHES = "\0"
+
+
+class TriggerMatcher:
+    """Finds the components whose trigger phrases occur in a text."""
+    
+    def __init__(self, triggers: Dict[str, List[str]]):
+        """
+        Compile trigger phrases.
+        
+        Args:
+            triggers: Trigger phrases by component name
+        """
+        self._trie: Dict[str, Any] = {}
+        self.longest = 0
+        for name, phrases in triggers.items():
+            for phrase in phrases or []:
+                words = _WORD_PATTERN.findall(str(phrase).lower())
+                if not words:
+                    continue
+                node = self._trie
+                for word in words:
+                    node = node.setdefault(word, {})
+                names = node.setdefault(_MATCHES, [])
+                if name not in names:
+                    names.append(name)
+                self.longest = max(self.longest, len(words))
+    
+    @classmethod
+    def from_components(cls, components: List[Dict[str, Any]],
+                        defaults: Optional[Dict[str, List[str]]] = None) -> 'TriggerMatcher':
+        """
+        Compile the triggers declared in registry metadata.
+        
+        Args:
+            components: Registry metadata of the components
+            defaults: Triggers by name for components that declare none,
+                such as those registered before triggers existed
+                
+        Returns:
+            The matcher
+        """
+        triggers = dict(defaults or {})
+        for component in components:
+            if isinstance(component, dict) and component.get("name") and component.get("triggers"):
+                triggers[component["name"]] = component["triggers"]
+        return cls(triggers)
+    
+    def __bool__(self) -> bool:
+        return bool(self._trie)
+    
+    def match(self, text: str) -> List[str]:
+        """
+        Find the components triggered by a text.
+        
+        Triggers match whole words, case-insensitively. Each step of the scan
+        follows at most as many trie edges as the longest trigger has words,
+        so matching is linear in the length of the text.
+        
+        Args:
+            text: The text to scan, usually a goal
+            
+        Returns:
+            Names of the triggered components, in order of their first trigger in the text
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        matched: List[str] = []
+        for start in range(len(words)):
+            node = self._trie
+            for word in words[start:start + self.longest]:
+                node = node.get(word)
+                if node is None:
+                    break
+                for name in node.get(_MATCHES, ()):
+                    if name not in matched:
+                        matched.append(name)
+        return matched
@@ -1,10 +1,20 @@
+import os
 import json
+import marshal
+import threading
 import yaml
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from tdev.core import config
 
+# Version tag stored in precompiled workflow sidecars; bump when the layout changes
+SIDECAR_FORMAT_VERSION = 1
+
+# Process-wide cache of parsed workflows: absolute path -> (mtime_ns, size, Workflow)
+_workflow_cache: Dict[str, Tuple[int, int, 'Workflow']] = {}
+_workflow_cache_lock = threading.Lock()
+
 class Workflow:
     """
     Represents a workflow definition in T-Developer.
@@ -65,10 +75,102 @@ class Workflow:
         )
 
 
+def is_control_step(step: Dict[str, Any]) -> bool:
+    """
+    Check whether a step controls the flow rather than running an agent.
+    
+    Args:
+        step: The step definition
+        
+    Returns:
+        True for ``switch`` and ``exit`` steps
+    """
+    return "switch" in step or bool(step.get("exit"))
+
+
+def iter_agent_steps(steps: List[Dict[str, Any]]):
+    """
+    Iterate over every step that runs an agent, including switch branches.
+    
+    Args:
+        steps: The workflow steps
+        
+    Yields:
+        Step definitions with an ``agent`` reference
+    """
+    for step in steps:
+        if "switch" in step:
+            for branch in step.get("cases", {}).values():
+                yield from iter_agent_steps(branch)
+            yield from iter_agent_steps(step.get("default", []))
+        elif step.get("agent"):
+            yield step
+
+
+def get_sidecar_path(file_path: str) -> Path:
+    """
+    Get the path of the precompiled sidecar for a workflow file.
+    
+    The sidecar is a hidden file next to the workflow, so it is never
+    picked up by globs such as ``*.json``.
+    
+    Args:
+        file_path: The path to the workflow file
+        
+    Returns:
+        The path to the sidecar file
+    """
+    path = Path(file_path)
+    return path.with_name(f".{path.name}.marshal")
+
+
+def _read_sidecar(path: Path, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+    """Read a precompiled sidecar if it matches the current source file."""
+    try:
+        with open(get_sidecar_path(path), 'rb') as f:
+            version, mtime_ns, size, data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    
+    if version != SIDECAR_FORMAT_VERSION or mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+        return None
+    return data
+
+
+def _write_sidecar(path: Path, data: Dict[str, Any]) -> None:
+    """Write a precompiled sidecar for a freshly saved workflow file."""
+    sidecar_path = get_sidecar_path(path)
+    try:
+        stat = path.stat()
+        payload = marshal.dumps((SIDECAR_FORMAT_VERSION, stat.st_mtime_ns, stat.st_size, data))
+        with open(sidecar_path, 'wb') as f:
+            f.write(payload)
+    except (OSError, ValueError):
+        # Values marshal cannot encode (e.g. YAML timestamps) simply skip the sidecar
+        try:
+            sidecar_path.unlink()
+        except OSError:
+            pass
+
+
+def clear_workflow_cache() -> None:
+    """Drop every parsed workflow held in the process-wide cache."""
+    with _workflow_cache_lock:
+        _workflow_cache.clear()
+
+
 def load_workflow(file_path: str) -> Optional[Workflow]:
     """
     Load a workflow from a file.
     
+    Parsed workflows are cached per process and revalidated against the
+    file's mtime and size, so repeated loads of an unchanged file skip
+    both I/O and parsing. On a cache miss a matching precompiled sidecar
+    (see ``save_workflow``) is preferred over re-parsing JSON/YAML.
+    
+    The returned Workflow is shared between callers and must be treated
+    as read-only.
+    
     Args:
         file_path: The path to the workflow file
         
@@ -76,45 +178,66 @@ def load_workflow(file_path: str) -> Optional[Workflow]:
         A Workflow instance, or None if the file could not be loaded
     """
     path = Path(file_path)
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except OSError:
         return None
     
+    key = os.path.abspath(path)
+    cached = _workflow_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
     try:
-        with open(path, 'r') as f:
-            if path.suffix == '.json':
-                data = json.load(f)
-            elif path.suffix in ('.yaml', '.yml'):
-                data = yaml.safe_load(f)
-            else:
-                raise ValueError(f"Unsupported file format: {path.suffix}")
+        data = _read_sidecar(path, stat)
+        if data is None:
+            with open(path, 'r') as f:
+                if path.suffix == '.json':
+                    data = json.load(f)
+                elif path.suffix in ('.yaml', '.yml'):
+                    data = yaml.safe_load(f)
+                else:
+                    raise ValueError(f"Unsupported file format: {path.suffix}")
         
-        return Workflow.from_dict(data)
+        workflow = Workflow.from_dict(data)
     except (json.JSONDecodeError, yaml.YAMLError, ValueError) as e:
         print(f"Error loading workflow: {e}")
         return None
+    
+    with _workflow_cache_lock:
+        _workflow_cache[key] = (stat.st_mtime_ns, stat.st_size, workflow)
+    return workflow
 
 
-def save_workflow(workflow: Workflow, file_path: str) -> bool:
+def save_workflow(workflow: Workflow, file_path: str, write_sidecar: bool = True) -> bool:
     """
     Save a workflow to a file.
     
     Args:
         workflow: The workflow to save
         file_path: The path to save the workflow to
+        write_sidecar: Whether to also write a precompiled sidecar for fast loading
         
     Returns:
         True if the workflow was saved successfully, False otherwise
     """
     path = Path(file_path)
+    data = workflow.to_dict()
     
     try:
+        if path.suffix not in ('.json', '.yaml', '.yml'):
+            raise ValueError(f"Unsupported file format: {path.suffix}")
+        
         with open(path, 'w') as f:
             if path.suffix == '.json':
-                json.dump(workflow.to_dict(), f, indent=2)
-            elif path.suffix in ('.yaml', '.yml'):
-                yaml.dump(workflow.to_dict(), f, default_flow_style=False)
+                json.dump(data, f, indent=2)
             else:
-                raise ValueError(f"Unsupported file format: {path.suffix}")
+                yaml.dump(data, f, default_flow_style=False)
+        
+        with _workflow_cache_lock:
+            _workflow_cache.pop(os.path.abspath(path), None)
+        if write_sidecar:
+            _write_sidecar(path, data)
         
         return True
     except (IOError, ValueError) as e:
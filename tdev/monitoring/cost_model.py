@@ -0,0 +1,300 @@
+"""
+Workflow cost model for T-Developer.
+
+AgentProfiles is a span exporter that keeps moving averages of what each
+agent's workflow steps cost: wall time, and the model calls, tokens and
+model spend the model router counts on the step's span. estimate_workflow()
+combines these profiles with a workflow's data dependencies to predict,
+before execution, the latency, model calls and cost of a run, including
+the critical path that bounds how fast independent steps could finish
+if run in parallel.
+"""
+import os
+import re
+import json
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from tdev.core.workflow import Workflow, load_workflow, get_workflow_path, is_control_step
+from tdev.monitoring.telemetry import Span, SpanExporter
+
+# Profile fields averaged per agent
+PROFILE_FIELDS = ("latency_ms", "model_calls", "input_tokens", "output_tokens", "cost")
+
+# Assumed for agents with no recorded steps
+DEFAULT_STEP_PROFILE = {
+    "latency_ms": float(os.environ.get("TDEV_DEFAULT_STEP_LATENCY_MS", 1000)),
+    "model_calls": 0.0,
+    "input_tokens": 0.0,
+    "output_tokens": 0.0,
+    "cost": 0.0,
+}
+
+# Budgets the evaluator's efficiency metric is measured against
+LATENCY_BUDGET_MS = float(os.environ.get("TDEV_LATENCY_BUDGET_MS", 30000))
+COST_BUDGET = float(os.environ.get("TDEV_COST_BUDGET", 0.05))
+
+# References to earlier step results in step inputs, as in "${0.result}"
+_STEP_REFERENCE = re.compile(r"\$\{(\d+)\.")
+
+
+class AgentProfile:
+    """Moving averages of the cost of one agent's workflow steps."""
+    
+    def __init__(self, alpha: float = 0.2):
+        """
+        Initialize an empty profile.
+        
+        Args:
+            alpha: Weight of the newest sample in the moving averages
+        """
+        self.alpha = alpha
+        self.samples = 0
+        self.values = {field: 0.0 for field in PROFILE_FIELDS}
+    
+    def record(self, sample: Dict[str, float]) -> None:
+        """Fold one step's measurements into the averages."""
+        self.samples += 1
+        for field in PROFILE_FIELDS:
+            value = float(sample.get(field, 0.0))
+            if self.samples == 1:
+                self.values[field] = value
+            else:
+                self.values[field] = self.alpha * value + (1 - self.alpha) * self.values[field]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the profile to a dictionary."""
+        return {"samples": self.samples, **self.values}
+
+
+class AgentProfiles(SpanExporter):
+    """Builds per-agent cost profiles from finished workflow step spans."""
+    
+    def __init__(self, alpha: float = 0.2, history_file: Optional[str] = None):
+        """
+        Initialize the profiles.
+        
+        Args:
+            alpha: Weight of the newest sample in the moving averages
+            history_file: Optional JSONL trace file (see JsonlFileExporter)
+                to seed the profiles from; the spans it holds now are read on
+                first use
+        """
+        self.alpha = alpha
+        self.history_file = history_file
+        # Spans appended to the file after this point are recorded as they finish
+        self._history_bytes = os.path.getsize(history_file) if history_file and os.path.exists(history_file) else 0
+        self._profiles: Dict[str, AgentProfile] = {}
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span) -> None:
+        """Record a finished step span."""
+        self._record(span.to_dict())
+    
+    def _record(self, span: Dict[str, Any]) -> None:
+        """Record a step span given as a dictionary, ignoring other spans."""
+        attributes = span.get("attributes") or {}
+        agent_name = attributes.get("agent")
+        if span.get("name") != "workflow.step" or span.get("status") != "ok" or not agent_name:
+            return
+        sample = {field: attributes.get(field, 0.0) for field in PROFILE_FIELDS}
+        sample["latency_ms"] = span.get("wall_ms", 0.0)
+        with self._lock:
+            profile = self._profiles.get(agent_name)
+            if profile is None:
+                profile = self._profiles[agent_name] = AgentProfile(self.alpha)
+            profile.record(sample)
+    
+    def _load_history(self) -> None:
+        """Seed the profiles from the history file once."""
+        with self._lock:
+            path, self.history_file = self.history_file, None
+        if not path or not self._history_bytes:
+            return
+        try:
+            remaining = self._history_bytes
+            with open(path, 'rb') as f:
+                for line in f:
+                    remaining -= len(line)
+                    if remaining < 0:
+                        break
+                    try:
+                        self._record(json.loads(line))
+                    except (ValueError, AttributeError):
+                        continue
+        except OSError as e:
+            print(f"Warning: Could not read trace history {path}: {e}")
+    
+    def get(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the profile of an agent.
+        
+        Args:
+            agent_name: The agent name
+            
+        Returns:
+            The averaged measurements, or None if the agent has no recorded steps
+        """
+        if self.history_file:
+            self._load_history()
+        with self._lock:
+            profile = self._profiles.get(agent_name)
+            return profile.to_dict() if profile else None
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get every agent's profile."""
+        if self.history_file:
+            self._load_history()
+        with self._lock:
+            return {name: profile.to_dict() for name, profile in self._profiles.items()}
+    
+    def snapshot(self) -> 'AgentProfiles':
+        """
+        Copy the current profiles.
+        
+        Estimates made from a snapshot agree with each other while finished
+        step spans keep updating the original.
+        
+        Returns:
+            Profiles with the same averages, not fed by any span
+        """
+        if self.history_file:
+            self._load_history()
+        copied = AgentProfiles(self.alpha)
+        with self._lock:
+            for name, profile in self._profiles.items():
+                duplicate = copied._profiles[name] = AgentProfile(profile.alpha)
+                duplicate.samples = profile.samples
+                duplicate.values = dict(profile.values)
+        return copied
+    
+    def reset(self) -> None:
+        """Drop all profiles."""
+        with self._lock:
+            self._profiles.clear()
+
+
+def _step_dependencies(index: int, step: Dict[str, Any], steps: List[Dict[str, Any]]) -> Set[int]:
+    """
+    Find the earlier steps a step must wait for.
+    
+    A step waits for the steps whose results its input references, for
+    the last step that wrote the context key it reads and for the last
+    switch or nested workflow, which may write any key. Guarded steps,
+    switches and nested workflows may read any key, so they wait for
+    every earlier step.
+    """
+    if "when" in step or is_control_step(step) or step.get("workflow"):
+        return set(range(index))
+    
+    dependencies = {
+        int(reference) for reference in _STEP_REFERENCE.findall(json.dumps(step.get("input", ""), default=str))
+        if int(reference) < index
+    }
+    input_from = step.get("input_from", "input")
+    for earlier in range(index - 1, -1, -1):
+        if steps[earlier].get("output_to", "output") == input_from:
+            dependencies.add(earlier)
+            break
+    # Whatever a switch or nested workflow wrote may be read by any later step
+    for earlier in range(index - 1, -1, -1):
+        if "switch" in steps[earlier] or steps[earlier].get("workflow"):
+            dependencies.add(earlier)
+            break
+    return dependencies
+
+
+def _resolve_workflow(workflow: Any) -> Optional[Dict[str, Any]]:
+    """Load a nested workflow by ID, or return an inline definition."""
+    if isinstance(workflow, str):
+        workflow = load_workflow(get_workflow_path(workflow))
+    if isinstance(workflow, Workflow):
+        workflow = workflow.to_dict()
+    return workflow if isinstance(workflow, dict) else None
+
+
+def _estimate_steps(steps: List[Dict[str, Any]], profiles: AgentProfiles,
+                    stack: Tuple[str, ...]) -> Dict[str, Any]:
+    """Estimate a list of steps; see estimate_workflow()."""
+    totals = {field: 0.0 for field in PROFILE_FIELDS}
+    unprofiled: Set[str] = set()
+    finish: List[float] = []
+    previous: List[Optional[int]] = []
+    
+    for index, step in enumerate(steps):
+        if "switch" in step:
+            # Assume the most expensive branch is taken
+            branches = [_estimate_steps(branch, profiles, stack) for branch in step.get("cases", {}).values()]
+            branches.append(_estimate_steps(step.get("default", []), profiles, stack))
+            cost = max(branches, key=lambda branch: (branch["latency_ms"], branch["cost"]))
+            unprofiled.update(*(branch["unprofiled_agents"] for branch in branches))
+        elif step.get("exit"):
+            cost = {field: 0.0 for field in PROFILE_FIELDS}
+        elif step.get("workflow"):
+            nested_id = step["workflow"] if isinstance(step["workflow"], str) else None
+            nested = None if nested_id in stack else _resolve_workflow(step["workflow"])
+            if nested is not None:
+                cost = _estimate_steps(nested.get("steps", []), profiles, stack + ((nested_id,) if nested_id else ()))
+                unprofiled.update(cost["unprofiled_agents"])
+            else:
+                cost = DEFAULT_STEP_PROFILE
+        elif step.get("agent"):
+            cost = profiles.get(step["agent"])
+            if cost is None:
+                unprofiled.add(step["agent"])
+                cost = DEFAULT_STEP_PROFILE
+        else:
+            cost = {field: 0.0 for field in PROFILE_FIELDS}
+        
+        for field in PROFILE_FIELDS:
+            totals[field] += cost[field]
+        
+        # Earliest finish if every step started as soon as its dependencies finished
+        waited_for = max(sorted(_step_dependencies(index, step, steps)), key=finish.__getitem__, default=None)
+        start = finish[waited_for] if waited_for is not None else 0.0
+        finish.append(start + cost.get("critical_path_ms", cost["latency_ms"]))
+        previous.append(waited_for)
+    
+    critical_path: List[int] = []
+    if finish:
+        step_index: Optional[int] = max(range(len(finish)), key=finish.__getitem__)
+        while step_index is not None:
+            critical_path.append(step_index)
+            step_index = previous[step_index]
+    
+    return {
+        **totals,
+        "critical_path_ms": max(finish, default=0.0),
+        "critical_path": list(reversed(critical_path)),
+        "unprofiled_agents": sorted(unprofiled),
+    }
+
+
+def estimate_workflow(workflow: Dict[str, Any], profiles: Optional['AgentProfiles'] = None) -> Dict[str, Any]:
+    """
+    Predict what running a workflow will take, without running it.
+    
+    Each step is costed from its agent's profile (DEFAULT_STEP_PROFILE if
+    the agent has none), a switch from its most expensive branch and a
+    nested workflow from its own steps.
+    
+    Args:
+        workflow: The workflow definition
+        profiles: Agent profiles to use (defaults to the global agent_profiles)
+        
+    Returns:
+        A dictionary with:
+            - latency_ms: Expected wall time when steps run one after another, as the executor runs them
+            - critical_path_ms: Expected wall time if independent steps ran in parallel
+            - critical_path: Indices of the top-level steps on the critical path
+            - model_calls, input_tokens, output_tokens: Expected model usage
+            - cost: Expected model spend in USD
+            - unprofiled_agents: Agents costed with DEFAULT_STEP_PROFILE
+    """
+    profiles = profiles if profiles is not None else agent_profiles
+    stack = (workflow["id"],) if isinstance(workflow.get("id"), str) else ()
+    return _estimate_steps(workflow.get("steps", []), profiles, stack)
+
+
+# Global agent profiles; the workflow executor registers them with the tracer
+agent_profiles = AgentProfiles(history_file=os.environ.get("TDEV_TRACE_FILE"))
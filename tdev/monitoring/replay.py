@@ -0,0 +1,325 @@
+"""
+Execution recording and replay for T-Developer.
+
+In record mode every agent step run by the WorkflowExecutorAgent and every
+model response returned by the BedrockClient is captured into a compact,
+gzip-compressed JSONL trace. In replay mode those recorded outputs are
+served back instead of running agents or calling models, so the
+orchestration engine can be re-executed deterministically with no model or
+AWS calls. Timing a replay isolates pure orchestration overhead from
+Bedrock latency.
+"""
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterator
+
+# Version tag written to the trace header
+TRACE_FORMAT_VERSION = 1
+
+# The session currently recording or replaying, shared by all threads
+_active_session = None
+_active_session_lock = threading.Lock()
+
+
+class ReplayMissError(RuntimeError):
+    """Raised when a replay has no recorded output for a call."""
+    pass
+
+
+class RecordedError(RuntimeError):
+    """Re-raised during replay for a call that failed while recording."""
+    pass
+
+
+def payload_digest(payload: Any) -> str:
+    """
+    Compute a stable digest of a payload for matching calls during replay.
+    
+    Args:
+        payload: A JSON-serializable payload
+        
+    Returns:
+        A short hex digest
+    """
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _to_json(value: Any) -> Any:
+    """Round-trip a value through JSON so recorded and replayed values match."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class RecordingSession:
+    """Captures agent and model calls into an in-memory trace."""
+    
+    recording = True
+    replaying = False
+    
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the recording session.
+        
+        Args:
+            metadata: Optional metadata stored in the trace header, such as the request
+        """
+        self.metadata = metadata or {}
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def _append(self, event: Dict[str, Any]) -> None:
+        """Append an event to the trace."""
+        with self._lock:
+            self.events.append(event)
+    
+    def record_agent(self, name: str, input_data: Any, output: Any = None,
+                     error: Optional[str] = None) -> None:
+        """
+        Record an agent step.
+        
+        Args:
+            name: The agent name
+            input_data: The step input
+            output: The step output
+            error: The error message if the step failed
+        """
+        event = {
+            "type": "agent",
+            "name": name,
+            "key": payload_digest(input_data),
+            "input": _to_json(input_data),
+        }
+        if error is not None:
+            event["error"] = error
+        else:
+            event["output"] = _to_json(output)
+        self._append(event)
+    
+    def record_model(self, model_id: str, prompt: str, parameters: Optional[Dict[str, Any]],
+                     response: Any) -> None:
+        """
+        Record a model response.
+        
+        Args:
+            model_id: The model ID
+            prompt: The prompt sent to the model
+            parameters: The sampling parameters
+            response: The response returned to the caller
+        """
+        self._append({
+            "type": "model",
+            "name": model_id,
+            "key": payload_digest({"prompt": prompt, "parameters": parameters}),
+            "response": _to_json(response),
+        })
+    
+    def save(self, file_path: str) -> None:
+        """
+        Write the trace to a gzip-compressed JSONL file.
+        
+        Args:
+            file_path: The path to write the trace to
+        """
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {"type": "meta", "version": TRACE_FORMAT_VERSION, **_to_json(self.metadata)}
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for event in [header] + self.events:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+
+class ReplaySession:
+    """Serves recorded agent outputs and model responses."""
+    
+    recording = False
+    replaying = True
+    
+    def __init__(self, events: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the replay session.
+        
+        Calls are matched by name and input digest first, then by name in
+        recorded order. The fallback keeps replays working when inputs
+        contain values that differ between processes.
+        
+        Args:
+            events: The recorded events
+            metadata: The trace header metadata
+        """
+        self.metadata = metadata or {}
+        self._by_key = defaultdict(deque)
+        self._by_name = defaultdict(deque)
+        self._lock = threading.Lock()
+        for event in events:
+            entry = {"event": event, "used": False}
+            self._by_key[(event["type"], event["name"], event["key"])].append(entry)
+            self._by_name[(event["type"], event["name"])].append(entry)
+    
+    @classmethod
+    def load(cls, file_path: str) -> 'ReplaySession':
+        """
+        Load a replay session from a trace file.
+        
+        Args:
+            file_path: The path to the trace file
+            
+        Returns:
+            A ReplaySession instance
+        """
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        metadata = {}
+        if lines and lines[0].get("type") == "meta":
+            metadata = lines.pop(0)
+        return cls(lines, metadata)
+    
+    def _take(self, kind: str, name: str, key: str) -> Dict[str, Any]:
+        """Take the next unused recorded event for a call."""
+        with self._lock:
+            for queue in (self._by_key[(kind, name, key)], self._by_name[(kind, name)]):
+                while queue and queue[0]["used"]:
+                    queue.popleft()
+                if queue:
+                    entry = queue.popleft()
+                    entry["used"] = True
+                    return entry["event"]
+        raise ReplayMissError(f"No recorded {kind} call for {name}")
+    
+    def replay_agent(self, name: str, input_data: Any) -> Any:
+        """
+        Get the recorded output of an agent step.
+        
+        Args:
+            name: The agent name
+            input_data: The step input
+            
+        Returns:
+            The recorded output
+            
+        Raises:
+            RecordedError: If the step failed while recording
+            ReplayMissError: If no matching step was recorded
+        """
+        event = self._take("agent", name, payload_digest(input_data))
+        if "error" in event:
+            raise RecordedError(event["error"])
+        return event.get("output")
+    
+    def replay_model(self, model_id: str, prompt: str, parameters: Optional[Dict[str, Any]]) -> Any:
+        """
+        Get the recorded response of a model call.
+        
+        Args:
+            model_id: The model ID
+            prompt: The prompt sent to the model
+            parameters: The sampling parameters
+            
+        Returns:
+            The recorded response
+            
+        Raises:
+            ReplayMissError: If no matching call was recorded
+        """
+        key = payload_digest({"prompt": prompt, "parameters": parameters})
+        return self._take("model", model_id, key)["response"]
+
+
+def get_active_session():
+    """
+    Get the session currently recording or replaying, if any.
+    
+    Returns:
+        A RecordingSession, a ReplaySession, or None
+    """
+    return _active_session
+
+
+@contextmanager
+def _activate(session) -> Iterator[Any]:
+    """Make a session active for the duration of a ``with`` block."""
+    global _active_session
+    with _active_session_lock:
+        if _active_session is not None:
+            raise RuntimeError("A recording or replay session is already active")
+        _active_session = session
+    try:
+        yield session
+    finally:
+        with _active_session_lock:
+            _active_session = None
+
+
+@contextmanager
+def record(file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Iterator[RecordingSession]:
+    """
+    Record agent and model calls made inside a ``with`` block to a trace file.
+    
+    Args:
+        file_path: The path to write the trace to when the block exits
+        metadata: Optional metadata stored in the trace header, such as the request
+        
+    Yields:
+        The recording session
+    """
+    session = RecordingSession(metadata)
+    with _activate(session):
+        try:
+            yield session
+        finally:
+            session.save(file_path)
+
+
+@contextmanager
+def replay(file_path: str) -> Iterator[ReplaySession]:
+    """
+    Serve recorded agent outputs and model responses inside a ``with`` block.
+    
+    Args:
+        file_path: The path to the trace file
+        
+    Yields:
+        The replay session
+    """
+    session = ReplaySession.load(file_path)
+    with _activate(session):
+        yield session
+
+
+def benchmark_replay(file_path: str, run: Callable[[Dict[str, Any]], Any],
+                     iterations: int = 10) -> Dict[str, Any]:
+    """
+    Time repeated replays of a recorded trace.
+    
+    Each iteration opens a fresh replay session and calls ``run`` with the
+    trace metadata (which holds the recorded request), so the timings cover
+    only orchestration work.
+    
+    Args:
+        file_path: The path to the trace file
+        run: Callable that re-executes the recorded request
+        iterations: Number of replays to time
+        
+    Returns:
+        A dictionary with per-iteration timings and summary statistics in milliseconds
+    """
+    timings = []
+    for _ in range(iterations):
+        with replay(file_path) as session:
+            start = time.perf_counter()
+            run(session.metadata)
+            timings.append((time.perf_counter() - start) * 1000)
+    
+    ordered = sorted(timings)
+    return {
+        "iterations": iterations,
+        "timings_ms": timings,
+        "mean_ms": sum(timings) / len(timings) if timings else 0.0,
+        "min_ms": ordered[0] if ordered else 0.0,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0,
+    }
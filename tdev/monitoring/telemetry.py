@@ -0,0 +1,240 @@
+"""
+Execution telemetry for T-Developer.
+
+This module provides lightweight trace spans for instrumenting workflow
+execution. Each span records wall time, CPU time and arbitrary attributes,
+and spans opened inside another span become its children, so a workflow
+run forms a single trace. Finished spans are handed to pluggable exporters.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+# The span currently open in this thread/task, used to parent new spans
+_current_span: contextvars.ContextVar = contextvars.ContextVar("tdev_current_span", default=None)
+
+
+@dataclass
+class Span:
+    """A timed unit of work within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = 0.0
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the span."""
+        self.attributes[key] = value
+    
+    def increment(self, key: str, amount: int = 1) -> None:
+        """Increment a numeric counter attribute, such as cache hits or retries."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a dictionary."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(ABC):
+    """Base class for span exporters."""
+    
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Export a finished span."""
+        pass
+
+
+class RingBufferExporter(SpanExporter):
+    """Keeps the most recent finished spans in memory."""
+    
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize the exporter.
+        
+        Args:
+            capacity: Maximum number of spans to retain
+        """
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span) -> None:
+        """Store a finished span, evicting the oldest if full."""
+        with self._lock:
+            self._spans.append(span)
+    
+    def get_spans(self, trace_id: Optional[str] = None, name: Optional[str] = None) -> List[Span]:
+        """
+        Get retained spans, oldest first.
+        
+        Args:
+            trace_id: Optional trace ID to filter by
+            name: Optional span name to filter by
+            
+        Returns:
+            A list of spans
+        """
+        with self._lock:
+            spans = list(self._spans)
+        return [
+            span for span in spans
+            if (trace_id is None or span.trace_id == trace_id)
+            and (name is None or span.name == name)
+        ]
+    
+    def clear(self) -> None:
+        """Drop all retained spans."""
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonlFileExporter(SpanExporter):
+    """Appends finished spans to a file as JSON lines."""
+    
+    def __init__(self, file_path: str):
+        """
+        Initialize the exporter.
+        
+        Args:
+            file_path: Path to the JSONL file to append to
+        """
+        self.file_path = Path(file_path)
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span) -> None:
+        """Append a finished span to the file."""
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.file_path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+
+class Tracer:
+    """Creates spans and dispatches them to exporters when they finish."""
+    
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        """
+        Initialize the tracer.
+        
+        Args:
+            exporters: Optional list of exporters to send finished spans to
+        """
+        self.exporters: List[SpanExporter] = list(exporters or [])
+    
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        """Add an exporter, unless it was already added."""
+        if exporter not in self.exporters:
+            self.exporters.append(exporter)
+    
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        """Remove a previously added exporter."""
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+    
+    def current_span(self) -> Optional[Span]:
+        """Get the span currently open in this context, if any."""
+        return _current_span.get()
+    
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Open a span for the duration of a ``with`` block.
+        
+        The span becomes a child of the currently open span, or the root of
+        a new trace if there is none. Exceptions raised inside the block mark
+        the span as failed and are re-raised.
+        
+        Args:
+            name: The span name
+            **attributes: Initial span attributes
+            
+        Yields:
+            The open span
+        """
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = str(e)
+            raise
+        finally:
+            span.wall_ms = (time.perf_counter() - wall_start) * 1000
+            span.cpu_ms = (time.thread_time() - cpu_start) * 1000
+            _current_span.reset(token)
+            self._export(span)
+    
+    def _export(self, span: Span) -> None:
+        """Send a finished span to every exporter."""
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"Warning: Span export failed: {e}")
+
+
+def payload_size(payload: Any) -> int:
+    """
+    Estimate the serialized size of a step input or output in bytes.
+    
+    Args:
+        payload: The payload to measure
+        
+    Returns:
+        The approximate size in bytes
+    """
+    if payload is None:
+        return 0
+    if isinstance(payload, (bytes, bytearray)):
+        return len(payload)
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return len(str(payload))
+
+
+# Global tracer instance; the ring buffer keeps recent spans for inspection
+ring_buffer = RingBufferExporter(capacity=int(os.environ.get("TDEV_TRACE_BUFFER_SIZE", 1000)))
+tracer = Tracer([ring_buffer])
+
+if os.environ.get("TDEV_TRACE_FILE"):
+    tracer.add_exporter(JsonlFileExporter(os.environ["TDEV_TRACE_FILE"]))
@@ -3,13 +3,16 @@ Tests for the BedrockClient class.
 """
 import os
 import json
+import tempfile
+import asyncio
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 
 import boto3
 import pytest
 
-from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.agent_core.bedrock_client import BedrockClient, get_bedrock_client, reset_bedrock_clients
 
 class TestBedrockClient(unittest.TestCase):
     """Test the BedrockClient class."""
@@ -31,8 +34,8 @@ class TestBedrockClient(unittest.TestCase):
         client = BedrockClient(region_name="us-east-1")
         
         # Check that boto3.client was called correctly
-        mock_boto3_client.assert_any_call(service_name="bedrock-runtime", region_name="us-east-1")
-        mock_boto3_client.assert_any_call(service_name="bedrock-agent", region_name="us-east-1")
+        mock_boto3_client.assert_any_call(service_name="bedrock-runtime", region_name="us-east-1", endpoint_url=None, config=ANY)
+        mock_boto3_client.assert_any_call(service_name="bedrock-agent", region_name="us-east-1", config=ANY)
         
         # Check that the client has the correct attributes
         self.assertEqual(client.region_name, "us-east-1")
@@ -166,6 +169,147 @@ class TestBedrockClient(unittest.TestCase):
             'agentId': 'test-agent-id',
             'agentName': 'TestAgent'
         })
+    
+    @patch('boto3.client')
+    def test_shared_client_is_reused(self, mock_boto3_client):
+        """Test that get_bedrock_client creates one client per region."""
+        reset_bedrock_clients()
+        try:
+            first = get_bedrock_client("us-east-1")
+            second = get_bedrock_client("us-east-1")
+            other = get_bedrock_client("us-west-2")
+            
+            self.assertIs(first, second)
+            self.assertIsNot(first, other)
+            # Two boto3 clients (runtime and agent) per region
+            self.assertEqual(mock_boto3_client.call_count, 4)
+        finally:
+            reset_bedrock_clients()
+    
+    @patch.dict(os.environ, {"TDEV_BEDROCK_MAX_POOL_CONNECTIONS": "8", "TDEV_BEDROCK_TCP_KEEPALIVE": "false"})
+    @patch('boto3.client')
+    def test_client_config_from_environment(self, mock_boto3_client):
+        """Test that pool size and keep-alive come from the environment."""
+        client = BedrockClient(region_name="us-east-1")
+        
+        self.assertEqual(client.config.max_pool_connections, 8)
+        self.assertFalse(client.config.tcp_keepalive)
+        mock_boto3_client.assert_any_call(service_name="bedrock-runtime", region_name="us-east-1", endpoint_url=None, config=client.config)
+    
+    @patch('boto3.client')
+    def test_ainvoke_model(self, mock_boto3_client):
+        """Test that ainvoke_model runs calls concurrently off the event loop thread."""
+        client = BedrockClient(region_name="us-east-1")
+        loop_thread = threading.get_ident()
+        threads = []
+        
+        def invoke(model_id, prompt, parameters=None):
+            threads.append(threading.get_ident())
+            return f"response to {prompt}"
+        
+        async def run_all():
+            return await asyncio.gather(*(
+                client.ainvoke_model("anthropic.claude-v2", f"prompt {i}") for i in range(5)
+            ))
+        
+        with patch.object(client, "invoke_model", side_effect=invoke):
+            responses = asyncio.run(run_all())
+        
+        self.assertEqual(responses, [f"response to prompt {i}" for i in range(5)])
+        self.assertEqual(len(threads), 5)
+        self.assertNotIn(loop_thread, threads)
+    
+    @patch('boto3.client')
+    def test_invoke_model_stream(self, mock_boto3_client):
+        """Test streaming an Anthropic model response chunk by chunk."""
+        mock_bedrock_runtime = MagicMock()
+        mock_boto3_client.side_effect = lambda service_name, **kwargs: {
+            'bedrock-runtime': mock_bedrock_runtime,
+            'bedrock-agent': MagicMock()
+        }[service_name]
+        mock_bedrock_runtime.invoke_model_with_response_stream.return_value = {
+            'body': [
+                {'chunk': {'bytes': json.dumps({'completion': 'Hello, '}).encode('utf-8')}},
+                {'chunk': {'bytes': json.dumps({'completion': 'world!'}).encode('utf-8')}},
+            ]
+        }
+        
+        client = BedrockClient(region_name="us-east-1")
+        chunks = list(client.invoke_model_stream("anthropic.claude-v2", "Hello"))
+        
+        self.assertEqual(chunks, ['Hello, ', 'world!'])
+        call_kwargs = mock_bedrock_runtime.invoke_model_with_response_stream.call_args[1]
+        self.assertEqual(call_kwargs['modelId'], "anthropic.claude-v2")
+        self.assertEqual(json.loads(call_kwargs['body'])['max_tokens_to_sample'], 512)
+    
+    @patch('boto3.client')
+    def test_invoke_model_stream_failure_falls_back(self, mock_boto3_client):
+        """Test that a failed stream yields the fallback text."""
+        client = BedrockClient(region_name="us-east-1")
+        client.bedrock_runtime.invoke_model_with_response_stream.side_effect = Exception("unavailable")
+        
+        self.assertEqual(list(client.invoke_model_stream("anthropic.claude-v2", "Hello")),
+                         ["Fallback response for: Hello"])
+    
+    @patch('boto3.client')
+    def test_invoke_many(self, mock_boto3_client):
+        """Test that invoke_many fans out with bounded concurrency and keeps prompt order."""
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+        
+        def invoke_model(modelId, body):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            threading.Event().wait(0.02)
+            with lock:
+                state["in_flight"] -= 1
+            prompt = json.loads(body)["prompt"]
+            return {'body': MagicMock(read=lambda: json.dumps({'completion': prompt}).encode('utf-8'))}
+        
+        client = BedrockClient(region_name="us-east-1")
+        client.bedrock_runtime.invoke_model.side_effect = invoke_model
+        prompts = [f"prompt {i}" for i in range(8)]
+        
+        responses = client.invoke_many("anthropic.claude-v2", prompts, max_concurrency=3)
+        
+        self.assertEqual([prompt in response for prompt, response in zip(prompts, responses)], [True] * 8)
+        self.assertTrue(1 < state["peak"] <= 3)
+    
+    @patch('boto3.client')
+    def test_invoke_many_return_exceptions(self, mock_boto3_client):
+        """Test that failures can be returned in place of responses."""
+        client = BedrockClient(region_name="us-east-1")
+        client.invoke_model = MagicMock(side_effect=["ok", RuntimeError("throttled")])
+        
+        responses = client.invoke_many("anthropic.claude-v2", ["a", "b"], max_concurrency=1, return_exceptions=True)
+        
+        self.assertEqual(responses[0], "ok")
+        self.assertIsInstance(responses[1], RuntimeError)
+    
+    @patch('boto3.client')
+    def test_batch_job_files(self, mock_boto3_client):
+        """Test writing a batch inference input file and reading its output."""
+        client = BedrockClient(region_name="us-east-1")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "input.jsonl")
+            record_ids = client.prepare_batch_job("anthropic.claude-v2", ["first", "second"], input_path,
+                                                  {"maxTokens": 100, "temperature": 0.1})
+            with open(input_path) as f:
+                records = [json.loads(line) for line in f]
+            
+            self.assertEqual(record_ids, ["REC00000000", "REC00000001"])
+            self.assertEqual([record["recordId"] for record in records], record_ids)
+            self.assertEqual(records[0]["modelInput"]["max_tokens_to_sample"], 100)
+            self.assertIn("first", records[0]["modelInput"]["prompt"])
+            
+            output_path = os.path.join(temp_dir, "input.jsonl.out")
+            with open(output_path, 'w') as f:
+                f.write(json.dumps({**records[0], "modelOutput": {"completion": "done"}}) + "\n")
+                f.write(json.dumps({**records[1], "error": {"errorMessage": "failed"}}) + "\n")
+            
+            self.assertEqual(client.read_batch_results("anthropic.claude-v2", output_path),
+                             {"REC00000000": "done", "REC00000001": None})
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
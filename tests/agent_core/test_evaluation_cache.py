@@ -0,0 +1,82 @@
+"""
+Tests for the evaluation cache.
+"""
+import json
+from unittest.mock import patch, MagicMock
+
+from tdev.agent_core.evaluation_cache import evaluation_cache, content_hash
+from tdev.agent_core.plan_cache import CapabilityCache, PlanCache
+from tdev.agents.evaluator_agent import EvaluatorAgent
+
+AGENTS = [
+    {"name": "EchoAgent", "type": "agent", "class": "EchoAgent", "description": "Echoes input"},
+]
+
+WORKFLOW = {"id": "wf-echo", "name": "Echo", "steps": [{"agent": "EchoAgent", "input": {"data": "hi"}}]}
+
+EVALUATION = json.dumps({"score": 90, "metrics": {"efficiency": 0.9}, "suggestions": []})
+
+def make_registry(agents, generation=1):
+    """Build a registry mock with the given agents and no tools."""
+    registry = MagicMock()
+    registry.generation = generation
+    registry.get_by_type.side_effect = lambda kind: list(agents) if kind == "agent" else []
+    registry.get_all.return_value = {agent["name"]: agent for agent in agents}
+    return registry
+
+def make_evaluator(completion=EVALUATION):
+    """Build an evaluator whose Bedrock client returns a fixed evaluation."""
+    evaluator = EvaluatorAgent()
+    evaluator.bedrock_client = MagicMock()
+    evaluator.bedrock_client.invoke_model.return_value = completion
+    return evaluator
+
+def test_content_hash_ignores_key_order():
+    """Test that equivalent workflows hash alike."""
+    reordered = {"steps": WORKFLOW["steps"], "name": "Echo", "id": "wf-echo"}
+    assert content_hash(WORKFLOW) == content_hash(reordered)
+    assert content_hash(WORKFLOW) != content_hash(dict(WORKFLOW, name="Echo twice"))
+
+def test_evaluation_cache_is_not_a_plan_cache():
+    """Test that both caches share the tiers without the evaluation cache posing as a plan cache."""
+    assert isinstance(evaluation_cache, CapabilityCache)
+    assert not isinstance(evaluation_cache, PlanCache)
+
+def test_repeat_evaluation_skips_model():
+    """Test that an identical workflow is evaluated by the model only once."""
+    evaluator = make_evaluator()
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=make_registry(AGENTS)):
+        first = evaluator.run(dict(WORKFLOW))
+        second = evaluator.run(json.loads(json.dumps(WORKFLOW)))
+        streamed = list(evaluator.run_stream(dict(WORKFLOW)))
+    
+    assert first["score"] == 90
+    assert second == first
+    assert streamed == [{"type": "result", "result": first}]
+    assert evaluator.bedrock_client.invoke_model.call_count == 1
+    assert evaluation_cache.stats()["hits"] == 2
+
+def test_test_results_and_capabilities_change_key():
+    """Test that new test results or a changed registry evaluate again."""
+    evaluator = make_evaluator()
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=make_registry(AGENTS)):
+        evaluator.run(WORKFLOW)
+        evaluator.run(WORKFLOW, {"success": False, "errors": ["timeout"]})
+    assert evaluator.bedrock_client.invoke_model.call_count == 2
+    
+    changed = [dict(AGENTS[0], description="Repeats input")]
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=make_registry(changed, generation=2)):
+        evaluator.run(WORKFLOW)
+    assert evaluator.bedrock_client.invoke_model.call_count == 3
+
+def test_fallback_evaluation_not_cached():
+    """Test that a rule-based evaluation made after a model failure is not cached."""
+    evaluator = make_evaluator(completion="not an evaluation")
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=make_registry(AGENTS)):
+        fallback = evaluator.run(WORKFLOW)
+        evaluator.bedrock_client.invoke_model.return_value = EVALUATION
+        evaluation = evaluator.run(WORKFLOW)
+    
+    assert "structural_completeness" in fallback["metrics"]
+    assert evaluation["score"] == 90
+    assert evaluator.bedrock_client.invoke_model.call_count == 2
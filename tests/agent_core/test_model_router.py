@@ -0,0 +1,119 @@
+"""
+Tests for model routing.
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from tdev.agent_core.model_router import ModelRouter, default_routes, PLANNING, EVALUATION
+from tdev.agent_core.rate_limit import BedrockThrottledError
+from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.monitoring.telemetry import Tracer, RingBufferExporter
+
+ROUTES = {
+    PLANNING: ["anthropic.claude-v2", "anthropic.claude-instant-v1"],
+    EVALUATION: ["anthropic.claude-instant-v1", "amazon.titan-text-lite-v1"],
+}
+
+class TestModelRouter:
+    """Tests for ModelRouter."""
+    
+    def setup_method(self):
+        """Set up a router and a client double."""
+        self.router = ModelRouter(routes=ROUTES)
+        self.client = MagicMock()
+        self.client.invoke_model.side_effect = lambda model_id, **kwargs: f"from {model_id}"
+    
+    def test_routes_by_task_class(self):
+        """Test that each task class uses its preferred model."""
+        assert self.router.invoke(self.client, PLANNING, "plan") == "from anthropic.claude-v2"
+        assert self.router.invoke(self.client, EVALUATION, "evaluate") == "from anthropic.claude-instant-v1"
+    
+    def test_large_prompts_skip_small_context_models(self):
+        """Test that models whose context window is too small are not routed to."""
+        assert self.router.route(EVALUATION, "x" * 40000) == ["anthropic.claude-instant-v1"]
+    
+    def test_throttled_model_fails_over_and_cools_down(self):
+        """Test failover along the chain and demotion of a throttled model."""
+        def invoke(model_id, **kwargs):
+            if model_id == "anthropic.claude-v2":
+                raise BedrockThrottledError("throttled")
+            return f"from {model_id}"
+        self.client.invoke_model.side_effect = invoke
+        
+        assert self.router.invoke(self.client, PLANNING, "plan") == "from anthropic.claude-instant-v1"
+        assert self.client.invoke_model.call_args_list[0].kwargs["fallback"] is False
+        assert self.client.invoke_model.call_args_list[1].kwargs["fallback"] is True
+        assert self.router.route(PLANNING, "plan") == ["anthropic.claude-instant-v1", "anthropic.claude-v2"]
+        assert self.router.stats()["anthropic.claude-v2"]["throttles"] == 1
+    
+    def test_last_model_failure_is_raised(self):
+        """Test that throttling on every model reaches the caller."""
+        self.client.invoke_model.side_effect = BedrockThrottledError("throttled")
+        with pytest.raises(BedrockThrottledError):
+            self.router.invoke(self.client, PLANNING, "plan")
+    
+    def test_slow_models_are_demoted(self):
+        """Test that a much slower model is tried after faster ones."""
+        self.router._record_success("anthropic.claude-v2", "plan", "ok", latency=3.0)
+        self.router._record_success("anthropic.claude-instant-v1", "plan", "ok", latency=0.5)
+        assert self.router.route(PLANNING, "plan")[0] == "anthropic.claude-instant-v1"
+        assert self.router.stats()["anthropic.claude-v2"]["cost"] > self.router.stats()["anthropic.claude-instant-v1"]["cost"]
+    
+    def test_stream_fails_over_before_output(self):
+        """Test that a stream that fails before producing output moves to the next model."""
+        def stream(model_id, **kwargs):
+            if model_id == "anthropic.claude-v2":
+                raise RuntimeError("model not available")
+            yield "from "
+            yield model_id
+        self.client.invoke_model_stream.side_effect = stream
+        
+        assert "".join(self.router.invoke_stream(self.client, PLANNING, "plan")) == "from anthropic.claude-instant-v1"
+    
+    def test_only_model_requests_are_counted(self, monkeypatch):
+        """Test that cache hits and fallback text neither count as calls nor add span usage."""
+        client = BedrockClient(region_name="us-east-1")
+        client.bedrock_runtime = MagicMock()
+        client.bedrock_runtime.invoke_model.return_value = {
+            "body": MagicMock(read=lambda: json.dumps({"completion": "[]"}).encode("utf-8"))
+        }
+        router = ModelRouter(routes={PLANNING: ["anthropic.claude-v2"]})
+        buffer = RingBufferExporter()
+        tracer = Tracer([buffer])
+        monkeypatch.setattr("tdev.agent_core.model_router.tracer", tracer)
+        
+        with tracer.span("workflow.step"):
+            for _ in range(3):
+                router.invoke(client, PLANNING, "Plan", {"temperature": 0.2})
+        client.bedrock_runtime.invoke_model.side_effect = RuntimeError("model not available")
+        with tracer.span("workflow.step"):
+            assert router.invoke(client, PLANNING, "Other plan") == "Fallback response for: Other plan"
+        
+        stats = router.stats()["anthropic.claude-v2"]
+        assert stats["calls"] == 2 and stats["failures"] == 1
+        cached, failed = buffer.get_spans()
+        assert cached.attributes["model_calls"] == 1
+        assert "model_calls" not in failed.attributes
+    
+    def test_routes_from_environment(self, monkeypatch):
+        """Test the default routes and TDEV_MODEL_ROUTES overrides."""
+        monkeypatch.setenv("BEDROCK_MODEL_ID", "anthropic.claude-v2:1")
+        monkeypatch.setenv("TDEV_MODEL_ROUTES", '{"evaluation": ["amazon.titan-text-express-v1"]}')
+        routes = default_routes()
+        
+        assert routes[PLANNING][0] == "anthropic.claude-v2:1"
+        assert routes[EVALUATION] == ["amazon.titan-text-express-v1"]
+    
+    def test_fast_evaluation_model_is_opt_in(self, monkeypatch):
+        """Test that evaluation prefers the configured model unless a fast model is chosen."""
+        monkeypatch.setenv("BEDROCK_MODEL_ID", "anthropic.claude-v2:1")
+        monkeypatch.delenv("TDEV_MODEL_ROUTES", raising=False)
+        monkeypatch.delenv("TDEV_FAST_MODEL_ID", raising=False)
+        assert default_routes()[EVALUATION] == ["anthropic.claude-v2:1", "anthropic.claude-instant-v1"]
+        
+        monkeypatch.setenv("TDEV_FAST_MODEL_ID", "amazon.titan-text-express-v1")
+        routes = default_routes()
+        assert routes[EVALUATION] == ["amazon.titan-text-express-v1", "anthropic.claude-v2:1"]
+        assert routes[PLANNING] == ["anthropic.claude-v2:1", "amazon.titan-text-express-v1"]
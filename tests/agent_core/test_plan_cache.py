@@ -0,0 +1,113 @@
+"""
+Tests for the plan cache.
+"""
+import json
+from unittest.mock import patch, MagicMock
+
+from tdev.agent_core.plan_cache import PlanCache, normalize_goal, capability_fingerprint
+from tdev.agent_core.response_cache import MemoryCache, DiskCache
+from tdev.agents.planner_agent import PlannerAgent
+
+AGENTS = [
+    {"name": "EchoAgent", "type": "agent", "class": "EchoAgent", "description": "Echoes input"},
+    {"name": "SummarizerAgent", "type": "agent", "class": "SummarizerAgent", "description": "Summarizes text"},
+]
+
+PLAN = json.dumps([{"agent": "EchoAgent"}, {"agent": "SummarizerAgent"}])
+
+def make_registry(agents, generation=1):
+    """Build a registry mock with the given agents and no tools."""
+    registry = MagicMock()
+    registry.generation = generation
+    registry.get_by_type.side_effect = lambda kind: list(agents) if kind == "agent" else []
+    return registry
+
+def make_planner():
+    """Build a planner whose Bedrock client returns a fixed plan."""
+    with patch('tdev.agents.planner_agent.get_registry', return_value=make_registry(AGENTS)):
+        planner = PlannerAgent()
+    planner.bedrock_client = MagicMock()
+    planner.bedrock_client.invoke_model.return_value = PLAN
+    return planner
+
+class TestPlanCache:
+    """Tests for PlanCache."""
+    
+    def test_normalize_goal(self):
+        """Test that case, whitespace and trailing punctuation are ignored."""
+        assert normalize_goal("  Summarize   the\nDocument. ") == "summarize the document"
+        assert normalize_goal("Summarize the document!") == normalize_goal("summarize the document")
+    
+    def test_fingerprint_tracks_capabilities(self):
+        """Test that the fingerprint ignores order but not changes."""
+        fingerprint = capability_fingerprint(AGENTS, [])
+        assert fingerprint == capability_fingerprint(list(reversed(AGENTS)), [])
+        assert fingerprint != capability_fingerprint(AGENTS[:1], [])
+        changed = [dict(AGENTS[0], description="Repeats input"), AGENTS[1]]
+        assert fingerprint != capability_fingerprint(changed, [])
+    
+    def test_fingerprint_memoized_per_generation(self):
+        """Test that the fingerprint is recomputed only when the generation changes."""
+        cache = PlanCache(MemoryCache())
+        registry = make_registry(AGENTS)
+        
+        first = cache.fingerprint(registry, AGENTS, [])
+        assert cache.fingerprint(registry, AGENTS[:1], []) == first
+        registry.generation = 2
+        assert cache.fingerprint(registry, AGENTS[:1], []) != first
+    
+    def test_disk_tier_survives_memory(self, tmp_path):
+        """Test that a new process finds plans stored on disk."""
+        cache = PlanCache(MemoryCache(), DiskCache(directory=str(tmp_path)))
+        key = cache.key("Echo the input", capability_fingerprint(AGENTS, []))
+        cache.set(key, {"workflow": {"steps": [{"agent": "EchoAgent"}]}})
+        
+        fresh = PlanCache(MemoryCache(), DiskCache(directory=str(tmp_path)))
+        assert fresh.get(key) == {"workflow": {"steps": [{"agent": "EchoAgent"}]}}
+        assert fresh.stats()["hits"] == 1
+        assert fresh.stats()["memory_entries"] == 1
+
+class TestPlannerCaching:
+    """Tests for plan caching in PlannerAgent."""
+    
+    def test_generate_id_is_stable(self):
+        """Test that IDs depend only on the normalized goal."""
+        planner = make_planner()
+        assert planner._generate_id("Echo the input") == planner._generate_id("Echo the input")
+        assert planner._generate_id("Echo the input").endswith(planner._generate_id("echo  the input.")[-5:])
+    
+    def test_repeat_goal_skips_planning(self):
+        """Test that a repeated goal is served from the cache."""
+        planner = make_planner()
+        with patch('tdev.agents.planner_agent.get_registry', return_value=make_registry(AGENTS)):
+            first = planner.run("Echo the input")
+            first["workflow"]["steps"].clear()
+            second = planner.run("echo the input.")
+            streamed = list(planner.run_stream("Echo the input"))
+        
+        assert planner.bedrock_client.invoke_model.call_count == 1
+        planner.bedrock_client.invoke_model_stream.assert_not_called()
+        assert second["workflow"]["steps"] == [{"agent": "EchoAgent"}, {"agent": "SummarizerAgent"}]
+        assert [event["type"] for event in streamed] == ["step", "step", "result"]
+        assert streamed[-1]["result"] == second
+    
+    def test_capability_change_invalidates(self):
+        """Test that registering a capability forces a new plan."""
+        planner = make_planner()
+        with patch('tdev.agents.planner_agent.get_registry', return_value=make_registry(AGENTS)):
+            planner.run("Echo the input")
+        extended = AGENTS + [{"name": "TranslatorAgent", "type": "agent", "class": "TranslatorAgent"}]
+        with patch('tdev.agents.planner_agent.get_registry', return_value=make_registry(extended, generation=2)):
+            planner.run("Echo the input")
+        
+        assert planner.bedrock_client.invoke_model.call_count == 2
+    
+    def test_fallback_plans_are_not_cached(self):
+        """Test that a rule-based plan made after a failed model call is not reused."""
+        planner = make_planner()
+        planner.bedrock_client.invoke_model.return_value = "I cannot help with that."
+        with patch('tdev.agents.planner_agent.get_registry', return_value=make_registry(AGENTS)):
+            planner.run("Echo the input")
+            planner.run("Echo the input")
+        
+        assert planner.bedrock_client.invoke_model.call_count == 2
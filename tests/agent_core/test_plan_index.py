@@ -0,0 +1,138 @@
+"""
+Tests for the similar-goal plan index.
+"""
+import json
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from tdev.agent_core.plan_index import PlanIndex, embed_goal, goal_parameters
+from tdev.agent_core.plan_cache import plan_cache
+from tdev.agents.planner_agent import PlannerAgent
+
+STEPS = [{"agent": "ReaderAgent"}, {"agent": "SummarizerAgent"}]
+
+def make_registry(agents):
+    """Build a registry mock with the given agent names and no tools."""
+    registry = MagicMock()
+    registry.generation = 1
+    registry.get_by_type.side_effect = lambda kind: (
+        [{"name": name, "type": "agent", "class": name} for name in agents] if kind == "agent" else []
+    )
+    return registry
+
+class TestPlanIndex:
+    """Tests for PlanIndex."""
+    
+    def test_embeddings_are_normalized_and_stable(self):
+        """Test that vectors have unit length and do not depend on the process."""
+        vector = embed_goal("Summarize the document", 256)
+        assert np.isclose(np.linalg.norm(vector), 1.0)
+        assert np.array_equal(vector, embed_goal("summarize  the document.", 256))
+        assert not embed_goal("the", 256).any()
+    
+    def test_paraphrase_matches_above_threshold(self):
+        """Test that paraphrases match while different intents do not."""
+        index = PlanIndex()
+        index.add("Summarize the document", "fp", STEPS)
+        index.add("Translate the text to French", "fp", [{"agent": "TranslatorAgent"}])
+        
+        match = index.search("Please summarize this document", "fp")
+        assert match["goal"] == "Summarize the document"
+        assert match["steps"] == STEPS
+        assert match["similarity"] >= index.threshold
+        assert index.search("Translate the text to German", "fp") is None
+        assert index.search("Summarize the document", "other-fp") is None
+    
+    def test_goals_with_other_parameters_do_not_match(self):
+        """Test that near misses differing only in their parameters are planned afresh."""
+        index = PlanIndex()
+        goals = [
+            "Fetch the article from the site and translate it to French",
+            "Send the weekly report to alice@example.com",
+            "Delete log files older than 30 days",
+            "Rename 'draft.txt' to the final name",
+        ]
+        for goal in goals:
+            index.add(goal, "fp", STEPS)
+        
+        assert index.search("Fetch the article from the site and translate it to German", "fp") is None
+        assert index.search("Send the weekly report to bob@example.com", "fp") is None
+        assert index.search("Delete log files older than 3 days", "fp") is None
+        assert index.search("Rename 'notes.txt' to the final name", "fp") is None
+        assert index.search("Send the weekly report to alice@example.com please", "fp") is not None
+        assert goal_parameters("Summarize the news from Reuters") == {"reuters"}
+    
+    def test_related_word_forms_match(self):
+        """Test that paraphrases using other forms of the same words match."""
+        index = PlanIndex()
+        index.add("Summarize the news", "fp", STEPS)
+        assert index.search("Give me a summary of the news", "fp")["goal"] == "Summarize the news"
+        assert index.search("Translate the news", "fp") is None
+    
+    def test_incremental_insertion_grows_matrix(self):
+        """Test that many insertions keep every goal searchable."""
+        index = PlanIndex(dimensions=512)
+        for number in range(40):
+            index.add(f"Process order batch {number} for customer{number}", "fp", [{"agent": f"Agent{number}"}])
+        index.add("Process order batch 7 for customer7", "fp", [{"agent": "Replaced"}])
+        
+        assert len(index) == 40
+        assert index.search("process order batch 7 for customer7", "fp")["steps"] == [{"agent": "Replaced"}]
+    
+    def test_persists_and_reloads(self, tmp_path):
+        """Test that entries are appended to disk and survive a restart."""
+        path = tmp_path / "index.jsonl"
+        index = PlanIndex(path=str(path))
+        index.add("Summarize the document", "fp", STEPS)
+        index.add("Summarize the document", "fp", STEPS[1:])
+        
+        assert len(path.read_text().splitlines()) == 2
+        reloaded = PlanIndex(path=str(path))
+        assert len(reloaded) == 1
+        assert reloaded.search("summarize this document", "fp")["steps"] == STEPS[1:]
+    
+    def test_oldest_entries_dropped(self, tmp_path):
+        """Test that the index stays within max_entries and compacts its file."""
+        path = tmp_path / "index.jsonl"
+        index = PlanIndex(path=str(path), max_entries=8)
+        for number in range(9):
+            index.add(f"goal number {number}", "fp", STEPS)
+        
+        assert len(index) == 6
+        goals = [json.loads(line)["goal"] for line in path.read_text().splitlines()]
+        assert goals == [f"goal number {number}" for number in range(3, 9)]
+
+class TestPlannerReuse:
+    """Tests for similar-goal reuse in PlannerAgent."""
+    
+    def test_paraphrase_skips_planning(self):
+        """Test that a paraphrased goal reuses the earlier plan without calling Bedrock."""
+        registry = make_registry(["ReaderAgent", "SummarizerAgent"])
+        with patch('tdev.agents.planner_agent.get_registry', return_value=registry):
+            planner = PlannerAgent()
+            planner.bedrock_client = MagicMock()
+            planner.bedrock_client.invoke_model.return_value = json.dumps(STEPS)
+            planner.run("Summarize the document")
+            result = planner.run("Please summarize this document")
+            events = list(planner.run_stream("Kindly summarize the document"))
+        
+        assert planner.bedrock_client.invoke_model.call_count == 1
+        planner.bedrock_client.invoke_model_stream.assert_not_called()
+        assert result["workflow"]["steps"] == STEPS
+        assert result["workflow"]["description"] == "Workflow for goal: Please summarize this document"
+        assert [event["type"] for event in events] == ["step", "step", "result"]
+    
+    def test_reused_plan_is_not_cached_as_the_new_goal(self):
+        """Test that a similar goal's plan is not stored in the exact-match plan cache."""
+        registry = make_registry(["ReaderAgent", "SummarizerAgent"])
+        with patch('tdev.agents.planner_agent.get_registry', return_value=registry):
+            planner = PlannerAgent()
+            planner.bedrock_client = MagicMock()
+            planner.bedrock_client.invoke_model.return_value = json.dumps(STEPS)
+            planner.run("Summarize the document")
+            planner.run("Please summarize this document")
+            fingerprint = plan_cache.fingerprint(registry, registry.get_by_type("agent"), [])
+        
+        assert plan_cache.get(plan_cache.key("Summarize the document", fingerprint)) is not None
+        assert plan_cache.get(plan_cache.key("Please summarize this document", fingerprint)) is None
@@ -0,0 +1,152 @@
+"""
+Tests for client-side rate limiting of Bedrock calls.
+"""
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from tdev.agent_core.rate_limit import (
+    TokenBucket, AdaptiveConcurrencyLimiter, BedrockThrottledError, is_throttling_error, is_transient_error
+)
+from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.monitoring.telemetry import Tracer, RingBufferExporter
+
+def throttling_error():
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "InvokeModel")
+
+def server_error(code="ServiceUnavailableException", status=503):
+    return ClientError({"Error": {"Code": code, "Message": "Try again"},
+                        "ResponseMetadata": {"HTTPStatusCode": status}}, "InvokeModel")
+
+def completion(text):
+    return {"body": MagicMock(read=lambda: json.dumps({"completion": text}).encode("utf-8"))}
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+    
+    def test_burst_then_refill(self):
+        """Test that the burst is spent immediately and tokens accrue at the rate."""
+        bucket = TokenBucket(rate=50, capacity=2)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        
+        start = time.monotonic()
+        assert bucket.acquire(timeout=1)
+        assert time.monotonic() - start >= 0.01
+    
+    def test_acquire_timeout(self):
+        """Test that acquire gives up after its timeout."""
+        bucket = TokenBucket(rate=0.1, capacity=1)
+        bucket.try_acquire()
+        assert not bucket.acquire(timeout=0.02)
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for AdaptiveConcurrencyLimiter."""
+    
+    def test_additive_increase_and_multiplicative_decrease(self):
+        """Test that successes raise the limit slowly and a throttle halves it."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8, decrease_cooldown=0)
+        for _ in range(8):
+            with limiter.slot():
+                pass
+        assert 5 < limiter.limit < 6.5
+        
+        before = limiter.limit
+        with limiter.slot() as outcome:
+            outcome["throttled"] = True
+        assert limiter.limit == pytest.approx(before * 0.5)
+    
+    def test_throttles_within_cooldown_decrease_once(self):
+        """Test that a burst of throttles from in-flight calls only backs off once."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, decrease_cooldown=60)
+        for _ in range(3):
+            limiter.acquire()
+        for _ in range(3):
+            limiter.release(throttled=True)
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+    
+    def test_limit_stays_within_bounds(self):
+        """Test the minimum and maximum limits."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=3, decrease_cooldown=0)
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(throttled=True)
+        assert limiter.limit == 1
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release()
+        assert limiter.limit == 3
+
+class TestBedrockClientThrottling:
+    """Tests for throttle handling in BedrockClient."""
+    
+    def setup_method(self):
+        """Set up a client with a mocked runtime."""
+        self.client = BedrockClient(region_name="us-east-1")
+        self.client.bedrock_runtime = MagicMock()
+    
+    def test_is_throttling_error(self):
+        """Test throttle detection."""
+        assert is_throttling_error(throttling_error())
+        assert not is_throttling_error(ValueError("bad request"))
+    
+    def test_throttled_call_is_retried(self, monkeypatch):
+        """Test that a throttle is retried and counted on the current span."""
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.THROTTLE_BACKOFF_BASE", 0)
+        self.client.bedrock_runtime.invoke_model.side_effect = [throttling_error(), completion("ok")]
+        buffer = RingBufferExporter()
+        tracer = Tracer([buffer])
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.tracer", tracer)
+        
+        with tracer.span("workflow.step", retries=0):
+            assert self.client.invoke_model("anthropic.claude-v2", "Hello") == "ok"
+        
+        assert buffer.get_spans()[0].attributes["retries"] == 1
+    
+    def test_persistent_throttling_raises(self, monkeypatch):
+        """Test that exhausted retries raise instead of returning a fallback string."""
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.THROTTLE_BACKOFF_BASE", 0)
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.MAX_THROTTLE_RETRIES", 2)
+        self.client.bedrock_runtime.invoke_model.side_effect = throttling_error()
+        
+        with pytest.raises(BedrockThrottledError):
+            self.client.invoke_model("anthropic.claude-v2", "Hello")
+        assert self.client.bedrock_runtime.invoke_model.call_count == 3
+    
+    def test_is_transient_error(self):
+        """Test detection of failures worth retrying."""
+        assert is_transient_error(server_error())
+        assert is_transient_error(server_error("ModelNotReadyException", 429))
+        assert is_transient_error(ReadTimeoutError(endpoint_url="https://bedrock"))
+        assert not is_transient_error(throttling_error())
+        assert not is_transient_error(server_error("ValidationException", 400))
+    
+    def test_transient_failures_are_retried(self, monkeypatch):
+        """Test that server errors and timeouts are retried without shrinking the limit."""
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.THROTTLE_BACKOFF_BASE", 0)
+        self.client.bedrock_runtime.invoke_model.side_effect = [
+            server_error(), ReadTimeoutError(endpoint_url="https://bedrock"), completion("ok")
+        ]
+        
+        assert self.client.invoke_model("anthropic.claude-v2", "Hello") == "ok"
+        assert self.client.bedrock_runtime.invoke_model.call_count == 3
+    
+    def test_persistent_transient_failure_falls_back(self, monkeypatch):
+        """Test that a call still failing after its retries keeps the fallback behaviour."""
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.THROTTLE_BACKOFF_BASE", 0)
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.MAX_THROTTLE_RETRIES", 1)
+        self.client.bedrock_runtime.invoke_model.side_effect = server_error()
+        
+        assert self.client.invoke_model("anthropic.claude-v2", "Hello") == "Fallback response for: Hello"
+        assert self.client.bedrock_runtime.invoke_model.call_count == 2
+    
+    def test_other_errors_still_fall_back(self):
+        """Test that non-throttling failures keep the fallback behaviour."""
+        self.client.bedrock_runtime.invoke_model.side_effect = ValueError("bad request")
+        assert self.client.invoke_model("anthropic.claude-v2", "Hello") == "Fallback response for: Hello"
+        assert self.client.bedrock_runtime.invoke_model.call_count == 1
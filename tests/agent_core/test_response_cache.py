@@ -0,0 +1,122 @@
+"""
+Tests for the model response cache.
+"""
+import json
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from tdev.agent_core.response_cache import ResponseCache, MemoryCache, DiskCache, cache_key
+from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.monitoring.telemetry import Tracer, RingBufferExporter
+
+LOW_TEMPERATURE = {"maxTokens": 100, "temperature": 0.2, "topP": 0.9}
+
+class TestResponseCache:
+    """Tests for the memory and disk tiers."""
+    
+    def test_key_ignores_surrounding_whitespace_but_not_parameters(self):
+        """Test cache key normalization."""
+        key = cache_key("model", "\n Plan a workflow ", LOW_TEMPERATURE)
+        assert key == cache_key("model", "Plan a workflow", LOW_TEMPERATURE)
+        assert cache_key("model", "steps:\n  - a", LOW_TEMPERATURE) != cache_key("model", "steps:\n- a", LOW_TEMPERATURE)
+        assert key != cache_key("model", "Plan a workflow", {**LOW_TEMPERATURE, "maxTokens": 200})
+        assert key != cache_key("other-model", "Plan a workflow", LOW_TEMPERATURE)
+    
+    def test_memory_tier_is_lru(self):
+        """Test that the least recently used entry is evicted first."""
+        memory = MemoryCache(max_entries=2)
+        memory.set("a", 1)
+        memory.set("b", 2)
+        memory.get("a")
+        memory.set("c", 3)
+        
+        assert memory.get("a") == 1
+        assert memory.get("b") is None
+        assert memory.evictions == 1
+    
+    def test_entries_expire(self):
+        """Test TTL expiry in both tiers."""
+        memory = MemoryCache(ttl=60)
+        memory.set("a", 1)
+        with patch("tdev.agent_core.response_cache.time.time", return_value=time.time() + 120):
+            assert memory.get("a") is None
+    
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a new cache instance reads entries written by an earlier one."""
+        first = ResponseCache(MemoryCache(), DiskCache(tmp_path))
+        first.set("key", "cached plan")
+        
+        second = ResponseCache(MemoryCache(), DiskCache(tmp_path))
+        assert second.get("key") == "cached plan"
+        assert second.get("key") == "cached plan"
+        
+        stats = second.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_rate"] == 1.0
+    
+    def test_disk_tier_evicts_by_size(self, tmp_path):
+        """Test that the disk tier stays under its size cap, dropping old entries first."""
+        disk = DiskCache(tmp_path, max_bytes=400)
+        for i in range(10):
+            disk.set(f"{i:02d}key", "x" * 50)
+        
+        total = sum(path.stat().st_size for path in tmp_path.glob("*/*.json"))
+        assert total <= 400
+        assert disk.evictions > 0
+        assert disk.get("09key") is not None
+        assert disk.get("00key") is None
+    
+    def test_disk_tier_counts_encoded_bytes_once(self, tmp_path):
+        """Test that the tracked size matches the bytes on disk, including the first write."""
+        disk = DiskCache(tmp_path)
+        disk.set("first", "é" * 100)
+        disk.set("second", "plan")
+        
+        assert disk._size == sum(path.stat().st_size for path in tmp_path.glob("*/*.json"))
+    
+    def test_only_low_temperature_calls_are_cacheable(self):
+        """Test the temperature threshold."""
+        cache = ResponseCache(MemoryCache(), max_temperature=0.3)
+        assert cache.is_cacheable(LOW_TEMPERATURE)
+        assert not cache.is_cacheable({"temperature": 0.7})
+        assert not cache.is_cacheable(None)
+
+class TestBedrockClientCaching:
+    """Tests for caching in BedrockClient.invoke_model."""
+    
+    def test_repeated_low_temperature_call_is_served_from_cache(self, isolated_response_cache):
+        """Test that only the first identical planning call reaches Bedrock."""
+        client = BedrockClient(region_name="us-east-1")
+        client.bedrock_runtime = MagicMock()
+        client.bedrock_runtime.invoke_model.return_value = {
+            "body": MagicMock(read=lambda: json.dumps({"completion": "[]"}).encode("utf-8"))
+        }
+        buffer = RingBufferExporter()
+        tracer = Tracer([buffer])
+        
+        with patch("tdev.agent_core.bedrock_client.tracer", tracer):
+            with tracer.span("workflow.step", cache_hits=0):
+                first = client.invoke_model("anthropic.claude-v2", "Plan", LOW_TEMPERATURE)
+                second = client.invoke_model("anthropic.claude-v2", "Plan", LOW_TEMPERATURE)
+        
+        assert first == second == "[]"
+        assert client.bedrock_runtime.invoke_model.call_count == 1
+        assert buffer.get_spans()[0].attributes["cache_hits"] == 1
+        
+        # High-temperature calls are never cached
+        client.invoke_model("anthropic.claude-v2", "Plan", {"temperature": 0.9})
+        client.invoke_model("anthropic.claude-v2", "Plan", {"temperature": 0.9})
+        assert client.bedrock_runtime.invoke_model.call_count == 3
+    
+    def test_failed_calls_are_not_cached(self):
+        """Test that fallback responses are not stored."""
+        client = BedrockClient(region_name="us-east-1")
+        client.bedrock_runtime = MagicMock()
+        client.bedrock_runtime.invoke_model.side_effect = Exception("unavailable")
+        
+        assert client.invoke_model("anthropic.claude-v2", "Plan", LOW_TEMPERATURE) == "Fallback response for: Plan"
+        client.invoke_model("anthropic.claude-v2", "Plan", LOW_TEMPERATURE)
+        assert client.bedrock_runtime.invoke_model.call_count == 2
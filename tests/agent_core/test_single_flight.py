@@ -0,0 +1,105 @@
+"""
+Tests for request coalescing.
+"""
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from tdev.agent_core.single_flight import SingleFlight
+from tdev.agent_core.bedrock_client import BedrockClient
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+    
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving while a call is in flight get its result."""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+        
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+        
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(flights.do, "key", slow) for _ in range(5)]
+            while flights.stats()["shared"] < 4:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flights.stats() == {"executed": 1, "shared": 4}
+        assert flights.in_flight() == 0
+    
+    def test_exceptions_are_shared(self):
+        """Test that waiters receive the leader's exception."""
+        flights = SingleFlight()
+        release = threading.Event()
+        
+        def failing():
+            release.wait(5)
+            raise RuntimeError("throttled")
+        
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flights.do, "key", failing) for _ in range(3)]
+            while flights.stats()["shared"] < 2:
+                time.sleep(0.01)
+            release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError, match="throttled"):
+                    future.result()
+    
+    def test_later_calls_run_again(self):
+        """Test that a finished call is not reused."""
+        flights = SingleFlight()
+        assert flights.do("key", lambda: 1) == 1
+        assert flights.do("key", lambda: 2) == 2
+    
+    def test_async_callers_share_one_call(self):
+        """Test coalescing of awaiting callers."""
+        flights = SingleFlight()
+        calls = []
+        
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        async def run_all():
+            return await asyncio.gather(*(flights.ado("key", slow) for _ in range(5)))
+        
+        assert asyncio.run(run_all()) == ["result"] * 5
+        assert len(calls) == 1
+
+class TestBedrockClientCoalescing:
+    """Tests for coalescing in BedrockClient."""
+    
+    def test_identical_concurrent_calls_reach_bedrock_once(self):
+        """Test that a burst of identical low-temperature calls makes one request."""
+        client = BedrockClient(region_name="us-east-1")
+        client.bedrock_runtime = MagicMock()
+        release = threading.Event()
+        
+        def invoke_model(**kwargs):
+            release.wait(5)
+            return {"body": MagicMock(read=lambda: json.dumps({"completion": "plan"}).encode("utf-8"))}
+        
+        client.bedrock_runtime.invoke_model.side_effect = invoke_model
+        parameters = {"maxTokens": 100, "temperature": 0.2, "topP": 0.9}
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(client.invoke_model, "anthropic.claude-v2", "Plan", parameters) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        assert results == ["plan"] * 4
+        assert client.bedrock_runtime.invoke_model.call_count == 1
@@ -0,0 +1,109 @@
+"""
+Tests for the local Bedrock stand-in server.
+"""
+import random
+from unittest.mock import ANY
+
+import boto3
+import pytest
+
+from tdev.agent_core.stub_server import BedrockStubServer, LatencyDistribution, ResponseScript
+from tdev.agent_core import bedrock_client
+from tdev.agent_core.bedrock_client import BedrockClient, get_client_config
+from tdev.agent_core.rate_limit import BedrockThrottledError
+from tdev.core.json_stream import JsonArrayStream
+
+PLANNER_PROMPT = """You are an AI workflow planner. Your task is to create a workflow plan to achieve a goal.
+
+Goal: Summarize a document
+
+Available agents:
+ReaderAgent, SummarizerAgent
+
+Workflow plan:
+"""
+
+def real_client(server):
+    """Build a BedrockClient whose runtime client talks to the stub over HTTP."""
+    client = BedrockClient(region_name="us-east-1")
+    # boto3.client is patched for every test, so build the runtime client from a session
+    client.bedrock_runtime = boto3.session.Session(
+        aws_access_key_id="testing", aws_secret_access_key="testing"
+    ).client("bedrock-runtime", region_name="us-east-1", endpoint_url=server.endpoint_url,
+             config=get_client_config())
+    return client
+
+class TestLatencyDistribution:
+    """Tests for LatencyDistribution."""
+    
+    def test_parse(self):
+        """Test parsing latency specs."""
+        assert LatencyDistribution.parse("0.25").sample(random.Random()) == 0.25
+        uniform = LatencyDistribution.parse("uniform:0.1,0.2")
+        assert uniform.kind == "uniform"
+        assert all(0.1 <= uniform.sample(random.Random(i)) <= 0.2 for i in range(20))
+        assert LatencyDistribution.parse("normal:0,1").sample(random.Random(1)) >= 0
+        with pytest.raises(ValueError):
+            LatencyDistribution.parse("bimodal:1,2")
+
+class TestBedrockStubServer:
+    """Tests for BedrockStubServer."""
+    
+    def test_planner_prompt_gets_valid_plan(self):
+        """Test that generated planner responses parse as workflow steps."""
+        with BedrockStubServer() as server:
+            completion = real_client(server).invoke_model("anthropic.claude-v2", PLANNER_PROMPT)
+        
+        parser = JsonArrayStream()
+        parser.feed(completion)
+        assert parser.items == [{"agent": "ReaderAgent"}, {"agent": "SummarizerAgent"}]
+    
+    def test_scripted_responses(self):
+        """Test that scripted rules answer in turn and fall through to the default."""
+        script = ResponseScript([{"match": "weather", "response": ["sunny", "rainy"]}])
+        with BedrockStubServer(script=script) as server:
+            client = real_client(server)
+            replies = [client.invoke_model("amazon.titan-text", "weather today?", {"temperature": 0.9})
+                       for _ in range(3)]
+            other = client.invoke_model("amazon.titan-text", "hello")
+        
+        assert replies == ["sunny", "rainy", "sunny"]
+        assert other == " Stub response for: hello"
+    
+    def test_streamed_response(self):
+        """Test that streamed chunks join to the full response."""
+        script = ResponseScript([{"response": "a streamed reply from the stub"}])
+        with BedrockStubServer(script=script, chunk_size=5) as server:
+            chunks = list(real_client(server).invoke_model_stream("anthropic.claude-v2", "hi"))
+            stats = server.stats()
+        
+        assert len(chunks) > 1
+        assert "".join(chunks) == "a streamed reply from the stub"
+        assert stats["streamed"] == 1
+    
+    def test_throttling_and_errors(self, monkeypatch):
+        """Test injected throttles and server errors."""
+        monkeypatch.setattr("tdev.agent_core.bedrock_client.THROTTLE_BACKOFF_BASE", 0)
+        with BedrockStubServer(throttle_rate=1.0) as server:
+            with pytest.raises(BedrockThrottledError):
+                real_client(server).invoke_model("anthropic.claude-v2", "hi")
+            assert server.stats()["throttled"] == server.stats()["requests"] > 1
+        
+        with BedrockStubServer(error_rate=1.0) as server:
+            assert real_client(server).invoke_model("anthropic.claude-v2", "hi") == "Fallback response for: hi"
+            # Server errors are transient, so each is retried before falling back
+            assert server.stats()["errors"] == bedrock_client.MAX_THROTTLE_RETRIES + 1
+
+class TestEndpointOverride:
+    """Tests for pointing BedrockClient at another endpoint."""
+    
+    def test_endpoint_from_environment(self, mock_aws_services, monkeypatch):
+        """Test that BEDROCK_ENDPOINT_URL is passed to the runtime client."""
+        monkeypatch.setenv("BEDROCK_ENDPOINT_URL", "http://127.0.0.1:8123")
+        client = BedrockClient(region_name="us-east-1")
+        
+        assert client.endpoint_url == "http://127.0.0.1:8123"
+        mock_aws_services.assert_any_call(
+            service_name="bedrock-runtime", region_name="us-east-1",
+            endpoint_url="http://127.0.0.1:8123", config=ANY
+        )
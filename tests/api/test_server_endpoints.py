@@ -3,7 +3,7 @@ Direct API endpoint tests without TestClient.
 """
 import pytest
 from unittest.mock import MagicMock, patch
-from tdev.api.server import list_agents, orchestrate, classify, submit_feedback, root
+from tdev.api.server import list_agents, orchestrate, orchestrate_stream, classify, submit_feedback, root
 from tdev.api.server import OrchestrationRequest, CodeRequest, FeedbackRequest
 
 class TestAPIEndpoints:
@@ -65,6 +65,25 @@ class TestAPIEndpoints:
         assert result["success"] is True
         assert result["result"] == "Test result"
     
+    @pytest.mark.asyncio
+    async def test_orchestrate_stream(self):
+        """Test that orchestration events are streamed as Server-Sent Events."""
+        self.mock_coordinator.run_stream.return_value = iter([
+            {"type": "stage", "stage": "planning"},
+            {"type": "result", "result": {"success": True}}
+        ])
+        
+        request = OrchestrationRequest(goal="Test goal")
+        response = await orchestrate_stream(request)
+        body = "".join([chunk async for chunk in response.body_iterator])
+        
+        assert response.media_type == "text/event-stream"
+        assert body == (
+            'event: stage\ndata: {"type": "stage", "stage": "planning"}\n\n'
+            'event: result\ndata: {"type": "result", "result": {"success": true}}\n\n'
+        )
+        self.mock_coordinator.run_stream.assert_called_once_with({"goal": "Test goal", "options": {}})
+    
     @pytest.mark.asyncio
     async def test_classify_success(self):
         """Test successful classification."""
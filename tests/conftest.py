@@ -4,6 +4,15 @@ Test configuration and fixtures
 import pytest
 from unittest.mock import patch, MagicMock
 
+from tdev.agent_core.bedrock_client import reset_bedrock_clients
+from tdev.agent_core.response_cache import response_cache
+from tdev.agent_core.plan_cache import plan_cache
+from tdev.agent_core.plan_index import plan_index
+from tdev.agent_core.evaluation_cache import evaluation_cache
+from tdev.monitoring.cost_model import agent_profiles
+from tdev.agent_core.rate_limit import rate_limiter
+from tdev.agent_core.model_router import model_router
+
 @pytest.fixture(autouse=True)
 def mock_aws_services():
     """Mock AWS services to prevent actual API calls during testing"""
@@ -28,7 +37,61 @@ def mock_aws_services():
                 return MagicMock()
         
         mock_client.side_effect = client_side_effect
+        # Shared Bedrock clients, rate limits and model stats must not outlive the test that used them
+        reset_bedrock_clients()
+        rate_limiter.reset()
+        model_router.reset()
         yield mock_client
+        reset_bedrock_clients()
+        rate_limiter.reset()
+        model_router.reset()
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path, monkeypatch):
+    """Keep cached model responses from leaking between tests or into ~/.tdev"""
+    response_cache.memory.clear()
+    if response_cache.disk is not None:
+        monkeypatch.setattr(response_cache.disk, "directory", tmp_path / "response-cache")
+        monkeypatch.setattr(response_cache.disk, "_size", None)
+    yield response_cache
+    response_cache.memory.clear()
+
+@pytest.fixture(autouse=True)
+def isolated_plan_cache(tmp_path, monkeypatch):
+    """Keep cached plans from leaking between tests or into ~/.tdev"""
+    plan_cache.memory.clear()
+    if plan_cache.disk is not None:
+        monkeypatch.setattr(plan_cache.disk, "directory", tmp_path / "plan-cache")
+        monkeypatch.setattr(plan_cache.disk, "_size", None)
+    yield plan_cache
+    plan_cache.memory.clear()
+
+@pytest.fixture(autouse=True)
+def isolated_plan_index(tmp_path, monkeypatch):
+    """Keep indexed goals from leaking between tests or into ~/.tdev"""
+    monkeypatch.setattr(plan_index, "path", tmp_path / "plan_index.jsonl")
+    plan_index.reset()
+    yield plan_index
+    plan_index.reset()
+
+@pytest.fixture(autouse=True)
+def isolated_evaluation_cache(tmp_path, monkeypatch):
+    """Keep cached evaluations from leaking between tests or into ~/.tdev"""
+    evaluation_cache.memory.clear()
+    monkeypatch.setattr(evaluation_cache, "_stats", {"hits": 0, "misses": 0, "stores": 0})
+    if evaluation_cache.disk is not None:
+        monkeypatch.setattr(evaluation_cache.disk, "directory", tmp_path / "evaluation-cache")
+        monkeypatch.setattr(evaluation_cache.disk, "_size", None)
+    yield evaluation_cache
+    evaluation_cache.memory.clear()
+
+@pytest.fixture(autouse=True)
+def isolated_agent_profiles(monkeypatch):
+    """Keep step telemetry from one test shaping another's cost estimates"""
+    monkeypatch.setattr(agent_profiles, "history_file", None)
+    agent_profiles.reset()
+    yield agent_profiles
+    agent_profiles.reset()
 
 @pytest.fixture
 def mock_bedrock_client():
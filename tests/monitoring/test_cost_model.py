@@ -0,0 +1,183 @@
+"""
+Tests for the workflow cost model.
+"""
+import json
+from unittest.mock import patch, MagicMock
+
+from tdev.monitoring.telemetry import Tracer
+from tdev.monitoring.cost_model import AgentProfiles, estimate_workflow, agent_profiles, DEFAULT_STEP_PROFILE
+from tdev.agents.evaluator_agent import EvaluatorAgent
+from tdev.agent_core.evaluation_cache import evaluation_cache
+from tdev.agents.workflow_executor_agent import WorkflowExecutorAgent
+
+def step_span(agent, wall_ms, status="ok", **attributes):
+    """Build a finished step span as written to a trace file."""
+    return {"name": "workflow.step", "status": status, "wall_ms": wall_ms,
+            "attributes": {"agent": agent, **attributes}}
+
+def make_profiles(latencies, **usage):
+    """Build profiles with one recorded step per agent."""
+    profiles = AgentProfiles()
+    for agent, latency in latencies.items():
+        profiles._record(step_span(agent, latency, **usage.get(agent, {})))
+    return profiles
+
+def test_profiles_average_step_spans():
+    """Test that finished step spans are folded into per-agent moving averages."""
+    profiles = AgentProfiles(alpha=0.5)
+    tracer = Tracer([profiles])
+    for latency_calls in (1, 3):
+        with tracer.span("workflow.step", agent="SummarizerAgent") as span:
+            span.increment("model_calls", latency_calls)
+            span.increment("cost", 0.01 * latency_calls)
+    with tracer.span("workflow.step", agent="SummarizerAgent") as span:
+        span.status = "error"
+    
+    profile = profiles.get("SummarizerAgent")
+    assert profile["samples"] == 2
+    assert profile["model_calls"] == 2.0
+    assert abs(profile["cost"] - 0.02) < 1e-9
+    assert profiles.get("EchoAgent") is None
+
+def test_history_file_seeds_profiles(tmp_path):
+    """Test that spans already in a trace file are read once, on first use."""
+    history = tmp_path / "traces.jsonl"
+    history.write_text(json.dumps(step_span("EchoAgent", 40.0)) + "\n" + json.dumps({"name": "workflow.run"}) + "\n")
+    profiles = AgentProfiles(history_file=str(history))
+    with open(history, 'a') as f:
+        f.write(json.dumps(step_span("EchoAgent", 4000.0)) + "\n")
+    
+    assert profiles.get("EchoAgent") == {"samples": 1, "latency_ms": 40.0, "model_calls": 0.0,
+                                         "input_tokens": 0.0, "output_tokens": 0.0, "cost": 0.0}
+    assert profiles.stats()["EchoAgent"]["samples"] == 1
+
+def test_critical_path_follows_data_dependencies():
+    """Test that independent steps overlap on the critical path while totals add up."""
+    profiles = make_profiles(
+        {"FetchAgent": 300.0, "SummarizerAgent": 1000.0, "TranslatorAgent": 500.0, "EchoAgent": 100.0},
+        SummarizerAgent={"model_calls": 1, "input_tokens": 800, "output_tokens": 200, "cost": 0.008},
+    )
+    workflow = {"id": "report", "steps": [
+        {"agent": "FetchAgent", "output_to": "page"},
+        {"agent": "SummarizerAgent", "input_from": "page", "output_to": "summary"},
+        {"agent": "TranslatorAgent", "input": {"data": "${0.result}"}},
+        {"agent": "EchoAgent", "input_from": "summary"},
+    ]}
+    
+    estimate = estimate_workflow(workflow, profiles)
+    assert estimate["latency_ms"] == 1900.0
+    assert estimate["critical_path_ms"] == 1400.0
+    assert estimate["critical_path"] == [0, 1, 3]
+    assert estimate["model_calls"] == 1.0 and estimate["cost"] == 0.008
+    assert estimate["unprofiled_agents"] == []
+
+def test_switches_nested_workflows_and_unprofiled_agents():
+    """Test worst-case branches, inline nested workflows and the default profile."""
+    profiles = make_profiles({"FastAgent": 10.0, "SlowAgent": 900.0})
+    workflow = {"steps": [
+        {"switch": "${input.kind}", "cases": {"a": [{"agent": "FastAgent"}], "b": [{"agent": "SlowAgent"}]}},
+        {"agent": "FastAgent"},
+        {"workflow": {"steps": [{"agent": "NewAgent"}, {"agent": "FastAgent"}]}},
+        {"exit": True},
+    ]}
+    
+    estimate = estimate_workflow(workflow, profiles)
+    default_latency = DEFAULT_STEP_PROFILE["latency_ms"]
+    assert estimate["latency_ms"] == 900.0 + 10.0 + default_latency + 10.0
+    # The nested workflow's steps are independent, so only its slowest counts on the path
+    assert estimate["critical_path_ms"] == 900.0 + 10.0 + default_latency
+    assert estimate["critical_path"] == [0, 1, 2]
+    assert estimate["unprofiled_agents"] == ["NewAgent"]
+
+def test_executor_steps_feed_global_profiles():
+    """Test that running a workflow records its steps for later estimates."""
+    echo = MagicMock()
+    echo.run.side_effect = lambda data: data
+    registry = MagicMock()
+    registry.get_instance.side_effect = lambda name: echo if name == "EchoAgent" else None
+    with patch("tdev.agents.workflow_executor_agent.get_registry", return_value=registry):
+        WorkflowExecutorAgent().run({"workflow": {"id": "profiled", "steps": [{"agent": "EchoAgent"}]},
+                                     "input": {"input": "hello"}})
+    
+    assert agent_profiles.get("EchoAgent")["samples"] == 1
+
+def test_efficiency_reflects_estimate():
+    """Test that slow or costly workflows lose efficiency and get a suggestion."""
+    agent_profiles._record(step_span("SlowAgent", 20000.0, model_calls=2, cost=0.1))
+    registry = MagicMock()
+    registry.get_all.return_value = {"SlowAgent": {"type": "agent"}}
+    workflow = {"description": "Slow", "steps": [
+        {"agent": "SlowAgent", "description": "first", "on_error": "skip"},
+        {"agent": "SlowAgent", "description": "second", "input": {}},
+    ]}
+    evaluator = EvaluatorAgent()
+    evaluator.bedrock_client = None
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=registry):
+        evaluation = evaluator.run(workflow)
+    
+    assert evaluation["estimate"]["latency_ms"] == 40000.0
+    assert evaluation["estimate"]["critical_path_ms"] == 20000.0
+    assert evaluation["metrics"]["efficiency"] == 0.3
+    assert any("could finish in 20.0s if run in parallel" in suggestion for suggestion in evaluation["suggestions"])
+    assert any("cost $0.2000 per run" in suggestion for suggestion in evaluation["suggestions"])
+
+def test_cached_evaluation_follows_profiles():
+    """Test that a cached rule-based evaluation is not reused once the profiles change."""
+    registry = MagicMock()
+    registry.get_all.return_value = {"SlowAgent": {"type": "agent"}}
+    registry.get_by_type.return_value = []
+    workflow = {"description": "Slow", "steps": [{"agent": "SlowAgent", "description": "only", "on_error": "skip"}]}
+    evaluator = EvaluatorAgent()
+    evaluator.bedrock_client = None
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=registry):
+        before = evaluator.run(workflow)
+        agent_profiles._record(step_span("SlowAgent", 60000.0))
+        after = evaluator.run(workflow)
+        again = evaluator.run(workflow)
+    
+    assert before["metrics"]["efficiency"] == 0.9
+    assert after["metrics"]["efficiency"] == 0.45 and after["estimate"]["latency_ms"] == 60000.0
+    assert again["score"] == after["score"] < before["score"]
+
+def test_cached_evaluation_survives_profile_drift():
+    """Test that profile changes the score cannot see still hit the evaluation cache."""
+    registry = MagicMock()
+    registry.get_all.return_value = {"EchoAgent": {"type": "agent"}}
+    registry.get_by_type.return_value = []
+    workflow = {"description": "Echo", "steps": [{"agent": "EchoAgent", "description": "only", "on_error": "skip"}]}
+    evaluator = EvaluatorAgent()
+    evaluator.bedrock_client = None
+    agent_profiles._record(step_span("EchoAgent", 100.0))
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=registry):
+        first = evaluator.run(workflow)
+        agent_profiles._record(step_span("EchoAgent", 300.0))
+        second = evaluator.run(workflow)
+    
+    assert evaluation_cache.stats()["hits"] == 1
+    assert second["score"] == first["score"]
+    assert second["estimate"]["latency_ms"] == 140.0
+
+def test_evaluate_many_with_fixed_profiles():
+    """Test that explicit profiles keep batch scores independent of later telemetry."""
+    registry = MagicMock()
+    registry.get_all.return_value = {"SlowAgent": {"type": "agent"}}
+    workflows = [{"steps": [{"agent": "SlowAgent"}]}]
+    baseline = make_profiles({"SlowAgent": 1000.0})
+    evaluator = EvaluatorAgent()
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=registry):
+        first = evaluator.evaluate_many(workflows, profiles=baseline)
+        agent_profiles._record(step_span("SlowAgent", 60000.0))
+        second = evaluator.evaluate_many(workflows, profiles=baseline)
+        current = evaluator.evaluate_many(workflows)
+    
+    assert first == second
+    assert current[0]["score"] < first[0]["score"]
+
+def test_snapshot_is_not_updated_by_new_spans():
+    """Test that a snapshot keeps the averages it was taken with."""
+    profiles = make_profiles({"EchoAgent": 100.0})
+    snapshot = profiles.snapshot()
+    profiles._record(step_span("EchoAgent", 300.0))
+    
+    assert snapshot.get("EchoAgent")["latency_ms"] == 100.0
+    assert profiles.get("EchoAgent")["samples"] == 2
@@ -0,0 +1,123 @@
+"""
+Tests for execution recording and replay.
+"""
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tdev.monitoring.replay import (
+    record, replay, benchmark_replay, get_active_session, ReplayMissError
+)
+from tdev.agent_core.bedrock_client import BedrockClient
+from tdev.agents.workflow_executor_agent import WorkflowExecutorAgent
+
+class CountingAgent:
+    """An agent stub that counts its calls and tags its input."""
+    
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+    
+    def run(self, input_data):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("boom")
+        return {"seen": input_data, "call": self.calls}
+
+class StubRegistry:
+    """A registry stub resolving a fixed set of agents."""
+    
+    def __init__(self, agents):
+        self.agents = agents
+    
+    def get_instance(self, name):
+        return self.agents.get(name)
+
+class TestReplay:
+    """Tests for record and replay sessions."""
+    
+    def setup_method(self):
+        """Set up a temporary trace path."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trace_path = Path(self.temp_dir.name) / "run.jsonl.gz"
+    
+    def teardown_method(self):
+        """Clean up the temporary directory."""
+        self.temp_dir.cleanup()
+    
+    def _run_workflow(self, monkeypatch, agents):
+        registry = StubRegistry(agents)
+        monkeypatch.setattr("tdev.agents.workflow_executor_agent.get_registry", lambda: registry)
+        workflow = {
+            "id": "replayed-flow",
+            "steps": [
+                {"agent": "FirstAgent", "output_to": "first"},
+                {"agent": "FailingAgent", "input_from": "first"},
+            ],
+        }
+        return WorkflowExecutorAgent().run({"workflow": workflow, "input": {"input": "hello"}})
+    
+    def test_replay_serves_recorded_agent_outputs(self, monkeypatch):
+        """Test that replayed steps return recorded outputs without running agents."""
+        first, failing = CountingAgent(), CountingAgent(fail=True)
+        with record(self.trace_path, {"request": {"goal": "demo"}}):
+            recorded = self._run_workflow(monkeypatch, {"FirstAgent": first, "FailingAgent": failing})
+        assert get_active_session() is None
+        
+        replay_first, replay_failing = CountingAgent(), CountingAgent()
+        with replay(self.trace_path) as session:
+            replayed = self._run_workflow(monkeypatch, {"FirstAgent": replay_first, "FailingAgent": replay_failing})
+        
+        assert session.metadata["request"] == {"goal": "demo"}
+        assert replay_first.calls == 0 and replay_failing.calls == 0
+        assert replayed["first"] == recorded["first"]
+        assert replayed["error_1"] == "boom"
+    
+    def test_trace_is_gzip_jsonl(self, monkeypatch):
+        """Test the on-disk trace format."""
+        with record(self.trace_path):
+            self._run_workflow(monkeypatch, {"FirstAgent": CountingAgent(), "FailingAgent": CountingAgent()})
+        
+        with gzip.open(self.trace_path, 'rt') as f:
+            events = [json.loads(line) for line in f]
+        assert events[0]["type"] == "meta"
+        assert [event["name"] for event in events[1:]] == ["FirstAgent", "FailingAgent"]
+    
+    def test_model_responses_are_replayed(self):
+        """Test that BedrockClient serves recorded responses during replay."""
+        client = BedrockClient()
+        with record(self.trace_path):
+            recorded = client.invoke_model("anthropic.claude-v2", "Plan a workflow")
+        
+        client.bedrock_runtime = None
+        with replay(self.trace_path):
+            assert client.invoke_model("anthropic.claude-v2", "Plan a workflow") == recorded
+            with pytest.raises(ReplayMissError):
+                client.invoke_model("anthropic.claude-v2", "Plan a workflow")
+    
+    def test_sessions_do_not_nest(self):
+        """Test that only one session can be active at a time."""
+        with record(self.trace_path):
+            with pytest.raises(RuntimeError):
+                with record(Path(self.temp_dir.name) / "nested.jsonl.gz"):
+                    pass
+    
+    def test_benchmark_replay(self, monkeypatch):
+        """Test timing repeated replays of a trace."""
+        with record(self.trace_path, {"request": {"goal": "demo"}}):
+            self._run_workflow(monkeypatch, {"FirstAgent": CountingAgent(), "FailingAgent": CountingAgent()})
+        
+        requests = []
+        
+        def run(metadata):
+            requests.append(metadata["request"])
+            self._run_workflow(monkeypatch, {"FirstAgent": CountingAgent(), "FailingAgent": CountingAgent()})
+        
+        stats = benchmark_replay(self.trace_path, run, iterations=3)
+        assert stats["iterations"] == 3
+        assert len(stats["timings_ms"]) == 3
+        assert requests == [{"goal": "demo"}] * 3
+        assert stats["min_ms"] <= stats["mean_ms"]
@@ -0,0 +1,115 @@
+"""
+Tests for execution telemetry.
+"""
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tdev.monitoring.telemetry import Tracer, RingBufferExporter, JsonlFileExporter, payload_size
+from tdev.agents.workflow_executor_agent import WorkflowExecutorAgent
+
+class EchoStub:
+    """An agent stub that echoes its input."""
+    
+    def run(self, input_data):
+        return input_data
+
+class FailingStub:
+    """An agent stub that always raises."""
+    
+    def run(self, input_data):
+        raise RuntimeError("boom")
+
+class StubRegistry:
+    """A registry stub resolving a fixed set of agents."""
+    
+    def __init__(self, agents):
+        self.agents = agents
+    
+    def get_instance(self, name):
+        return self.agents.get(name)
+
+class TestTracer:
+    """Tests for the Tracer and its exporters."""
+    
+    def setup_method(self):
+        """Set up a tracer with a ring buffer."""
+        self.buffer = RingBufferExporter(capacity=10)
+        self.tracer = Tracer([self.buffer])
+    
+    def test_nested_spans_share_trace(self):
+        """Test that child spans are parented to the enclosing span."""
+        with self.tracer.span("parent") as parent:
+            with self.tracer.span("child", step=1) as child:
+                child.increment("cache_hits")
+        
+        spans = self.buffer.get_spans(trace_id=parent.trace_id)
+        assert [span.name for span in spans] == ["child", "parent"]
+        assert child.parent_id == parent.span_id
+        assert child.attributes == {"step": 1, "cache_hits": 1}
+        assert parent.wall_ms >= child.wall_ms >= 0
+    
+    def test_exception_marks_span_failed(self):
+        """Test that an exception is recorded on the span and re-raised."""
+        with pytest.raises(ValueError):
+            with self.tracer.span("failing"):
+                raise ValueError("bad input")
+        
+        span = self.buffer.get_spans(name="failing")[0]
+        assert span.status == "error"
+        assert span.error == "bad input"
+    
+    def test_ring_buffer_evicts_oldest(self):
+        """Test that the ring buffer keeps only the most recent spans."""
+        for i in range(15):
+            with self.tracer.span(f"span-{i}"):
+                pass
+        
+        names = [span.name for span in self.buffer.get_spans()]
+        assert names == [f"span-{i}" for i in range(5, 15)]
+    
+    def test_jsonl_exporter(self):
+        """Test that spans are appended to a JSONL file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "traces" / "spans.jsonl"
+            self.tracer.add_exporter(JsonlFileExporter(path))
+            with self.tracer.span("first"):
+                pass
+            with self.tracer.span("second"):
+                pass
+            
+            lines = path.read_text().splitlines()
+            assert [json.loads(line)["name"] for line in lines] == ["first", "second"]
+    
+    def test_payload_size(self):
+        """Test payload size estimation."""
+        assert payload_size(None) == 0
+        assert payload_size("abc") == 3
+        assert payload_size({"a": 1}) == len('{"a": 1}')
+
+class TestWorkflowExecutorTelemetry:
+    """Tests for the spans emitted by WorkflowExecutorAgent."""
+    
+    def test_step_spans(self, monkeypatch):
+        """Test that each step produces a child span of the run span."""
+        buffer = RingBufferExporter()
+        monkeypatch.setattr("tdev.agents.workflow_executor_agent.tracer", Tracer([buffer]))
+        registry = StubRegistry({"EchoAgent": EchoStub(), "FailingAgent": FailingStub()})
+        monkeypatch.setattr("tdev.agents.workflow_executor_agent.get_registry", lambda: registry)
+        
+        workflow = {
+            "id": "traced-flow",
+            "steps": [{"agent": "EchoAgent"}, {"agent": "FailingAgent"}, {"agent": "MissingAgent"}],
+        }
+        WorkflowExecutorAgent().run({"workflow": workflow, "input": {"input": "hello"}})
+        
+        run_span = buffer.get_spans(name="workflow.run")[0]
+        step_spans = buffer.get_spans(trace_id=run_span.trace_id, name="workflow.step")
+        assert run_span.attributes["workflow_id"] == "traced-flow"
+        assert [span.parent_id for span in step_spans] == [run_span.span_id] * 3
+        assert [span.status for span in step_spans] == ["ok", "error", "error"]
+        assert step_spans[0].attributes["input_bytes"] == 5
+        assert step_spans[0].attributes["output_bytes"] == 5
+        assert step_spans[1].error == "boom"
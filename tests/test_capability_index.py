@@ -0,0 +1,102 @@
+"""
+Tests for the TF-IDF capability index.
+"""
+import json
+import time
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from tdev.core.capability_index import CapabilityIndex, tokenize, load_specs, component_text
+from tdev.agents.planner_agent import PlannerAgent
+
+AGENTS = [
+    {"name": "EchoAgent", "type": "agent", "description": "Echoes the input data.", "tags": ["utility"]},
+    {"name": "AgentTesterAgent", "type": "agent", "description": "Tests other agents and tools.", "tags": ["core"]},
+    {"name": "SummarizerAgent", "type": "agent", "description": "Produces a short summary.", "tags": ["text"]},
+    {"name": "TranslatorAgent", "type": "agent", "description": "Translates documents.", "tags": ["text"]},
+]
+
+def test_tokenize_splits_and_stems():
+    """Test CamelCase splitting, stop words and stemming."""
+    assert tokenize("SummarizerAgent") == ["summar"]
+    assert tokenize("Testing the tests") == ["test", "test"]
+    assert tokenize("summarizing a summary") == ["summar", "summar"]
+    assert len(set(tokenize("translate transcribe transfer transform"))) == 4
+
+def test_unrelated_terms_do_not_match():
+    """Test that words sharing only a prefix do not match each other's agents."""
+    index = CapabilityIndex(AGENTS, specs={})
+    assert index.match("transcribe the audio", 0.3) == []
+    assert index.match("translating the documents", 0.3)[0]["name"] == "TranslatorAgent"
+
+def test_scores_are_cosine_similarities():
+    """Test that the sparse product matches a dense computation."""
+    index = CapabilityIndex(AGENTS, specs={})
+    scores = index.scores("Summarize and translate the documents")
+    
+    dense = np.zeros((len(AGENTS), len(index.vocabulary)), dtype=np.float32)
+    for row in range(len(AGENTS)):
+        start, end = index.indptr[row], index.indptr[row + 1]
+        dense[row, index.indices[start:end]] = index.data[start:end]
+    assert np.allclose(np.linalg.norm(dense, axis=1), 1.0)
+    
+    query = np.zeros(len(index.vocabulary), dtype=np.float32)
+    for term in set(tokenize("Summarize and translate the documents")):
+        query[index.vocabulary[term]] = index.idf[index.vocabulary[term]]
+    assert np.allclose(scores, dense @ (query / np.linalg.norm(query)), atol=1e-6)
+
+def test_rank_and_match():
+    """Test ranking, ties in index order, and thresholded matches."""
+    index = CapabilityIndex(AGENTS, specs={})
+    assert [c["name"] for c in index.rank("give me a summary", limit=2)] == ["SummarizerAgent", "EchoAgent"]
+    assert [c["name"] for c in index.match("test my agent", 0.3)] == ["AgentTesterAgent"]
+    assert index.match("forecast the weather", 0.01) == []
+
+def test_specs_are_indexed(tmp_path):
+    """Test that specification text is attached by name, with or without the type suffix."""
+    (tmp_path / "agents").mkdir()
+    (tmp_path / "agents" / "weather.json").write_text(json.dumps(
+        {"type": "agent", "name": "Weather", "goal": "Forecast rain and sunshine"}
+    ))
+    specs = load_specs(str(tmp_path))
+    agent = {"name": "WeatherAgent", "type": "agent", "description": "Reports conditions"}
+    
+    assert "Forecast rain" in component_text(agent, specs)
+    index = CapabilityIndex(AGENTS + [agent], specs=specs)
+    assert index.rank("Will it rain tomorrow?", limit=1)[0]["name"] == "WeatherAgent"
+
+def test_scales_to_thousands_of_agents():
+    """Test that scoring stays fast with a large generated registry."""
+    agents = [{"name": f"Generated{i}Agent", "type": "agent", "description": f"Handles task {i} for team {i % 50}"}
+              for i in range(5000)]
+    agents.append({"name": "InvoiceParserAgent", "type": "agent", "description": "Parses invoices"})
+    index = CapabilityIndex(agents, specs={})
+    
+    start = time.perf_counter()
+    best = index.rank("Parse this invoice", limit=1)
+    assert time.perf_counter() - start < 0.1
+    assert best[0]["name"] == "InvoiceParserAgent"
+
+def test_rule_based_planner_uses_index():
+    """Test that each clause of a goal becomes a step for its best-matching agent."""
+    planner = PlannerAgent()
+    steps = planner._analyze_goal("Summarize the document and then translate it", AGENTS, [])
+    
+    assert [step["agent"] for step in steps] == ["SummarizerAgent", "TranslatorAgent"]
+    assert steps[1]["input"] == {"data": "${0.result}"}
+    assert planner._capability_matchers(AGENTS, [])[0] is planner._capability_matchers(list(AGENTS), [])[0]
+
+def test_planner_reuses_memoized_fingerprint():
+    """Test that planning with an unchanged registry does not serialize its capabilities again."""
+    registry = MagicMock()
+    registry.generation = 1
+    registry.get_by_type.side_effect = lambda kind: list(AGENTS) if kind == "agent" else []
+    planner = PlannerAgent()
+    planner.bedrock_client = None
+    
+    with patch('tdev.agents.planner_agent.get_registry', return_value=registry), \
+            patch('tdev.agents.planner_agent.capability_fingerprint') as fingerprint:
+        planner.run("Summarize the document")
+        planner.run("Translate the document")
+    fingerprint.assert_not_called()
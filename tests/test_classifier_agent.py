@@ -3,13 +3,15 @@ Tests for ClassifierAgent.
 """
 import pytest
 from unittest.mock import patch, mock_open
-from tdev.agents.classifier_agent import ClassifierAgent
+from tdev.agents.classifier_agent import ClassifierAgent, analyze_source, clear_classifier_cache
+from tdev.agents.auto_agent_composer import AutoAgentComposer
 
 class TestClassifierAgent:
     """Test the ClassifierAgent."""
     
     def setup_method(self):
         """Set up test fixtures."""
+        clear_classifier_cache()
         self.agent = ClassifierAgent()
     
     def test_run_with_file_path(self):
@@ -41,30 +43,101 @@ def test_tool(input_data):
         assert result["brain_count"] == 0
         assert result["reusability"] == "A"
     
-    def test_is_team(self):
-        """Test team detection."""
+    def test_team_detection(self):
+        """Test team detection by base class, with a brain per member."""
         team_content = '''
 from tdev.core.team import Team
 
-class TestTeam(Team):
-    pass
+class ReviewTeam(Team):
+    def __init__(self):
+        super().__init__()
+        self.add_agent("writer", None)
+        self.add_agent("critic", None)
+        self.add_agent("editor", None)
 '''
-        assert self.agent._is_team(team_content) is True
-        assert self.agent._is_team("class TestAgent(Agent):") is False
+        result = analyze_source(team_content, "file")
+        assert result["type"] == "team"
+        assert result["name"] == "Review"
+        assert result["brain_count"] == 3
+        # A comment mentioning "(Team)" does not make an agent a team
+        assert analyze_source("# class Fake(Team)\nclass EchoAgent(Agent):\n    pass", "file")["type"] == "agent"
     
-    def test_is_tool(self):
-        """Test tool detection."""
-        tool_content = "@tool\ndef test_tool():"
-        assert self.agent._is_tool(tool_content) is True
-        assert self.agent._is_tool("def regular_function():") is False
+    def test_tool_detection(self):
+        """Test tool detection by decorator or base class."""
+        assert analyze_source("@tool\ndef test_tool():\n    pass", "file")["type"] == "tool"
+        assert analyze_source("class UpperTool(Tool):\n    pass", "file")["type"] == "tool"
+        assert analyze_source("def regular_function():\n    return 1", "file")["type"] == "tool"
+        # "@tool" inside a string is not a decorator
+        agent_content = '''
+class PromptAgent(Agent):
+    def run(self, input_data):
+        return "Use @tool to declare tools" if input_data else None
+'''
+        result = analyze_source(agent_content, "file")
+        assert result["type"] == "agent"
+        assert result["decision_points"] == 1
     
     def test_extract_name(self):
         """Test name extraction."""
-        agent_content = "class MyAgent(Agent):"
-        assert self.agent._extract_name("file", agent_content, "agent") == "My"
+        assert analyze_source("class MyAgent(Agent):\n    pass", "file")["name"] == "My"
+        assert analyze_source("@tool\ndef my_tool():\n    pass", "file")["name"] == "my_tool"
+        assert analyze_source("x = 1", "file")["name"] == "file"
+    
+    def test_brain_count_and_decision_points(self):
+        """Test that brains and decision points are counted, not assumed."""
+        content = '''
+class RouterAgent(Agent):
+    def run(self, data):
+        for item in data:
+            if item and item.get("ok"):
+                continue
+        return [x for x in data if x]
         
-        tool_content = "@tool\ndef my_tool():"
-        assert self.agent._extract_name("file", tool_content, "tool") == "my_tool"
+class SpecialRouterAgent(RouterAgent):
+    pass
+'''
+        result = analyze_source(content, "file")
+        assert result["brain_count"] == 2
+        assert result["decision_points"] == 5
+        assert analyze_source("def pick(x):\n    while x:\n        x -= 1", "file")["brain_count"] == 1
+        assert analyze_source("def broken(:", "file") is None
+    
+    def test_unchanged_file_is_not_reread_or_reparsed(self, tmp_path):
+        """Test that results are cached by file state and by content hash."""
+        source = tmp_path / "weather_agent.py"
+        source.write_text("class WeatherAgent(Agent):\n    pass\n")
+        copy = tmp_path / "copy_agent.py"
+        copy.write_text(source.read_text())
+        
+        with patch("tdev.agents.classifier_agent.analyze_source", wraps=analyze_source) as analyze, \
+                patch.object(ClassifierAgent, "_read", wraps=self.agent._read) as read:
+            first = self.agent.run(str(source))
+            second = self.agent.run(str(source))
+            third = self.agent.run(str(copy))
+        
+        assert first == second == third
+        assert first["name"] == "Weather"
+        assert read.call_count == 2
+        assert analyze.call_count == 1
+        
+        # A changed file is read and analyzed again
+        source.write_text("class WeatherTeam(Team):\n    pass\n")
+        assert self.agent.run(str(source))["type"] == "team"
+    
+    def test_aliased_bases_and_decorators(self):
+        """Test that components are recognized through import aliases."""
+        team = "from tdev.core.team import Team as CoreTeam\n\nclass SupportTeam(CoreTeam):\n    pass"
+        assert analyze_source(team, "file")["type"] == "team"
+        tool = "from strands import tool as strands_tool\n\n@strands_tool\ndef lookup():\n    pass"
+        assert analyze_source(tool, "file")["name"] == "lookup"
+        
+        with patch("tdev.agents.auto_agent_composer.get_registry"):
+            template = AutoAgentComposer()._get_agent_template()
+        code = template.format(name="WeatherAgent", goal="report the weather", code_suggestion="Generated")
+        result = analyze_source(code, "weather_agent")
+        assert result["type"] == "agent"
+        assert result["name"] == "Weather"
+        assert result["brain_count"] == 1
     
     def test_default_classification(self):
         """Test default classification."""
@@ -15,7 +15,7 @@ class TestAgentDeployer:
             self.deployer = AgentDeployer()
     
     @patch('tdev.agent_core.deployer.boto3')
-    @patch('tdev.agent_core.deployer.BedrockClient')
+    @patch('tdev.agent_core.deployer.get_bedrock_client')
     def test_init(self, mock_bedrock_client, mock_boto3):
         """Test deployer initialization."""
         deployer = AgentDeployer()
@@ -23,7 +23,7 @@ class TestAgentDeployer:
     
     @patch('tdev.agent_core.deployer.get_registry')
     @patch('tdev.agent_core.deployer.boto3')
-    @patch('tdev.agent_core.deployer.BedrockClient')
+    @patch('tdev.agent_core.deployer.get_bedrock_client')
     def test_deploy_agent(self, mock_bedrock_client, mock_boto3, mock_get_registry):
         """Test agent deployment."""
         # Mock registry
@@ -61,7 +61,7 @@ class TestAgentDeployer:
         assert result["success"] is True
         assert "lambda_arn" in result
     
-    @patch('tdev.agent_core.deployer.BedrockClient')
+    @patch('tdev.agent_core.deployer.get_bedrock_client')
     def test_generate_handler(self, mock_bedrock_client):
         """Test handler generation."""
         deployer = AgentDeployer()
@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 
 from tdev.agents.dev_coordinator_agent import DevCoordinatorAgent
+from tdev.agents.planner_agent import PlannerAgent
 
 
 @pytest.fixture
@@ -68,4 +69,164 @@ def test_dev_coordinator_run(mock_get_registry, mock_registry):
     # Check the result matches actual behavior
     assert result["success"] is True
     assert "result" in result
-    assert result["result"]["type"] == "agent"  # Match actual return
\ No newline at end of file
+    assert result["result"]["type"] == "agent"  # Match actual return
+
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_dev_coordinator_run_stream(mock_get_registry, mock_registry):
+    """Test that run_stream forwards agent events and ends with the run() result."""
+    mock_get_registry.return_value = mock_registry
+    planner = mock_registry.get_instance("PlannerAgent")
+    planner.run_stream.return_value = iter([
+        {"type": "step", "index": 0, "step": {"agent": "EchoAgent"}},
+        {"type": "result", "result": {"workflow": {"id": "test-workflow", "steps": [{"agent": "EchoAgent"}]}}}
+    ])
+    evaluator = mock_registry.get_instance("EvaluatorAgent")
+    evaluator.run_stream.return_value = iter([{"type": "result", "result": {"score": 90, "suggestions": []}}])
+    
+    coordinator = DevCoordinatorAgent()
+    events = list(coordinator.run_stream({"goal": "Echo the input"}))
+    
+    assert [event["type"] for event in events] == ["stage", "step", "stage", "stage", "result"]
+    assert [event["stage"] for event in events if event["type"] == "stage"] == ["planning", "evaluation", "execution"]
+    assert events[1]["step"] == {"agent": "EchoAgent"} and "agent" in events[1]
+    assert events[-1]["result"]["workflow_id"] == "test-workflow"
+    assert events[-1]["result"]["evaluation"] == {"score": 90, "suggestions": []}
+
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_enhance_capability_specs_in_one_batch(mock_get_registry, mock_registry):
+    """Test that capability specs are enhanced concurrently and merged in order."""
+    mock_get_registry.return_value = mock_registry
+    coordinator = DevCoordinatorAgent()
+    coordinator.bedrock_client = MagicMock()
+    coordinator.bedrock_client.invoke_model.side_effect = lambda model_id, prompt, **kwargs: (
+        '{"description": "Fetches weather", "tools": ["requests"]}' if "WeatherAgent" in prompt
+        else "not json"
+    )
+    specs = [
+        {"name": "WeatherAgent", "description": ""},
+        {"name": "TranslatorAgent", "description": "Translates text"},
+    ]
+    
+    enhanced = coordinator.enhance_capability_specs(specs, "Report the weather in French")
+    
+    assert coordinator.bedrock_client.invoke_model.call_count == 2
+    assert enhanced[0] == {"name": "WeatherAgent", "description": "Fetches weather", "tools": ["requests"]}
+    assert enhanced[1] == {"name": "TranslatorAgent", "description": "Translates text"}
+
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_goal_request_selects_best_candidate(mock_get_registry, mock_registry):
+    """Test that with several candidates the best-scoring workflow is executed without re-evaluation."""
+    mock_get_registry.return_value = mock_registry
+    planner = mock_registry.get_instance("PlannerAgent")
+    planner.plan_candidates.return_value = [
+        {"workflow": {"id": "model-plan", "steps": [{"agent": "EchoAgent"}]}, "missing_capabilities": []},
+        {"workflow": {"id": "rule-plan", "steps": [{"agent": "EchoAgent"}]}, "missing_capabilities": []},
+    ]
+    evaluator = mock_registry.get_instance("EvaluatorAgent")
+    evaluator.run.side_effect = lambda workflow: {"score": 60 if workflow["id"] == "model-plan" else 85}
+    executor = mock_registry.get_instance("WorkflowExecutorAgent")
+    
+    coordinator = DevCoordinatorAgent()
+    events = list(coordinator.run_stream({"goal": "Echo the input", "options": {"candidates": 2}}))
+    
+    planner.plan_candidates.assert_called_once_with("Echo the input", 2)
+    planner.run.assert_not_called()
+    assert evaluator.run.call_count == 2
+    assert {"type": "candidates", "scores": [60, 85], "selected": 1} in events
+    assert executor.run.call_args[0][0]["workflow"]["id"] == "rule-plan"
+    assert events[-1]["result"]["evaluation"] == {"score": 85}
+
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_plan_needing_improvement_is_replaced(mock_get_registry, mock_registry):
+    """Test that a single plan the evaluator flags is replaced by a better candidate."""
+    mock_get_registry.return_value = mock_registry
+    planner = mock_registry.get_instance("PlannerAgent")
+    planner.run.return_value = {"workflow": {"id": "weak-plan", "steps": [{"agent": "EchoAgent"}]}, "missing_capabilities": []}
+    planner.plan_candidates.return_value = [
+        {"workflow": {"id": "weak-plan", "steps": [{"agent": "EchoAgent"}]}, "missing_capabilities": []},
+        {"workflow": {"id": "strong-plan", "steps": [{"agent": "EchoAgent"}]}, "missing_capabilities": []},
+    ]
+    evaluator = mock_registry.get_instance("EvaluatorAgent")
+    evaluator.run.side_effect = lambda workflow: (
+        {"score": 50, "needs_improvement": True} if workflow["id"] == "weak-plan" else {"score": 90, "needs_improvement": False}
+    )
+    executor = mock_registry.get_instance("WorkflowExecutorAgent")
+    
+    coordinator = DevCoordinatorAgent()
+    result = coordinator.run({"goal": "Echo the input"})
+    
+    planner.plan_candidates.assert_called_once()
+    assert executor.run.call_args[0][0]["workflow"]["id"] == "strong-plan"
+    assert result["evaluation"]["score"] == 90
+
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_generated_capabilities_repair_the_plan(mock_get_registry, mock_registry):
+    """Test that after generating a missing agent the plan is repaired instead of replanned."""
+    mock_get_registry.return_value = mock_registry
+    planner = mock_registry.get_instance("PlannerAgent")
+    planner.run.return_value = {
+        "workflow": {"id": "plan", "steps": [{"agent": "WeatherAgent"}]},
+        "missing_capabilities": [{"type": "agent", "name": "WeatherAgent", "description": "Reports weather"}],
+    }
+    planner.repair.return_value = {"workflow": {"id": "plan", "steps": [{"agent": "Weather"}]}, "missing_capabilities": []}
+    
+    coordinator = DevCoordinatorAgent()
+    with patch.object(coordinator, "handle_missing_capability",
+                      return_value={"success": True, "metadata": {"name": "Weather"}}):
+        result = coordinator.run({"goal": "Report the weather"})
+    
+    assert planner.run.call_count == 1
+    planner.repair.assert_called_once_with("Report the weather", planner.run.return_value, {"WeatherAgent": "Weather"})
+    assert result["success"] is True
+
+@patch('tdev.agents.planner_agent.get_registry')
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_incomplete_repair_is_replanned(mock_get_registry, mock_planner_registry, mock_registry):
+    """Test that a repair leaving a capability missing is not reused by the replan."""
+    agents = [{"name": "EchoAgent", "type": "agent"}]
+    mock_registry.get_by_type.side_effect = lambda kind: list(agents) if kind == "agent" else []
+    mock_get_registry.return_value = mock_registry
+    mock_planner_registry.return_value = mock_registry
+    planner = PlannerAgent()
+    planner.bedrock_client = MagicMock()
+    instances = mock_registry.get_instance.side_effect
+    mock_registry.get_instance.side_effect = lambda name: planner if name == "PlannerAgent" else instances(name)
+    executor = mock_registry.get_instance("WorkflowExecutorAgent")
+    
+    def generate(capability):
+        # Only the weather agent makes it into the registry
+        if capability["name"] == "WeatherAgent":
+            agents.append({"name": "Weather", "type": "agent"})
+        return {"success": True, "metadata": {"name": capability["name"].replace("Agent", "")}}
+    
+    coordinator = DevCoordinatorAgent()
+    coordinator.bedrock_client = None
+    with patch.object(planner, "_plan_with_bedrock", side_effect=[
+        [{"agent": "WeatherAgent"}, {"agent": "TranslatorAgent"}],
+        [{"agent": "Weather"}, {"agent": "EchoAgent"}],
+    ]) as plan, patch.object(coordinator, "handle_missing_capability", side_effect=generate):
+        result = coordinator.run({"goal": "Weather in French"})
+    
+    assert plan.call_count == 2
+    assert executor.run.call_args[0][0]["workflow"]["steps"] == [{"agent": "Weather"}, {"agent": "EchoAgent"}]
+    assert result["success"] is True
+
+@patch('tdev.agents.dev_coordinator_agent.get_registry')
+def test_goal_request_rejects_plan_over_budget(mock_get_registry, mock_registry):
+    """Test that a workflow estimated to exceed the request's budget is not executed."""
+    mock_get_registry.return_value = mock_registry
+    mock_registry.get_instance("PlannerAgent").run.return_value = {
+        "workflow": {"id": "slow-plan", "steps": [{"agent": "EchoAgent"}]}, "missing_capabilities": []
+    }
+    evaluator = mock_registry.get_instance("EvaluatorAgent")
+    evaluator.run.return_value = {"score": 90, "estimate": {"latency_ms": 45000.0, "cost": 0.002}}
+    executor = mock_registry.get_instance("WorkflowExecutorAgent")
+    
+    coordinator = DevCoordinatorAgent()
+    rejected = coordinator.run({"goal": "Echo the input", "options": {"max_latency_ms": 10000}})
+    within = coordinator.run({"goal": "Echo the input", "options": {"max_latency_ms": 60000, "max_cost": 0.01}})
+    
+    assert rejected["success"] is False
+    assert rejected["error"] == "Workflow is estimated to take 45000 ms, over the 10000 ms budget"
+    assert within["success"] is True
+    assert executor.run.call_count == 1
@@ -0,0 +1,75 @@
+"""
+Tests for the EvaluatorAgent rule-based scoring.
+"""
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from tdev.agents.evaluator_agent import EvaluatorAgent
+
+REGISTERED = {
+    "EchoAgent": {"name": "EchoAgent", "type": "agent"},
+    "SummarizerAgent": {"name": "SummarizerAgent", "type": "agent"},
+    "EchoTool": {"name": "EchoTool", "type": "tool"},
+}
+
+WORKFLOWS = [
+    {"steps": []},
+    {"description": "Echo", "steps": [{"agent": "EchoAgent", "description": "echo", "on_error": "skip"}]},
+    {"description": "Summarize", "steps": [
+        {"agent": "EchoAgent", "input": {"data": "hi"}},
+        {"agent": "SummarizerAgent"},
+        {"agent": "SummarizerAgent"},
+    ]},
+    {"steps": [{"agent": "MissingAgent"}, {"agent": "EchoTool", "input": {}}] * 6},
+    {"description": "Route", "steps": [
+        {"switch": "${input.kind}", "cases": {"a": [{"agent": "GhostAgent"}]}},
+        {"input": {}},
+    ]},
+]
+
+TEST_RESULTS = [None, {"passed": True}, {"passed": False, "failures": ["a", "b", "c", "d"]}, None, {}]
+
+def make_registry():
+    """Build a registry mock with a fixed set of components."""
+    registry = MagicMock()
+    registry.get_all.return_value = REGISTERED
+    return registry
+
+def make_evaluator():
+    """Build an evaluator without a Bedrock client."""
+    evaluator = EvaluatorAgent()
+    evaluator.bedrock_client = None
+    return evaluator
+
+def test_evaluate_many_matches_single_evaluations():
+    """Test that batch results equal one-by-one rule-based evaluations."""
+    evaluator = make_evaluator()
+    registry = make_registry()
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=registry):
+        batch = evaluator.evaluate_many(WORKFLOWS, TEST_RESULTS)
+        assert registry.get_all.call_count == 1
+        single = [evaluator._evaluate_workflow(workflow, tests) for workflow, tests in zip(WORKFLOWS, TEST_RESULTS)]
+    
+    assert batch == single
+    assert batch[0]["score"] == 51 and "Workflow has no steps defined." in batch[0]["suggestions"]
+    assert batch[1]["metrics"]["clarity"] == 1.0 and batch[1]["metrics"]["error_resilience"] == 0.55
+    assert "Test failure: c" in batch[2]["suggestions"] and "Test failure: d" not in batch[2]["suggestions"]
+    assert batch[3]["metrics"]["agent_suitability"] == 0.0 and batch[3]["estimate"]["latency_ms"] == 12000
+    assert "Agent 'GhostAgent' in a switch branch is not available in the registry." in batch[4]["suggestions"]
+
+def test_evaluate_many_loads_files(tmp_path):
+    """Test that workflow files are loaded and unreadable ones reported in place."""
+    path = tmp_path / "echo.json"
+    path.write_text(json.dumps({"id": "wf-echo", "description": "Echo", "steps": [{"agent": "EchoAgent"}]}))
+    evaluator = make_evaluator()
+    with patch('tdev.agents.evaluator_agent.get_registry', return_value=make_registry()):
+        results = evaluator.evaluate_many([str(path), str(tmp_path / "missing.json"), WORKFLOWS[1]])
+    
+    assert results[0]["metrics"]["agent_suitability"] == 1.0
+    assert results[1] == {"score": 0, "error": f"Could not load workflow: {tmp_path / 'missing.json'}"}
+    assert results[2]["score"] == 71
+    assert evaluator.evaluate_many([]) == []
+    with pytest.raises(ValueError):
+        evaluator.evaluate_many(WORKFLOWS, TEST_RESULTS[:2])
@@ -0,0 +1,79 @@
+"""
+Tests for workflow guard expressions.
+"""
+import pytest
+
+from tdev.core.expressions import compile_expression, evaluate, ExpressionError
+
+class TestExpressions:
+    """Tests for the expression compiler."""
+    
+    def setup_method(self):
+        """Set up a sample workflow context."""
+        self.context = {
+            "classification": {"type": "tool", "brain_count": 0},
+            "evaluation": {"score": 82, "suggestions": ["Add descriptions"]},
+            "items": [1, 2, 3],
+        }
+    
+    def test_field_access_and_comparison(self):
+        """Test dotted field access and comparisons."""
+        assert evaluate("classification.type == 'tool'", self.context) is True
+        assert evaluate("classification.type != 'tool'", self.context) is False
+        assert evaluate("60 < evaluation.score <= 90", self.context) is True
+        assert evaluate("items[-1]", self.context) == 3
+    
+    def test_boolean_logic_and_functions(self):
+        """Test boolean operators, membership and whitelisted functions."""
+        assert evaluate("len(evaluation.suggestions) > 0 and not classification.brain_count", self.context)
+        assert evaluate("'Add descriptions' in evaluation.suggestions", self.context)
+        assert evaluate("lower('ABC') == 'abc'", self.context)
+    
+    def test_missing_values_are_none(self):
+        """Test that missing keys evaluate to None instead of raising."""
+        assert evaluate("missing.key", self.context) is None
+        assert evaluate("classification.missing > 3", self.context) is False
+        assert evaluate("items[10]", self.context) is None
+    
+    def test_literals_pass_through(self):
+        """Test that non-string guards are returned unchanged."""
+        assert evaluate(True, self.context) is True
+        assert evaluate(0, self.context) == 0
+    
+    def test_compiled_expressions_are_cached(self):
+        """Test that the same source compiles to the same callable."""
+        assert compile_expression("a == 1") is compile_expression("a == 1")
+    
+    @pytest.mark.parametrize("source", [
+        "__import__('os')",
+        "classification.__class__",
+        "open('file')",
+        "[x for x in items]",
+        "lambda: 1",
+        "a ==",
+    ])
+    def test_unsafe_or_invalid_syntax_rejected(self, source):
+        """Test that unsupported syntax raises ExpressionError."""
+        with pytest.raises(ExpressionError):
+            compile_expression(source)
+    
+    def test_private_attributes_rejected_through_subscripts(self):
+        """Test that subscripts cannot reach private attributes of objects."""
+        class Probe:
+            def run(self):
+                return "ran"
+        context = {"agent": Probe(), "data": {"_key": 1}}
+        with pytest.raises(ExpressionError):
+            evaluate("agent['run']['__globals__']", context)
+        with pytest.raises(ExpressionError):
+            evaluate("agent['__class__']", context)
+        assert evaluate("data['_key']", context) == 1
+    
+    def test_repetition_is_bounded(self):
+        """Test that repeating a sequence cannot exhaust memory."""
+        assert evaluate("'ab' * 3", self.context) == "ababab"
+        assert evaluate("3 * items", self.context) == [1, 2, 3] * 3
+        with pytest.raises(ExpressionError):
+            evaluate("'x' * 1000000000", self.context)
+        with pytest.raises(ExpressionError):
+            evaluate("1000000000 * items", self.context)
@@ -0,0 +1,48 @@
+"""
+Tests for incremental JSON array parsing.
+"""
+import json
+
+import pytest
+
+from tdev.core.json_stream import JsonArrayStream
+
+class TestJsonArrayStream:
+    """Tests for JsonArrayStream."""
+    
+    def test_elements_are_returned_as_they_complete(self):
+        """Test that each element is parsed once its closing bracket arrives."""
+        parser = JsonArrayStream()
+        
+        assert parser.feed('Here is the plan: [{"agent": "A"') == []
+        assert parser.feed('}, {"agent": "B", "input": {"data": 1}}') == [{"agent": "A"}, {"agent": "B", "input": {"data": 1}}]
+        assert not parser.done
+        assert parser.feed(']') == []
+        assert parser.done
+    
+    def test_brackets_inside_strings_are_ignored(self):
+        """Test that brackets and escaped quotes in strings do not end an element."""
+        parser = JsonArrayStream()
+        text = '[{"note": "a ] and } and \\" quote"}, "plain", 3]'
+        
+        items = []
+        for i in range(0, len(text), 4):
+            items.extend(parser.feed(text[i:i + 4]))
+        
+        assert items == [{"note": 'a ] and } and " quote'}, "plain", 3]
+        assert parser.done
+    
+    def test_text_after_the_array_is_ignored(self):
+        """Test that trailing prose does not affect the parsed elements."""
+        parser = JsonArrayStream()
+        parser.feed('[1, 2] and then [3]')
+        
+        assert parser.items == [1, 2]
+        assert parser.feed(', 4]') == []
+    
+    def test_invalid_element_raises(self):
+        """Test that an element that is not valid JSON raises an error."""
+        parser = JsonArrayStream()
+        
+        with pytest.raises(json.JSONDecodeError):
+            parser.feed("[{'agent': 'A'}]")
@@ -57,4 +57,75 @@ class TestPlannerAgent:
         workflow_id = self.agent._generate_id("test goal")
         
         assert isinstance(workflow_id, str)
-        assert len(workflow_id) > 0
\ No newline at end of file
+        assert len(workflow_id) > 0
+    
+    def test_run_stream_emits_steps_incrementally(self):
+        """Test that streamed planning reports each step as soon as it is complete."""
+        chunks = ['Plan: [{"agent": "Echo', 'Agent"}, {"agent"', ': "TestAgent"}]']
+        self.agent.bedrock_client = MagicMock()
+        self.agent.bedrock_client.invoke_model_stream.return_value = iter(chunks)
+        
+        with patch('tdev.agents.planner_agent.get_registry', return_value=self.mock_registry):
+            events = list(self.agent.run_stream("Echo the input"))
+        
+        types = [event["type"] for event in events]
+        assert types == ["token", "token", "step", "token", "step", "result"]
+        assert events[2]["step"] == {"agent": "EchoAgent"}
+        assert events[-1]["result"]["workflow"]["steps"] == [{"agent": "EchoAgent"}, {"agent": "TestAgent"}]
+    
+    def test_run_stream_falls_back_on_unusable_output(self):
+        """Test that streamed planning falls back to rule-based planning."""
+        self.agent.bedrock_client = MagicMock()
+        self.agent.bedrock_client.invoke_model_stream.return_value = iter(["I cannot help with that."])
+        
+        with patch('tdev.agents.planner_agent.get_registry', return_value=self.mock_registry):
+            events = list(self.agent.run_stream("Echo the input"))
+        
+        assert events[-1]["result"]["workflow"]["steps"] == [{"agent": "EchoAgent"}]
+    
+    def test_plan_candidates_at_spread_temperatures(self):
+        """Test that candidates are sampled concurrently, deduplicated, and include the rule-based plan."""
+        plans = {0.2: '[{"agent": "TestAgent"}]', 0.6: '[{"agent": "TestAgent"}]', 1.0: '[{"agent": "EchoAgent"}, {"agent": "TestAgent"}]'}
+        self.agent.bedrock_client = MagicMock()
+        self.agent.bedrock_client.invoke_model.side_effect = lambda model_id, prompt, parameters, **kwargs: (
+            plans[parameters["temperature"]]
+        )
+        
+        with patch('tdev.agents.planner_agent.get_registry', return_value=self.mock_registry):
+            candidates = self.agent.plan_candidates("Echo the input", count=4)
+        
+        temperatures = sorted(call.kwargs["parameters"]["temperature"]
+                              for call in self.agent.bedrock_client.invoke_model.call_args_list)
+        assert temperatures == [0.2, 0.6, 1.0]
+        assert [candidate["workflow"]["steps"] for candidate in candidates] == [
+            [{"agent": "TestAgent"}],
+            [{"agent": "EchoAgent"}, {"agent": "TestAgent"}],
+            [{"agent": "EchoAgent"}],
+        ]
+    
+    def test_repair_patches_only_missing_steps(self):
+        """Test that repair re-points missing steps without calling the model."""
+        earlier = {
+            "workflow": {"steps": [{"agent": "EchoAgent"}, {"agent": "WeatherAgent", "input": {"data": "${0.result}"}},
+                                   {"agent": "TranslatorAgent"}]},
+            "missing_capabilities": [
+                {"type": "agent", "name": "WeatherAgent", "description": "Reports the weather forecast"},
+                {"type": "agent", "name": "TranslatorAgent", "description": "Translates text"},
+            ],
+        }
+        self.mock_registry.get_by_type.side_effect = lambda kind: [
+            {"name": "EchoAgent", "type": "agent"},
+            {"name": "ForecastAgent", "type": "agent", "description": "Weather forecast reports"},
+            {"name": "LanguageAgent", "type": "agent"},
+        ] if kind == "agent" else []
+        self.agent.bedrock_client = MagicMock()
+        
+        with patch('tdev.agents.planner_agent.get_registry', return_value=self.mock_registry):
+            repaired = self.agent.repair("Weather in French", earlier, {"TranslatorAgent": "LanguageAgent"})
+        
+        self.agent.bedrock_client.invoke_model.assert_not_called()
+        assert repaired["workflow"]["steps"] == [
+            {"agent": "EchoAgent"}, {"agent": "ForecastAgent", "input": {"data": "${0.result}"}}, {"agent": "LanguageAgent"}
+        ]
+        assert repaired["missing_capabilities"] == []
+        assert earlier["workflow"]["steps"][1]["agent"] == "WeatherAgent"
@@ -0,0 +1,71 @@
+"""
+Tests for prompt token budgeting and compaction.
+"""
+import json
+
+from tdev.core.prompt_budget import (
+    estimate_tokens, truncate_to_tokens, compact_json, rank_by_relevance,
+    format_names, compact_capabilities, TRUNCATION_MARKER
+)
+from tdev.agents.planner_agent import PlannerAgent
+from tdev.agents.evaluator_agent import EvaluatorAgent
+
+def test_estimate_tokens():
+    """Test the token estimate for words, numbers and punctuation."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("plan") == 1
+    assert estimate_tokens("summarize") == 3
+    assert estimate_tokens('{"a": 12345}') == 8
+
+def test_truncate_to_tokens():
+    """Test that truncated text fits the budget and is marked."""
+    text = "word " * 200
+    truncated = truncate_to_tokens(text, 50)
+    assert truncated.endswith(TRUNCATION_MARKER)
+    assert estimate_tokens(truncated) <= 50
+    assert truncate_to_tokens("short text", 50) == "short text"
+
+def test_compact_json():
+    """Test minified JSON with long strings shortened."""
+    value = {"steps": [{"agent": "EchoAgent"}], "description": "x" * 500}
+    text = compact_json(value, max_string_chars=10)
+    assert " " not in text
+    assert json.loads(text)["description"] == "x" * 10 + "..."
+
+def test_rank_by_relevance():
+    """Test that components matching the goal come first, ties keeping their order."""
+    components = [
+        {"name": "EchoAgent", "description": "Echoes input"},
+        {"name": "WeatherAgent", "description": "Reports the weather"},
+        {"name": "SummarizerAgent", "description": "Summarizes documents"},
+        {"name": "TranslatorAgent", "description": "Translates documents"},
+    ]
+    ranked = [c["name"] for c in rank_by_relevance(components, "Summarize this document")]
+    assert ranked == ["SummarizerAgent", "TranslatorAgent", "EchoAgent", "WeatherAgent"]
+
+def test_format_names_within_budget():
+    """Test that names beyond the budget are counted rather than listed."""
+    names = [f"Agent{i}" for i in range(100)]
+    text = format_names(names, max_tokens=20)
+    assert text.endswith("more)")
+    assert estimate_tokens(text.split(" (and")[0]) <= 20
+    assert format_names(names, max_tokens=1000, max_items=3) == "Agent0, Agent1, Agent2 (and 97 more)"
+
+def test_planner_prompt_is_bounded():
+    """Test that the planner prompt stays small however large the registry is."""
+    agents = [{"name": f"Filler{i}Agent", "description": "Does something unrelated"} for i in range(1000)]
+    agents.append({"name": "SummarizerAgent", "description": "Summarizes documents"})
+    
+    prompt = PlannerAgent()._build_plan_prompt("Summarize a document", agents, [])
+    agent_line = prompt.split("Available agents:\n")[1].splitlines()[0]
+    
+    assert agent_line.startswith("SummarizerAgent, ")
+    assert estimate_tokens(prompt) < 1000
+    assert compact_capabilities(agents, "Summarize a document", 1, 100) == "SummarizerAgent (and 1000 more)"
+
+def test_evaluator_prompt_uses_minified_json():
+    """Test that the evaluator inlines the workflow as minified JSON."""
+    workflow = {"id": "flow", "steps": [{"agent": "EchoAgent", "input_from": "input"}]}
+    prompt = EvaluatorAgent()._build_evaluation_prompt(workflow)
+    assert compact_json(workflow) in prompt
+    assert json.dumps(workflow, indent=2) not in prompt
@@ -101,4 +101,14 @@ class TestRegistry:
         tools = self.registry.list_components("tool")
         assert len(tools) == 1
         assert "TestTool" in tools
-        assert "TestAgent" not in tools
\ No newline at end of file
+        assert "TestAgent" not in tools
+    
+    def test_generation_changes_on_update(self):
+        """Test that registering or updating a component bumps the generation."""
+        generation = self.registry.generation
+        
+        self.registry.register("TestAgent", {"type": "agent", "class": "test.TestAgent"})
+        assert self.registry.generation == generation + 1
+        
+        self.registry.update("TestAgent", {"type": "agent", "class": "test.OtherAgent"})
+        assert self.registry.generation == generation + 2
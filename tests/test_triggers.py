@@ -0,0 +1,63 @@
+"""
+Tests for trigger keyword matching.
+"""
+import time
+
+from tdev.core.triggers import TriggerMatcher
+from tdev.core.schema import AgentMeta
+from tdev.agents.planner_agent import PlannerAgent
+
+def test_match_in_goal_order():
+    """Test whole-word, case-insensitive matches reported in order of appearance."""
+    matcher = TriggerMatcher({
+        "EchoAgent": ["echo", "repeat"],
+        "AgentTesterAgent": ["test", "verify"],
+        "MailerAgent": ["send email", "email"],
+    })
+    
+    assert matcher.match("Verify it, then ECHO the result") == ["AgentTesterAgent", "EchoAgent"]
+    assert matcher.match("Send email to the team") == ["MailerAgent"]
+    assert matcher.match("testing echoes") == []
+    assert not TriggerMatcher({})
+
+def test_from_components_prefers_declared_triggers():
+    """Test that registry triggers override the defaults for the same component."""
+    components = [
+        AgentMeta(name="EchoAgent", triggers=["parrot"]).to_dict(),
+        AgentMeta(name="WeatherAgent", triggers=["forecast"]).to_dict(),
+        AgentMeta(name="SilentAgent").to_dict(),
+    ]
+    matcher = TriggerMatcher.from_components(components, {"EchoAgent": ["echo"], "ClassifierAgent": ["classify"]})
+    
+    assert matcher.match("parrot the forecast") == ["EchoAgent", "WeatherAgent"]
+    assert matcher.match("echo") == []
+    assert matcher.match("classify") == ["ClassifierAgent"]
+
+def test_schema_round_trips_triggers():
+    """Test that triggers are stored in registry metadata."""
+    metadata = AgentMeta(name="WeatherAgent", triggers=["forecast"]).to_dict()
+    assert metadata["triggers"] == ["forecast"]
+    assert AgentMeta.from_dict(metadata).triggers == ["forecast"]
+    assert AgentMeta.from_dict({"name": "OldAgent"}).triggers == []
+
+def test_matching_cost_independent_of_trigger_count():
+    """Test that many declared triggers do not slow matching down."""
+    matcher = TriggerMatcher({f"Agent{i}": [f"keyword{i}", f"phrase {i} here"] for i in range(5000)})
+    goal = "please handle keyword4999 and then phrase 7 here " * 20
+    
+    start = time.perf_counter()
+    assert matcher.match(goal) == ["Agent4999", "Agent7"]
+    assert time.perf_counter() - start < 0.05
+
+def test_rule_based_planner_falls_back_to_triggers():
+    """Test that trigger keywords pick agents when the capability index finds none."""
+    agents = [
+        AgentMeta(name="NotifierAgent", description="Delivers messages.", triggers=["ping"]).to_dict(),
+        AgentMeta(name="ArchiverAgent", description="Stores records.").to_dict(),
+    ]
+    planner = PlannerAgent()
+    
+    assert planner._analyze_goal("ping", agents, []) == [{"agent": "NotifierAgent"}]
+    # Core agents missing from an older registry are still triggered by their default keywords
+    steps = planner._analyze_goal("verify and score the output", agents, [])
+    assert [step["agent"] for step in steps] == ["AgentTesterAgent", "EvaluatorAgent"]
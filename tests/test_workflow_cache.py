@@ -0,0 +1,87 @@
+"""
+Tests for workflow loading, caching, and precompiled sidecars.
+"""
+import os
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from tdev.core import workflow as workflow_module
+from tdev.core.workflow import (
+    Workflow, load_workflow, save_workflow, get_sidecar_path, clear_workflow_cache
+)
+
+class TestWorkflowCache:
+    """Tests for the process-wide workflow cache."""
+    
+    def setup_method(self):
+        """Set up a temporary workflows directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.workflows_dir = Path(self.temp_dir.name)
+        self.workflow = Workflow(
+            id="cached-flow",
+            steps=[{"agent": "EchoAgent"}],
+            outputs={"result": "output"}
+        )
+        clear_workflow_cache()
+    
+    def teardown_method(self):
+        """Clean up the temporary directory."""
+        clear_workflow_cache()
+        self.temp_dir.cleanup()
+    
+    def test_repeated_load_is_served_from_cache(self):
+        """Test that an unchanged file is parsed only once."""
+        path = self.workflows_dir / "cached-flow.json"
+        save_workflow(self.workflow, path, write_sidecar=False)
+        
+        first = load_workflow(path)
+        with patch.object(workflow_module.json, "load") as mock_load:
+            second = load_workflow(path)
+        
+        mock_load.assert_not_called()
+        assert second is first
+        assert second.steps == [{"agent": "EchoAgent"}]
+    
+    def test_modified_file_is_reloaded(self):
+        """Test that a changed mtime/size invalidates the cached entry."""
+        path = self.workflows_dir / "cached-flow.json"
+        save_workflow(self.workflow, path, write_sidecar=False)
+        load_workflow(path)
+        
+        data = self.workflow.to_dict()
+        data["steps"].append({"agent": "EvaluatorAgent"})
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        reloaded = load_workflow(path)
+        assert [step["agent"] for step in reloaded.steps] == ["EchoAgent", "EvaluatorAgent"]
+    
+    def test_sidecar_skips_yaml_parsing(self):
+        """Test that a matching sidecar is used instead of the YAML parser."""
+        path = self.workflows_dir / "cached-flow.yaml"
+        save_workflow(self.workflow, path)
+        assert get_sidecar_path(path).exists()
+        
+        with patch.object(workflow_module.yaml, "safe_load") as mock_safe_load:
+            loaded = load_workflow(path)
+        
+        mock_safe_load.assert_not_called()
+        assert loaded.id == "cached-flow"
+    
+    def test_stale_sidecar_is_ignored(self):
+        """Test that a sidecar from an older revision of the file is not used."""
+        path = self.workflows_dir / "cached-flow.json"
+        save_workflow(self.workflow, path)
+        
+        with open(path, 'w') as f:
+            json.dump({"id": "edited-by-hand", "steps": []}, f)
+        
+        assert load_workflow(path).id == "edited-by-hand"
+    
+    def test_missing_file_returns_none(self):
+        """Test loading a workflow that does not exist."""
+        assert load_workflow(self.workflows_dir / "missing.json") is None
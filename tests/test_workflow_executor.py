@@ -86,4 +86,245 @@ class TestWorkflowExecutor:
         assert self.mock_agent.called
         
         # Check the result
-        assert "mock output" in result.values()
\ No newline at end of file
+        assert "mock output" in result.values()
+
+class RecordingAgent:
+    """An agent that records its calls and returns a fixed value."""
+    
+    def __init__(self, return_value):
+        """Initialize the recording agent."""
+        self.return_value = return_value
+        self.calls = 0
+    
+    def run(self, input_data):
+        """Run the agent."""
+        self.calls += 1
+        return self.return_value
+
+
+class TestWorkflowBranching:
+    """Tests for guarded, switch and exit steps."""
+    
+    def setup_method(self):
+        """Set up agents for a classify-then-evaluate workflow."""
+        self.classifier = RecordingAgent({"type": "tool"})
+        self.evaluator = RecordingAgent({"score": 90})
+        self.tool_tester = RecordingAgent("tool tested")
+        self.agent_tester = RecordingAgent("agent tested")
+        self.registry = MockRegistry({
+            "ClassifierAgent": self.classifier,
+            "EvaluatorAgent": self.evaluator,
+            "ToolTester": self.tool_tester,
+            "AgentTester": self.agent_tester,
+        })
+    
+    def _run(self, monkeypatch, steps):
+        """Run an inline workflow against the mock registry."""
+        monkeypatch.setattr("tdev.agents.workflow_executor_agent.get_registry", lambda: self.registry)
+        workflow = {"id": "branching", "steps": steps}
+        return WorkflowExecutorAgent().run({"workflow": workflow, "input": {"input": "code"}})
+    
+    def test_when_guard_skips_agent(self, monkeypatch):
+        """Test that a false guard skips the agent entirely."""
+        context = self._run(monkeypatch, [
+            {"agent": "ClassifierAgent", "output_to": "classification"},
+            {"agent": "EvaluatorAgent", "when": "classification.type != 'tool'", "output_to": "evaluation"},
+        ])
+        
+        assert self.classifier.calls == 1
+        assert self.evaluator.calls == 0
+        assert "evaluation" not in context
+    
+    def test_switch_selects_branch(self, monkeypatch):
+        """Test that a switch runs only the matching branch."""
+        context = self._run(monkeypatch, [
+            {"agent": "ClassifierAgent", "output_to": "classification"},
+            {
+                "switch": "classification.type",
+                "cases": {
+                    "tool": [{"agent": "ToolTester", "output_to": "tested"}],
+                    "agent": [{"agent": "AgentTester", "output_to": "tested"}],
+                },
+            },
+        ])
+        
+        assert context["tested"] == "tool tested"
+        assert self.agent_tester.calls == 0
+    
+    def test_switch_default_branch(self, monkeypatch):
+        """Test that an unmatched selector falls back to the default branch."""
+        self.classifier.return_value = {"type": "team"}
+        context = self._run(monkeypatch, [
+            {"agent": "ClassifierAgent", "output_to": "classification"},
+            {
+                "switch": "classification.type",
+                "cases": {"tool": [{"agent": "ToolTester", "output_to": "tested"}]},
+                "default": [{"agent": "AgentTester", "output_to": "tested"}],
+            },
+        ])
+        
+        assert context["tested"] == "agent tested"
+    
+    def test_switch_on_boolean(self, monkeypatch):
+        """Test that boolean selectors match the JSON spellings of their case keys."""
+        self.classifier.return_value = {"type": "tool", "valid": False}
+        context = self._run(monkeypatch, [
+            {"agent": "ClassifierAgent", "output_to": "classification"},
+            {
+                "switch": "classification.valid",
+                "cases": {
+                    "true": [{"agent": "ToolTester", "output_to": "tested"}],
+                    "false": [{"agent": "AgentTester", "output_to": "tested"}],
+                },
+            },
+        ])
+        
+        assert context["tested"] == "agent tested"
+        assert self.tool_tester.calls == 0
+    
+    def test_exit_step_ends_run(self, monkeypatch):
+        """Test that a guarded exit step stops the remaining steps."""
+        self._run(monkeypatch, [
+            {"agent": "ClassifierAgent", "output_to": "classification"},
+            {"exit": True, "when": "classification.type == 'tool'"},
+            {"agent": "EvaluatorAgent"},
+        ])
+        
+        assert self.evaluator.calls == 0
+    
+    def test_invalid_guard_is_reported(self, monkeypatch):
+        """Test that an invalid guard skips the step and records an error."""
+        context = self._run(monkeypatch, [
+            {"agent": "EvaluatorAgent", "when": "classification.__class__"},
+        ])
+        
+        assert self.evaluator.calls == 0
+        assert "error_0" in context
+
+
+class CountingRegistry(MockRegistry):
+    """A mock registry that counts instance creation."""
+    
+    def __init__(self, agents=None):
+        """Initialize the counting registry."""
+        super().__init__(agents)
+        self.generation = 0
+        self.instance_requests = 0
+    
+    def get_instance(self, name):
+        """Get an instance of a component, counting the request."""
+        self.instance_requests += 1
+        return super().get_instance(name)
+
+
+class TestSubWorkflows:
+    """Tests for nested workflow steps, plan caching and agent pooling."""
+    
+    def setup_method(self):
+        """Save a child workflow and set up the registry."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.workflows_dir = Path(self.temp_dir.name)
+        self.agent = RecordingAgent("child result")
+        self.registry = CountingRegistry({"ChildAgent": self.agent})
+        
+        child = Workflow(
+            id="child-flow",
+            steps=[{"agent": "ChildAgent", "output_to": "child_output"}],
+            outputs={"result": "child_output"}
+        )
+        save_workflow(child, self.workflows_dir / "child-flow.json")
+    
+    def teardown_method(self):
+        """Clean up the temporary workflows."""
+        self.temp_dir.cleanup()
+    
+    def _patch(self, monkeypatch):
+        """Point the executor at the temporary workflows and mock registry."""
+        monkeypatch.setattr("tdev.agents.workflow_executor_agent.get_workflow_path",
+                            lambda workflow_id: self.workflows_dir / f"{workflow_id}.json")
+        monkeypatch.setattr("tdev.agents.workflow_executor_agent.get_registry", lambda: self.registry)
+    
+    def test_subworkflow_runs_inline(self, monkeypatch):
+        """Test that a workflow step runs the referenced workflow and stores its outputs."""
+        self._patch(monkeypatch)
+        parent = {
+            "id": "parent-flow",
+            "steps": [{"workflow": "child-flow", "output_to": "nested"}],
+        }
+        
+        context = WorkflowExecutorAgent().run({"workflow": parent, "input": {"input": "x"}})
+        
+        assert context["nested"] == {"result": "child result"}
+    
+    def test_plans_and_agents_are_reused(self, monkeypatch):
+        """Test that repeated nested runs reuse the compiled plan and agent instance."""
+        from tdev.agents import workflow_executor_agent as executor_module
+        
+        self._patch(monkeypatch)
+        compiled = []
+        original_compile = executor_module.compile_steps
+        monkeypatch.setattr(executor_module, "compile_steps",
+                            lambda steps, prefix="": compiled.append(prefix) or original_compile(steps, prefix))
+        
+        parent = {
+            "id": "parent-flow",
+            "steps": [
+                {"workflow": "child-flow", "output_to": "first"},
+                {"workflow": "child-flow", "output_to": "second"},
+            ],
+        }
+        executor = WorkflowExecutorAgent()
+        executor.run({"workflow": parent, "input": {}})
+        executor.run({"workflow": parent, "input": {}})
+        
+        assert self.agent.calls == 4
+        assert self.registry.instance_requests == 1
+        # The inline parent is compiled per run, the file-backed child only once
+        assert len(compiled) == 3
+    
+    def test_registry_change_refreshes_pool(self, monkeypatch):
+        """Test that a new registry generation drops pooled instances."""
+        self._patch(monkeypatch)
+        executor = WorkflowExecutorAgent()
+        executor.run({"workflow": "child-flow", "input": {}})
+        self.registry.generation += 1
+        executor.run({"workflow": "child-flow", "input": {}})
+        
+        assert self.registry.instance_requests == 2
+    
+    def test_recursive_reference_is_rejected(self, monkeypatch):
+        """Test that a workflow cannot include itself."""
+        self._patch(monkeypatch)
+        looping = Workflow(id="loop-flow", steps=[{"workflow": "loop-flow"}])
+        save_workflow(looping, self.workflows_dir / "loop-flow.json")
+        
+        context = WorkflowExecutorAgent().run({"workflow": "loop-flow", "input": {}})
+        
+        assert "Recursive workflow reference" in context["error_0"]
+    
+    def test_inline_workflows_without_ids_nest(self, monkeypatch):
+        """Test that nested inline workflows without IDs are not mistaken for recursion."""
+        self._patch(monkeypatch)
+        inner = {"steps": [{"agent": "ChildAgent", "output_to": "child_output"}], "outputs": {"result": "child_output"}}
+        outer = {"steps": [{"workflow": inner, "output_to": "nested"}], "outputs": {"result": "nested"}}
+        
+        context = WorkflowExecutorAgent().run({"workflow": {"steps": [{"workflow": outer, "output_to": "nested"}]},
+                                               "input": {}})
+        
+        assert "error_0" not in context
+        assert context["nested"] == {"result": {"result": "child result"}}
+    
+    def test_inline_nesting_depth_is_bounded(self, monkeypatch):
+        """Test that inline workflows nested too deeply stop with an error."""
+        from tdev.agents import workflow_executor_agent as executor_module
+        
+        self._patch(monkeypatch)
+        monkeypatch.setattr(executor_module, "MAX_WORKFLOW_DEPTH", 3)
+        workflow = {"steps": [{"agent": "ChildAgent", "output_to": "child_output"}]}
+        for _ in range(4):
+            workflow = {"steps": [{"workflow": workflow, "output_to": "nested"}]}
+        
+        context = WorkflowExecutorAgent().run({"workflow": workflow, "input": {}})
+        
+        assert self.agent.calls == 0
+        assert context["nested"]["nested"]["error_0"] == "Workflows nested more than 3 levels deep"